@@ -0,0 +1,243 @@
+import asyncio
+import time
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+import httpx
+
+from http_fetcher import BASE_URL, parse_student_html
+from proxy_pool import ProxyPool
+from rate_limiter import AdaptiveRateLimiter
+
+Result = Tuple[str, Optional[str], Optional[str]]
+
+
+class AsyncProfileScraper:
+    """
+    asyncio engine for /student/{id} lookups.
+
+    One httpx.AsyncClient keeps a pool of keep-alive connections, and a
+    semaphore caps how many lookups are in flight, so thousands of IDs run on
+    a single event loop instead of one OS thread (or one Chrome) each.
+
+    Example:
+        scraper = AsyncProfileScraper(concurrency=200)
+        results = asyncio.run(scraper.scrape_many(["09518241723", "09518241724"]))
+    """
+
+    def __init__(self, concurrency: int = 100, timeout: float = 10, retry_count: int = 2,
+                 base_url: str = BASE_URL, proxy: Optional[str] = None, fallback=None,
+                 rate_limiter: Optional[AdaptiveRateLimiter] = None, proxy_pool: Optional[ProxyPool] = None):
+        """
+        Args:
+            concurrency: Max lookups in flight at once
+            timeout: Per-request timeout in seconds
+            retry_count: Extra attempts after a failed request
+            base_url: Site root (overridable for local testing)
+            proxy: Optional proxy URL for every request (ignored when proxy_pool is given)
+            fallback: Optional ProxyScraper used (in a thread) when the static HTML lacks the name
+            rate_limiter: AdaptiveRateLimiter gating every request. Its per-host
+                limit caps concurrency too; the default is a limiter of this
+                scraper's own whose limit can grow up to `concurrency`
+            proxy_pool: Optional ProxyPool picking a proxy per request
+        """
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.retry_count = retry_count
+        self.base_url = base_url.rstrip('/')
+        self.proxy = proxy
+        self.fallback = fallback
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter(max_limit=concurrency)
+        self.proxy_pool = proxy_pool
+        self._clients: Dict[Optional[str], httpx.AsyncClient] = {}
+
+        self.stats = {'http_ok': 0, 'http_incomplete': 0, 'http_error': 0, 'fallback': 0}
+
+    def _choose_proxy(self) -> Optional[str]:
+        if self.proxy_pool is not None:
+            return self.proxy_pool.choose()
+        return self.proxy
+
+    def _client(self, proxy: Optional[str]) -> httpx.AsyncClient:
+        """One keep-alive client per proxy, created on first use"""
+        client = self._clients.get(proxy)
+        if client is None:
+            limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+            client = self._clients[proxy] = httpx.AsyncClient(
+                limits=limits,
+                timeout=httpx.Timeout(self.timeout),
+                proxy=proxy,
+                follow_redirects=True,
+            )
+        return client
+
+    async def _close_clients(self):
+        clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            await client.aclose()
+
+    async def _fetch(self, student_id: str) -> Optional[Tuple[Optional[str], Optional[str]]]:
+        """(image_url, name) of a loaded page, or None if the request failed"""
+        url = f"{self.base_url}/student/{student_id}"
+        for attempt in range(self.retry_count + 1):
+            proxy = self._choose_proxy()
+            async with self.rate_limiter.request(url) as slot:
+                start = time.time()
+                try:
+                    response = await self._client(proxy).get(url)
+                    response.raise_for_status()
+                    if self.proxy_pool is not None:
+                        self.proxy_pool.report(proxy, ok=True, latency=time.time() - start)
+                    image_url, name = parse_student_html(response.text)
+                    self.stats['http_ok' if name else 'http_incomplete'] += 1
+                    return image_url, name
+                except httpx.HTTPStatusError as e:
+                    self.stats['http_error'] += 1
+                    status = e.response.status_code
+                    if status == 429 or status >= 500:
+                        slot.throttled()
+                        if self.proxy_pool is not None:
+                            self.proxy_pool.report(proxy, ok=False)
+                        continue
+                    # 404 / 403...: the proxy delivered an answer, and retrying won't change it
+                    slot.error()
+                    if self.proxy_pool is not None:
+                        self.proxy_pool.report(proxy, ok=True, latency=time.time() - start)
+                    return None
+                except httpx.HTTPError:
+                    # Timeouts and connection errors
+                    self.stats['http_error'] += 1
+                    slot.throttled()
+                    if self.proxy_pool is not None:
+                        self.proxy_pool.report(proxy, ok=False)
+        return None
+
+    async def scrape_one(self, semaphore: asyncio.Semaphore,
+                         fallback_semaphore: asyncio.Semaphore, student_id: str) -> Result:
+        async with semaphore:
+            fetched = await self._fetch(student_id)
+        if fetched is None:
+            return student_id, None, None
+
+        image_url, name = fetched
+        if not name and self.fallback is not None:
+            # Page loaded but the static HTML didn't carry the profile: let the browser path render it
+            self.stats['fallback'] += 1
+            async with fallback_semaphore:
+                return await asyncio.to_thread(self.fallback.extract_student_data, student_id)
+
+        if image_url and not name:
+            name = "Unknown"
+        return student_id, image_url, name
+
+    async def scrape_many(self, student_ids: Iterable[str]) -> List[Result]:
+        """
+        Scrape many student IDs concurrently.
+
+        Runs on scrape_iter, so only a bounded window of lookups exists at a
+        time however many IDs are passed.
+
+        Args:
+            student_ids: IDs to look up
+
+        Returns:
+            List of tuples (student_id, image_url, name), in input order
+        """
+        student_ids = list(student_ids)
+        results = {}
+        async for result in self.scrape_iter(student_ids):
+            results[result[0]] = result
+        return [results[student_id] for student_id in student_ids]
+
+    async def scrape_iter(self, student_ids, window: Optional[int] = None) -> AsyncIterator[Result]:
+        """
+        Async iterator over results, yielded as each lookup finishes.
+
+        IDs are pulled lazily from `student_ids` (a plain or async iterable) and
+        at most `window` tasks exist at once, so memory is bounded regardless of
+        input size.
+
+        Args:
+            student_ids: IDs to look up
+            window: Max in-flight tasks (default: 2 x concurrency)
+
+        Yields:
+            Tuples (student_id, image_url, name) in completion order
+        """
+        window = window or self.concurrency * 2
+        semaphore = asyncio.Semaphore(self.concurrency)
+        fallback_workers = self.fallback.max_workers if self.fallback is not None else 1
+        fallback_semaphore = asyncio.Semaphore(fallback_workers)
+
+        ids = _aiter_ids(student_ids).__aiter__()
+        pending = set()
+        exhausted = False
+
+        async def refill():
+            nonlocal exhausted
+            while not exhausted and len(pending) < window:
+                try:
+                    student_id = await ids.__anext__()
+                except StopAsyncIteration:
+                    exhausted = True
+                    return
+                pending.add(asyncio.create_task(self.scrape_one(semaphore, fallback_semaphore, student_id)))
+
+        try:
+            await refill()
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                pending.difference_update(done)
+                await refill()
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+            await self._close_clients()
+
+
+async def _aiter_ids(student_ids):
+    if hasattr(student_ids, '__aiter__'):
+        async for student_id in student_ids:
+            yield student_id
+    else:
+        for student_id in student_ids:
+            yield student_id
+
+
+def scrape_ids(student_ids: Iterable[str], **kwargs) -> List[Result]:
+    """
+    Synchronous wrapper around AsyncProfileScraper.scrape_many.
+
+    Lets plain scripts like enroltojson.py / scan_image_availability.py use the
+    async engine without an event loop of their own.
+
+    Args:
+        student_ids: IDs to look up
+        **kwargs: Passed to AsyncProfileScraper
+
+    Returns:
+        List of tuples (student_id, image_url, name), in input order
+    """
+    student_ids = list(student_ids)
+    scraper = AsyncProfileScraper(**kwargs)
+
+    start_time = time.time()
+    results = asyncio.run(scraper.scrape_many(student_ids))
+    elapsed = time.time() - start_time
+
+    with_image = sum(1 for _, image_url, _ in results if image_url)
+    print(f"⚡ Async scraped {len(results)} students in {elapsed:.2f}s "
+          f"({with_image} with image, stats: {scraper.stats})")
+    print(f"🚦 Rate limits: {scraper.rate_limiter.snapshot()}")
+    return results
+
+
+def lookup_images_and_names(student_ids: Iterable[str], **kwargs) -> dict:
+    """Map each ID to (image_url, name), the shape extract_student_image_and_name returns"""
+    return {student_id: (image_url, name) for student_id, image_url, name in scrape_ids(student_ids, **kwargs)}
+
+
+if __name__ == "__main__":
+    for student_id, image_url, name in scrape_ids(["09518241723", "09518241724", "09518241725"]):
+        print(f"{student_id} - {name}: {image_url}")
@@ -0,0 +1,175 @@
+import json
+import os
+import threading
+from typing import Dict, Optional
+
+from enrollment_csv import combo_key
+
+
+class _ComboStats:
+    __slots__ = ('reported', 'hits', 'misses', 'short_waits')
+
+    def __init__(self, reported: Optional[bool] = None):
+        self.reported = reported   # verdict from image_availability_report.json, if any
+        self.hits = 0              # profiles that loaded with an image
+        self.misses = 0            # profiles that loaded without one
+        self.short_waits = 0       # Selenium loads where the image wait was shortened
+
+    def hit_rate(self) -> Optional[float]:
+        total = self.hits + self.misses
+        return self.hits / total if total else None
+
+
+class AvailabilityIndex:
+    """
+    Which course|batch|college|branch combos serve profile images.
+
+    Seeded from image_availability_report.json and updated with every profile
+    scraped afterwards. A combo counts as imageless while it has never produced
+    an image and either the report says so or `min_evidence` profiles in a row
+    came back without one. For those combos ProxyScraper shortens the Selenium
+    image wait from 5s to `short_wait`, except on every `explore_every`-th load,
+    which still gets the full wait so a combo whose images appear later is
+    noticed and flipped back.
+
+    Example:
+        index = AvailabilityIndex.load()
+        scraper = ProxyScraper(availability=index)
+        scraper.extract_student_data('03961101722', combo='btech|22|611|CSE')
+        index.save()
+    """
+
+    def __init__(self, min_evidence: int = 5, short_wait: float = 0.5, full_wait: float = 5.0,
+                 explore_every: int = 20):
+        """
+        Args:
+            min_evidence: Image-less profiles (and no image ever) before an unreported combo is treated as imageless
+            short_wait: Image wait (seconds) for combos known to lack images
+            full_wait: Image wait for every other combo
+            explore_every: Give every n-th load of an imageless combo the full wait anyway
+        """
+        self.min_evidence = min_evidence
+        self.short_wait = short_wait
+        self.full_wait = full_wait
+        self.explore_every = explore_every
+        self._combos: Dict[str, _ComboStats] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, report_path: str = 'image_availability_report.json',
+             stats_path: str = 'availability_index.json', **kwargs) -> 'AvailabilityIndex':
+        """Build the index from the scan report, then layer saved hit counts on top"""
+        index = cls(**kwargs)
+        if os.path.exists(report_path):
+            index.load_report(report_path)
+        if os.path.exists(stats_path):
+            with open(stats_path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            with index._lock:
+                for key, entry in saved.get('combos', {}).items():
+                    stats = index._combos.setdefault(key, _ComboStats(entry.get('reported')))
+                    stats.hits = entry.get('hits', 0)
+                    stats.misses = entry.get('misses', 0)
+        return index
+
+    def load_report(self, report_path: str) -> int:
+        """Seed verdicts from an image availability report; returns the number of combos read"""
+        with open(report_path, 'r', encoding='utf-8') as f:
+            report = json.load(f)
+
+        count = 0
+        with self._lock:
+            for section, has_images in (('with_images', True), ('without_images', False)):
+                for combo in report.get(section, []):
+                    key = combo_key(combo['course'], combo['batch'], combo['college_id'], combo['branch'])
+                    stats = self._combos.setdefault(key, _ComboStats())
+                    stats.reported = has_images
+                    count += 1
+        return count
+
+    def _imageless_locked(self, stats: _ComboStats) -> bool:
+        if stats.hits:
+            return False
+        return stats.reported is False or stats.misses >= self.min_evidence
+
+    def has_images(self, key: str) -> Optional[bool]:
+        """True / False once the combo is known, None if there's no evidence yet"""
+        with self._lock:
+            stats = self._combos.get(key)
+            if stats is None:
+                return None
+            if self._imageless_locked(stats):
+                return False
+            if stats.hits or stats.reported:
+                return True
+            return None
+
+    def image_wait(self, key: Optional[str]) -> float:
+        """Seconds Selenium should wait for the profile image of a student in this combo"""
+        if key is None:
+            return self.full_wait
+        with self._lock:
+            stats = self._combos.get(key)
+            if stats is None or not self._imageless_locked(stats):
+                return self.full_wait
+            stats.short_waits += 1
+            if stats.short_waits % self.explore_every == 0:
+                return self.full_wait
+            return self.short_wait
+
+    def record(self, key: Optional[str], image_found: bool):
+        """Add one loaded profile's outcome (only call it when the page actually loaded)"""
+        if key is None:
+            return
+        with self._lock:
+            stats = self._combos.setdefault(key, _ComboStats())
+            if image_found:
+                if stats.hits == 0 and stats.reported is False:
+                    print(f"🔁 {key}: image seen, no longer treated as imageless")
+                stats.hits += 1
+            else:
+                stats.misses += 1
+
+    def verdicts(self) -> Dict[str, bool]:
+        """Snapshot of every combo with a known verdict (plain dict, safe to send to worker processes)"""
+        with self._lock:
+            verdicts = {}
+            for key, stats in self._combos.items():
+                if self._imageless_locked(stats):
+                    verdicts[key] = False
+                elif stats.hits or stats.reported:
+                    verdicts[key] = True
+            return verdicts
+
+    def hit_rate(self, key: str) -> Optional[float]:
+        with self._lock:
+            stats = self._combos.get(key)
+            return stats.hit_rate() if stats else None
+
+    def stats(self) -> dict:
+        with self._lock:
+            imageless = sum(1 for s in self._combos.values() if self._imageless_locked(s))
+            return {
+                'combos': len(self._combos),
+                'imageless': imageless,
+                'observed': sum(1 for s in self._combos.values() if s.hits or s.misses),
+                'short_waits': sum(s.short_waits for s in self._combos.values()),
+            }
+
+    def save(self, stats_path: str = 'availability_index.json'):
+        """Persist per-combo verdicts and hit counts (temp file + os.replace)"""
+        with self._lock:
+            combos = {
+                key: {
+                    'reported': stats.reported,
+                    'hits': stats.hits,
+                    'misses': stats.misses,
+                    'hit_rate': stats.hit_rate(),
+                    'imageless': self._imageless_locked(stats),
+                }
+                for key, stats in sorted(self._combos.items())
+            }
+        tmp_path = f"{stats_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'combos': combos}, f, indent=2)
+        os.replace(tmp_path, stats_path)
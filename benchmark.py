@@ -0,0 +1,463 @@
+import csv
+import json
+import os
+import platform
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing import get_context
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import numpy as np
+
+from enrollment_csv import combo_key
+from extract_student_image import ProxyScraper
+from http_fetcher import IMAGE_HOST
+from rate_limiter import AdaptiveRateLimiter
+from ranklist_harvester import CSV_HEADER, Combo, RanklistHarvester
+from scan_image_availability import scan_image_availability
+
+TARGETS = ('scraper', 'ranklist', 'scan')
+RESULTS_VERSION = 1
+
+_COURSES = ('btech', 'bba', 'bca', 'mba', 'ba', 'llb')
+_BRANCHES = ('CSE', 'IT', 'ECE', 'EEE', 'MECHANICAL', 'CIVIL', 'GENERAL', 'ECONOMICS')
+
+
+class SiteConfig(NamedTuple):
+    """Shape and behaviour of the local stand-in site"""
+    combos: int = 40                   # ranklist pages
+    students_per_combo: int = 25
+    latency: float = 0.05              # mean seconds before each response
+    jitter: float = 0.5                # latency is uniform in latency * (1 +/- jitter)
+    error_rate: float = 0.0            # share of responses answered with a 503
+    missing_image_ratio: float = 0.3   # share of combos whose profiles have no image
+    seed: int = 0
+
+
+class MockSite:
+    """
+    Synthetic ipuranklist.com: combos, their students, and which combos serve images.
+
+    Pages mimic the markup the parsers rely on (a name <td> and an
+    assets.ipuranklist.com <img> on /student/{id}, `td.limit-char` cells on
+    /ranklist/...). Recorded pages placed in `fixtures_dir` as
+    student/<enrollment>.html or ranklist/<course>_<batch>_<college>_<branch>.html
+    are served verbatim instead.
+    """
+
+    def __init__(self, config: SiteConfig = SiteConfig(), fixtures_dir: Optional[str] = None):
+        self.config = config
+        self.fixtures_dir = fixtures_dir
+        rng = random.Random(config.seed)
+
+        self.combos: List[Combo] = []
+        self.has_images: Dict[Combo, bool] = {}
+        self.roster: Dict[Combo, List[str]] = {}
+        self.student_combo: Dict[str, Combo] = {}
+        while len(self.combos) < config.combos:
+            program = len(self.combos) % 1000
+            combo = Combo(rng.choice(_COURSES), rng.choice(('22', '23', '24')),
+                          str(rng.randint(1, 999)), rng.choice(_BRANCHES))
+            if combo in self.roster:
+                continue
+            # Enrollment layout: roll | institution | program | batch (see enrollment_decoder)
+            enrollments = [f"{roll:03d}{int(combo.college):03d}{program:03d}{combo.batch}"
+                           for roll in range(1, config.students_per_combo + 1)]
+            self.combos.append(combo)
+            self.has_images[combo] = rng.random() >= config.missing_image_ratio
+            self.roster[combo] = enrollments
+            for enrollment in enrollments:
+                self.student_combo[enrollment] = combo
+
+        self._rng = random.Random(config.seed + 1)
+        self._lock = threading.Lock()
+        self.counters = {'requests': 0, 'errors': 0, 'not_found': 0}
+
+    def students(self) -> List[str]:
+        return list(self.student_combo)
+
+    def write_enrollments_csv(self, path: str):
+        """All students as an enrollments CSV (ranklist_harvester layout)"""
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_HEADER)
+            for combo, enrollments in self.roster.items():
+                writer.writerows([enrollment, combo.course, combo.batch, combo.college, combo.branch]
+                                 for enrollment in enrollments)
+
+    def truth(self) -> Dict[str, bool]:
+        """combo_key -> whether the combo serves images"""
+        return {combo_key(*combo): has_images for combo, has_images in self.has_images.items()}
+
+    def reset_counters(self) -> Dict[str, int]:
+        with self._lock:
+            counters, self.counters = self.counters, {key: 0 for key in self.counters}
+        return counters
+
+    def _count(self, counter: str):
+        with self._lock:
+            self.counters[counter] += 1
+
+    def next_response(self) -> Tuple[float, bool]:
+        """(delay in seconds, whether to fail) for the next request"""
+        config = self.config
+        with self._lock:
+            delay = config.latency * (1 + config.jitter * (2 * self._rng.random() - 1))
+            failed = self._rng.random() < config.error_rate
+        return max(delay, 0.0), failed
+
+    def _fixture(self, *parts: str) -> Optional[str]:
+        if self.fixtures_dir is None:
+            return None
+        path = os.path.join(self.fixtures_dir, *parts)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def student_html(self, enrollment: str) -> Optional[str]:
+        recorded = self._fixture('student', f"{enrollment}.html")
+        if recorded is not None:
+            return recorded
+        combo = self.student_combo.get(enrollment)
+        if combo is None:
+            return None
+        name = 'Student ' + ''.join(chr(ord('A') + int(digit)) for digit in enrollment)
+        image = (f'<img src="https://{IMAGE_HOST}/students/{enrollment}.jpg" alt="photo">'
+                 if self.has_images[combo] else '<div class="no-photo"></div>')
+        return (f"<html><body>{image}<table>"
+                f"<tr><td>Name</td><td>{name}</td></tr>"
+                f"<tr><td>Enrollment</td><td>{enrollment}</td></tr>"
+                f"<tr><td>Programme</td><td>{combo.course.upper()} {combo.branch}</td></tr>"
+                f"</table></body></html>")
+
+    def ranklist_html(self, course: str, batch: str, college: str, branch: str) -> Optional[str]:
+        recorded = self._fixture('ranklist', f"{course}_{batch}_{college}_{branch}.html")
+        if recorded is not None:
+            return recorded
+        enrollments = self.roster.get(Combo(course, batch, college, branch))
+        if enrollments is None:
+            return None
+        rows = ''.join(f'<tr><td>{rank}</td><td class="limit-char">{enrollment}</td></tr>'
+                       for rank, enrollment in enumerate(enrollments, 1))
+        return f"<html><body><table>{rows}</table></body></html>"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'   # keep-alive, as the scrapers' pooled sessions expect
+    disable_nagle_algorithm = True  # headers and body are separate writes; avoid delayed-ACK stalls
+
+    def do_GET(self):
+        site: MockSite = self.server.site
+        site._count('requests')
+        delay, failed = site.next_response()
+        time.sleep(delay)
+        if failed:
+            site._count('errors')
+            return self._send(503, 'Service Unavailable')
+
+        parts = urlsplit(self.path)
+        body = None
+        if parts.path.startswith('/student/'):
+            body = site.student_html(unquote(parts.path[len('/student/'):]))
+        elif parts.path.startswith('/ranklist/'):
+            query = {key: values[0] for key, values in parse_qs(parts.query).items()}
+            body = site.ranklist_html(unquote(parts.path[len('/ranklist/'):]), query.get('batch', ''),
+                                      query.get('insti', ''), query.get('branch', ''))
+        if body is None:
+            site._count('not_found')
+            return self._send(404, 'Not Found')
+        self._send(200, body)
+
+    def _send(self, status: int, body: str):
+        payload = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass  # one line per request would drown the results
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+
+class MockSiteServer:
+    """
+    Serves a MockSite on a local port from a background thread.
+
+    Example:
+        with MockSiteServer(MockSite(SiteConfig(latency=0.02))) as server:
+            scraper = ProxyScraper(base_url=server.url, use_selenium=False)
+    """
+
+    def __init__(self, site: MockSite, host: str = '127.0.0.1', port: int = 0):
+        self.site = site
+        self._server = _Server((host, port), _Handler)
+        self._server.site = site
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'MockSiteServer':
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def _limiter(workers: int, production_limits: bool) -> AdaptiveRateLimiter:
+    """A fresh limiter per case; by default one that only backs off on errors, never caps throughput"""
+    if production_limits:
+        return AdaptiveRateLimiter()
+    return AdaptiveRateLimiter(initial_rate=100_000, max_rate=100_000, burst=100_000,
+                               initial_limit=workers, max_limit=max(workers, 64))
+
+
+def _timed(fn: Callable, samples: List[Tuple[float, bool]]) -> Callable:
+    """Wrap `fn` to record (seconds, raised nothing) for every call"""
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        ok = False
+        try:
+            result = fn(*args, **kwargs)
+            ok = True
+            return result
+        finally:
+            samples.append((time.perf_counter() - start, ok))
+    return wrapper
+
+
+def _peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024   # bytes on macOS, KiB on Linux
+
+
+def run_case(target: str, workers: int, base_url: str, workdir: str, student_ids: Sequence[str],
+             combos: Sequence[Combo], enrollments_csv: str, truth: Dict[str, bool],
+             production_limits: bool = False, verbose: bool = False) -> dict:
+    """
+    Run one target at one worker count against the mock site and measure it.
+
+    Meant to run in a fresh process (see run_benchmarks) so peak RSS belongs to this case alone.
+    """
+    samples: List[Tuple[float, bool]] = []
+    limiter = _limiter(workers, production_limits)
+    extra = {}
+
+    with open(os.devnull, 'w') as devnull, redirect_stdout(sys.stdout if verbose else devnull):
+        start = time.perf_counter()
+        if target == 'scraper':
+            with ProxyScraper(max_workers=workers, base_url=base_url, rate_limiter=limiter,
+                              use_selenium=False) as scraper:
+                scraper.extract_student_data = _timed(scraper.extract_student_data, samples)
+                results = list(scraper.scrape_iter(student_ids))
+                extra['fetch_paths'] = scraper.fetch_stats()
+                extra['chrome_started'] = scraper.driver_pool.created
+            items = len(results)
+            ok = sum(1 for _, _, name in results if name)
+            extra['with_image'] = sum(1 for _, image_url, _ in results if image_url)
+        elif target == 'ranklist':
+            output_csv = os.path.join(workdir, f"ranklist_{workers}.csv")
+            with RanklistHarvester(max_workers=workers, base_url=base_url, rate_limiter=limiter,
+                                   use_http=True, use_selenium=False) as harvester:
+                harvester.fetch_enrollments = _timed(harvester.fetch_enrollments, samples)
+                extra['rows'] = harvester.harvest(combos, output_csv)
+                extra['chrome_started'] = harvester.driver_pool.created
+            items = len(combos)
+            ok = sum(1 for _, succeeded in samples if succeeded)
+        elif target == 'scan':
+            output_file = os.path.join(workdir, f"scan_{workers}.json")
+            with ProxyScraper(max_workers=workers, base_url=base_url, rate_limiter=limiter,
+                              use_selenium=False) as scraper:
+                scraper.extract_student_data = _timed(scraper.extract_student_data, samples)
+                report = scan_image_availability(enrollments_csv, output_file,
+                                                 os.path.join(workdir, f"scan_{workers}.log"),
+                                                 scraper=scraper, report_every=50)
+            decided = [(entry, True) for entry in report['with_images']]
+            decided += [(entry, False) for entry in report['without_images']]
+            items = len(decided)
+            ok = sum(1 for entry, has_images in decided
+                     if truth.get(combo_key(entry['course'], entry['batch'], entry['college_id'],
+                                            entry['branch'])) == has_images)
+            extra['profiles_probed'] = report['summary']['profiles_probed']
+        else:
+            raise ValueError(f"Unknown target {target!r}; expected one of {TARGETS}")
+        elapsed = time.perf_counter() - start
+
+    latencies = np.array([seconds for seconds, _ in samples]) * 1000
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]).tolist() if len(latencies) else (None, None, None)
+    return {
+        'target': target,
+        'workers': workers,
+        'items': items,
+        'ok': ok,                      # scan: combos decided correctly
+        'calls': len(samples),         # timed lookups / page fetches
+        'seconds': round(elapsed, 4),
+        'throughput': round(items / elapsed, 2) if elapsed else None,
+        'seconds_per_item': round(elapsed / items, 5) if items else None,
+        'latency_ms': {key: round(value, 2) if value is not None else None for key, value in {
+            'p50': p50, 'p95': p95, 'p99': p99,
+            'mean': float(latencies.mean()) if len(latencies) else None,
+            'max': float(latencies.max()) if len(latencies) else None,
+        }.items()},
+        'peak_rss_mb': round(_peak_rss_bytes() / 2 ** 20, 1),
+        'rate_limits': limiter.snapshot(),
+        **extra,
+    }
+
+
+def run_benchmarks(targets: Sequence[str] = TARGETS, workers: Sequence[int] = (1, 4, 8, 16),
+                   config: SiteConfig = SiteConfig(), students: Optional[int] = None,
+                   fixtures_dir: Optional[str] = None, production_limits: bool = False,
+                   verbose: bool = False) -> dict:
+    """
+    Start the mock site and run every target at every worker count, each in a fresh process.
+
+    Args:
+        targets: Any of 'scraper' (ProxyScraper over student pages), 'ranklist'
+            (RanklistHarvester over every combo) and 'scan' (scan_image_availability)
+        workers: Worker counts to sweep
+        config: Mock site shape, latency, error rate and missing-image ratio
+        students: Cap on student pages for the 'scraper' target (default: all)
+        fixtures_dir: Recorded pages to serve instead of synthetic ones
+        production_limits: Use the default AdaptiveRateLimiter settings instead of an uncapped one
+        verbose: Let the scrapers' per-item output through
+
+    Returns:
+        Results dict (see main for the JSON layout)
+    """
+    site = MockSite(config, fixtures_dir)
+    student_ids = site.students()[:students]
+    results = []
+    with MockSiteServer(site) as server, tempfile.TemporaryDirectory() as workdir:
+        enrollments_csv = os.path.join(workdir, 'enrollments.csv')
+        site.write_enrollments_csv(enrollments_csv)
+        for target in targets:
+            for count in workers:
+                site.reset_counters()
+                with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+                    result = executor.submit(run_case, target, count, server.url, workdir, student_ids,
+                                             site.combos, enrollments_csv, site.truth(),
+                                             production_limits, verbose).result()
+                result['server'] = site.reset_counters()
+                results.append(result)
+                latency = result['latency_ms']
+                print(f"⏱️  {target:<8} x{count:<3} {result['throughput']:>9} items/s  "
+                      f"p50 {latency['p50'] or 0:7.1f}ms  p95 {latency['p95'] or 0:7.1f}ms  "
+                      f"p99 {latency['p99'] or 0:7.1f}ms  ok {result['ok']}/{result['items']}  "
+                      f"rss {result['peak_rss_mb']}MB")
+
+    return {
+        'version': RESULTS_VERSION,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+        },
+        'site': config._asdict(),
+        'production_limits': production_limits,
+        'results': results,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float = 0.1) -> List[dict]:
+    """
+    Per (target, workers): throughput and p95 ratios against a baseline results file.
+
+    A case regresses when throughput drops, or p95 latency grows, by more than `tolerance`.
+    """
+    previous = {(result['target'], result['workers']): result for result in baseline.get('results', [])}
+    rows = []
+    for result in current['results']:
+        before = previous.get((result['target'], result['workers']))
+        if before is None or not before['throughput'] or not result['throughput']:
+            continue
+        throughput_ratio = result['throughput'] / before['throughput']
+        p95, p95_before = result['latency_ms']['p95'], before['latency_ms']['p95']
+        p95_ratio = p95 / p95_before if p95 and p95_before else None
+        rows.append({
+            'target': result['target'],
+            'workers': result['workers'],
+            'throughput_ratio': round(throughput_ratio, 3),
+            'p95_ratio': round(p95_ratio, 3) if p95_ratio is not None else None,
+            'regressed': throughput_ratio < 1 - tolerance or (p95_ratio is not None and p95_ratio > 1 + tolerance),
+        })
+    return rows
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    import argparse
+
+    defaults = SiteConfig._field_defaults
+    parser = argparse.ArgumentParser(
+        description="Offline benchmarks of the scrapers against a local stand-in for ipuranklist.com")
+    parser.add_argument('--targets', nargs='+', choices=TARGETS, default=list(TARGETS))
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8, 16])
+    parser.add_argument('--combos', type=int, default=defaults['combos'])
+    parser.add_argument('--students-per-combo', type=int, default=defaults['students_per_combo'])
+    parser.add_argument('--students', type=int, default=None, help="Cap on pages for the scraper target")
+    parser.add_argument('--latency', type=float, default=defaults['latency'], help="Mean response delay (s)")
+    parser.add_argument('--jitter', type=float, default=defaults['jitter'])
+    parser.add_argument('--error-rate', type=float, default=defaults['error_rate'])
+    parser.add_argument('--missing-image-ratio', type=float, default=defaults['missing_image_ratio'])
+    parser.add_argument('--seed', type=int, default=defaults['seed'])
+    parser.add_argument('--fixtures', help="Directory of recorded student/ and ranklist/ pages")
+    parser.add_argument('--production-limits', action='store_true',
+                        help="Run through the default AdaptiveRateLimiter settings")
+    parser.add_argument('--output', '-o', default='benchmark_results.json')
+    parser.add_argument('--compare', help="Baseline results JSON; exit 1 on regression")
+    parser.add_argument('--tolerance', type=float, default=0.1)
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args(argv)
+
+    config = SiteConfig(args.combos, args.students_per_combo, args.latency, args.jitter,
+                        args.error_rate, args.missing_image_ratio, args.seed)
+    results = run_benchmarks(args.targets, args.workers, config, students=args.students,
+                             fixtures_dir=args.fixtures, production_limits=args.production_limits,
+                             verbose=args.verbose)
+
+    regressed = False
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            results['comparison'] = compare(results, json.load(f), args.tolerance)
+        for row in results['comparison']:
+            regressed |= row['regressed']
+            print(f"{'❌' if row['regressed'] else '✅'} {row['target']:<8} x{row['workers']:<3} "
+                  f"throughput {row['throughput_ratio']:.2f}x, p95 {row['p95_ratio']}x")
+
+    tmp_path = f"{args.output}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    os.replace(tmp_path, args.output)
+    print(f"📄 Results saved to {args.output}")
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
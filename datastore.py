@@ -0,0 +1,388 @@
+import csv
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from enrollment_csv import FIELDS, iter_enrollment_rows
+
+# Columns a query may filter on (all indexed except name/image)
+FILTER_COLUMNS = ('enrollment', 'course', 'batch', 'college', 'branch', 'gender', 'name')
+PROFILE_FIELDS = ('name', 'image', 'college', 'course', 'batch', 'branch', 'enrollment', 'elo', 'matches', 'gender')
+
+
+def _is_enrollment(value) -> bool:
+    # The JSONL exports start with a stray CSV header row ("Enrollment Number")
+    return bool(value) and str(value).isdigit()
+
+
+class StudentStore:
+    """
+    Indexed SQLite store for enrollments and scraped student profiles.
+
+    One row per enrollment with typed columns (batch, elo and matches are
+    integers) and indexes on college, course, batch, branch and gender, so
+    questions like "CSE students at college 131 with images" are an index
+    lookup instead of a pandas pass over every CSV / JSONL file. Writes are
+    upserts: ranklist rows fill the enrollment columns, scrape results fill the
+    profile columns, and neither clobbers the other.
+
+    Example:
+        store = StudentStore('students.db')
+        store.import_csv('enrollments22.csv')
+        store.import_jsonl('data.json')
+        rows = store.query(college='131', branch='CSE', has_image=True)
+    """
+
+    def __init__(self, path: str = 'students.db'):
+        """
+        Args:
+            path: SQLite database file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(
+            '''CREATE TABLE IF NOT EXISTS students (
+                   enrollment TEXT PRIMARY KEY,
+                   course     TEXT,
+                   batch      INTEGER,
+                   college    TEXT,
+                   branch     TEXT,
+                   name       TEXT,
+                   image      TEXT,
+                   gender     TEXT,
+                   elo        INTEGER NOT NULL DEFAULT 1200,
+                   matches    INTEGER NOT NULL DEFAULT 0,
+                   listed_at  REAL,
+                   scraped_at REAL
+               );
+               CREATE INDEX IF NOT EXISTS students_college ON students(college);
+               CREATE INDEX IF NOT EXISTS students_course ON students(course);
+               CREATE INDEX IF NOT EXISTS students_batch ON students(batch);
+               CREATE INDEX IF NOT EXISTS students_branch ON students(branch);
+               CREATE INDEX IF NOT EXISTS students_gender ON students(gender);
+               CREATE INDEX IF NOT EXISTS students_combo ON students(course, batch, college, branch);'''
+        )
+        self._conn.commit()
+
+    # ------------------------------------------------------------------ writes
+
+    def upsert_enrollments(self, rows: Iterable[Dict[str, str]], listed_at: Optional[float] = None) -> int:
+        """
+        Insert / update ranklist rows (enrollment, course, batch, college, branch).
+
+        Profile columns of existing students are left alone.
+
+        Returns:
+            Number of rows written
+        """
+        listed_at = time.time() if listed_at is None else listed_at
+        params = [
+            (row['enrollment'], row['course'], int(row['batch']), row['college'], row['branch'], listed_at)
+            for row in rows if _is_enrollment(row.get('enrollment'))
+        ]
+        with self._lock:
+            self._conn.executemany(
+                '''INSERT INTO students (enrollment, course, batch, college, branch, listed_at)
+                   VALUES (?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(enrollment) DO UPDATE SET
+                       course = excluded.course, batch = excluded.batch, college = excluded.college,
+                       branch = excluded.branch, listed_at = excluded.listed_at''',
+                params,
+            )
+            self._conn.commit()
+        return len(params)
+
+    def upsert_profiles(self, records: Iterable[dict], scraped_at: Optional[float] = None,
+                        ratings: bool = False) -> int:
+        """
+        Insert / update data.json-style records.
+
+        A missing name, image or gender never overwrites a known one, so a
+        failed re-scrape can't erase data (use clear_images for that). elo and
+        matches of existing students are only overwritten with `ratings=True`
+        (imports); otherwise they change through update_ratings.
+
+        Returns:
+            Number of records written
+        """
+        scraped_at = time.time() if scraped_at is None else scraped_at
+        params = [
+            (record['enrollment'], record.get('course'), int(record['batch']) if record.get('batch') else None,
+             record.get('college'), record.get('branch'), record.get('name'), record.get('image'),
+             record.get('gender'), record.get('elo', 1200), record.get('matches', 0), scraped_at)
+            for record in records if _is_enrollment(record.get('enrollment'))
+        ]
+        rating_update = ', elo = excluded.elo, matches = excluded.matches' if ratings else ''
+        with self._lock:
+            self._conn.executemany(
+                '''INSERT INTO students (enrollment, course, batch, college, branch, name, image, gender,
+                                         elo, matches, scraped_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(enrollment) DO UPDATE SET
+                       course = COALESCE(excluded.course, course),
+                       batch = COALESCE(excluded.batch, batch),
+                       college = COALESCE(excluded.college, college),
+                       branch = COALESCE(excluded.branch, branch),
+                       name = COALESCE(excluded.name, name),
+                       image = COALESCE(excluded.image, image),
+                       gender = COALESCE(excluded.gender, gender),
+                       scraped_at = excluded.scraped_at''' + rating_update,
+                params,
+            )
+            self._conn.commit()
+        return len(params)
+
+    def update_ratings(self, ratings: Iterable[tuple]) -> int:
+        """Set (enrollment, elo, matches) for existing students in one transaction"""
+        params = [(int(elo), int(matches), enrollment) for enrollment, elo, matches in ratings]
+        with self._lock:
+            self._conn.executemany('UPDATE students SET elo = ?, matches = ? WHERE enrollment = ?', params)
+            self._conn.commit()
+        return len(params)
+
+    def update_genders(self, genders: Iterable[tuple]) -> int:
+        """Set (enrollment, gender) for existing students in one transaction"""
+        params = [(gender, enrollment) for enrollment, gender in genders]
+        with self._lock:
+            self._conn.executemany('UPDATE students SET gender = ? WHERE enrollment = ?', params)
+            self._conn.commit()
+        return len(params)
+
+    def delete(self, enrollments: Iterable[str]) -> int:
+        """Remove students (e.g. dropped from the ranklists)"""
+        with self._lock:
+            cursor = self._conn.executemany(
+                'DELETE FROM students WHERE enrollment = ?',
+                [(enrollment,) for enrollment in enrollments],
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def clear_images(self, enrollments: Iterable[str]) -> int:
+        """Null the image of the given students (e.g. placeholders found by phash_index)"""
+        with self._lock:
+            cursor = self._conn.executemany(
+                'UPDATE students SET image = NULL WHERE enrollment = ?',
+                [(enrollment,) for enrollment in enrollments],
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def _known_enrollments(self) -> set:
+        with self._lock:
+            return {row[0] for row in self._conn.execute('SELECT enrollment FROM students')}
+
+    def import_csv(self, csv_file: str, only_new: bool = False) -> int:
+        """Upsert every row of an enrollments CSV (with or without header); only_new skips students already stored"""
+        rows = iter_enrollment_rows(csv_file)
+        if only_new:
+            known = self._known_enrollments()
+            rows = (row for row in rows if row['enrollment'] not in known)
+        count = self.upsert_enrollments(rows)
+        print(f"📥 {csv_file}: {count} enrollments")
+        return count
+
+    def import_jsonl(self, jsonl_file: str, batch_size: int = 1000, only_new: bool = False) -> int:
+        """
+        Upsert every record of a data.json-style file, skipping the stray header row.
+
+        scraped_at is set to the file's mtime (as ScrapeCache does), not the
+        import time, so old profiles don't look fresh to iter_stale. With
+        only_new, students already in the store are left untouched.
+        """
+        known = self._known_enrollments() if only_new else set()
+        scraped_at = os.path.getmtime(jsonl_file)
+        count = 0
+        batch = []
+        with open(jsonl_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if record.get('enrollment') in known:
+                    continue
+                batch.append(record)
+                if len(batch) >= batch_size:
+                    count += self.upsert_profiles(batch, scraped_at=scraped_at, ratings=True)
+                    batch = []
+        count += self.upsert_profiles(batch, scraped_at=scraped_at, ratings=True)
+        print(f"📥 {jsonl_file}: {count} profiles")
+        return count
+
+    # ----------------------------------------------------------------- queries
+
+    def _where(self, filters: dict, has_image: Optional[bool]):
+        clauses, params = [], []
+        for column, value in filters.items():
+            if column not in FILTER_COLUMNS:
+                raise ValueError(f"Unknown filter column: {column}")
+            if value is None:
+                continue
+            if column == 'batch':
+                value = [int(v) for v in value] if isinstance(value, (list, tuple, set)) else int(value)
+            if isinstance(value, (list, tuple, set)):
+                clauses.append(f"{column} IN ({', '.join('?' * len(value))})")
+                params.extend(value)
+            else:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if has_image is not None:
+            clauses.append('image IS NOT NULL' if has_image else 'image IS NULL')
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+    def get(self, enrollment: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute('SELECT * FROM students WHERE enrollment = ?', (enrollment,)).fetchone()
+        return dict(row) if row else None
+
+    def query(self, has_image: Optional[bool] = None, order_by: str = 'enrollment',
+              limit: Optional[int] = None, **filters) -> List[dict]:
+        """
+        Students matching equality filters (a list/tuple/set value means IN).
+
+        Args:
+            has_image: True / False to require / exclude an image
+            order_by: Column to sort by (prefix with '-' for descending)
+            limit: Max rows
+            **filters: Any of enrollment, course, batch, college, branch, gender, name
+
+        Example:
+            store.query(college='131', branch=['CSE', 'IT'], has_image=True, order_by='-elo', limit=50)
+        """
+        return list(self.iter_query(has_image=has_image, order_by=order_by, limit=limit, **filters))
+
+    def iter_query(self, has_image: Optional[bool] = None, order_by: str = 'enrollment',
+                   limit: Optional[int] = None, **filters) -> Iterator[dict]:
+        """Like query(), but yields the rows as dicts one at a time"""
+        where, params = self._where(filters, has_image)
+        column = order_by.lstrip('-')
+        if column not in FILTER_COLUMNS + ('elo', 'matches', 'listed_at', 'scraped_at'):
+            raise ValueError(f"Unknown order_by column: {column}")
+        sql = f"SELECT * FROM students{where} ORDER BY {column} {'DESC' if order_by.startswith('-') else 'ASC'}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        yield from self._iter_rows(sql, params)
+
+    def _iter_rows(self, sql: str, params: list, chunk_size: int = 1000) -> Iterator[dict]:
+        """
+        Run a SELECT on a read connection of its own and yield its rows in chunks.
+
+        The read sees one WAL snapshot from its first fetch to its last, so the
+        store can be written (e.g. each yielded row upserted) while iterating:
+        the writes go through the shared connection and neither disturb the
+        open cursor nor show up in it.
+        """
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        try:
+            cursor = conn.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    return
+                for row in rows:
+                    yield dict(row)
+        finally:
+            conn.close()
+
+    def iter_stale(self, max_age: float, missing_image_age: Optional[float] = None,
+                   now: Optional[float] = None, **filters) -> Iterator[dict]:
+        """
+        Students whose profile needs (re-)scraping.
+
+        Args:
+            max_age: Seconds after which any profile is stale
+            missing_image_age: Seconds after which a profile without an image is re-checked
+            now: Reference time (default: now)
+            **filters: Same equality filters as query()
+
+        Yields:
+            Rows never scraped, scraped more than `max_age` ago, or without an
+            image and scraped more than `missing_image_age` ago
+        """
+        now = time.time() if now is None else now
+        where, params = self._where(filters, None)
+        stale = 'scraped_at IS NULL OR scraped_at < ?'
+        params.append(now - max_age)
+        if missing_image_age is not None:
+            stale += ' OR (image IS NULL AND scraped_at < ?)'
+            params.append(now - missing_image_age)
+        where = f"{where} AND ({stale})" if where else f" WHERE {stale}"
+        yield from self._iter_rows(f"SELECT * FROM students{where} ORDER BY enrollment", params)
+
+    def count(self, has_image: Optional[bool] = None, **filters) -> int:
+        where, params = self._where(filters, has_image)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM students{where}", params).fetchone()[0]
+
+    def iter_enrollment_rows(self, **filters) -> Iterator[Dict[str, str]]:
+        """Rows in the same shape as enrollment_csv.iter_enrollment_rows, for the scrapers and scanner"""
+        for row in self.iter_query(**filters):
+            yield {
+                'enrollment': row['enrollment'],
+                'course': row['course'],
+                'batch': str(row['batch']),
+                'college': row['college'],
+                'branch': row['branch'],
+            }
+
+    def export_jsonl(self, output_file: str, **filters) -> int:
+        """Write matching students as data.json-style JSONL (temp file + os.replace)"""
+        count = 0
+        tmp_path = f"{output_file}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for row in self.iter_query(**filters):
+                record = {field: row[field] for field in PROFILE_FIELDS}
+                record['batch'] = str(record['batch'])
+                json.dump(record, f, ensure_ascii=False)
+                f.write("\n")
+                count += 1
+        os.replace(tmp_path, output_file)
+        return count
+
+    def export_csv(self, output_file: str, **filters) -> int:
+        """Write matching students as a headerless enrollments CSV"""
+        count = 0
+        with open(output_file, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            for row in self.iter_enrollment_rows(**filters):
+                writer.writerow([row[field] for field in FIELDS])
+                count += 1
+        return count
+
+    def stats(self) -> dict:
+        with self._lock:
+            total, profiled, with_image = self._conn.execute(
+                'SELECT COUNT(*), COUNT(scraped_at), COUNT(image) FROM students'
+            ).fetchone()
+        return {'students': total, 'profiles': profiled, 'with_image': with_image}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+if __name__ == "__main__":
+    import glob
+
+    with StudentStore() as store:
+        for csv_file in sorted(glob.glob('enrollments2*.csv')):
+            if 'backup' not in csv_file:
+                store.import_csv(csv_file)
+        for jsonl_file in ['data.json', 'dataMSIT.json']:
+            store.import_jsonl(jsonl_file)
+        print(f"🗄️  {store.stats()}")
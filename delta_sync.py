@@ -0,0 +1,287 @@
+import csv
+import json
+import os
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from availability_index import AvailabilityIndex
+from datastore import StudentStore
+from enroltojson import build_record
+from enrollment_csv import FIELDS, combo_key, iter_enrollment_rows
+from extract_student_image import ProxyScraper
+from gender_classifier import GenderClassifier
+from ranklist_harvester import CSV_HEADER, RanklistHarvester, load_combos
+from scrape_cache import DAY
+
+
+class EnrollmentDiff(NamedTuple):
+    added: List[Dict[str, str]]
+    removed: List[Dict[str, str]]
+    changed: List[Dict[str, str]]   # fresh rows of students now listed under another combo
+    unchanged: int
+    combos_refreshed: int
+
+
+def _row_combo(row: Dict[str, str]) -> str:
+    return combo_key(row['course'], row['batch'], row['college'], row['branch'])
+
+
+def diff_enrollments(existing: Iterable[Dict[str, str]], fresh: Iterable[Dict[str, str]]) -> EnrollmentDiff:
+    """
+    Compare a fresh ranklist harvest with the current enrollment rows.
+
+    Removals are only counted inside combos the fresh harvest actually
+    returned rows for: a ranklist page that timed out or came back empty says
+    nothing about its students, so they are kept. Students still listed but
+    under a different course / batch / college / branch are `changed`.
+    """
+    fresh = {row['enrollment']: row for row in fresh}
+    fresh_combos = {_row_combo(row) for row in fresh.values()}
+
+    seen = set()
+    removed, changed = [], []
+    for row in existing:
+        seen.add(row['enrollment'])
+        fresh_row = fresh.get(row['enrollment'])
+        if fresh_row is None:
+            if _row_combo(row) in fresh_combos:
+                removed.append(row)
+        elif _row_combo(fresh_row) != _row_combo(row):
+            changed.append(fresh_row)
+
+    added = [row for enrollment, row in fresh.items() if enrollment not in seen]
+    return EnrollmentDiff(added, removed, changed, len(fresh) - len(added) - len(changed), len(fresh_combos))
+
+
+def sync_enrollments(course_csv: str, output_file: str, batches: Iterable = (23,), max_workers: int = 4,
+                     store: Optional[StudentStore] = None,
+                     harvester: Optional[RanklistHarvester] = None) -> EnrollmentDiff:
+    """
+    Re-harvest ranklists and merge the difference into `output_file`.
+
+    The harvest goes to `<output_file>.fresh`; the existing CSV keeps its row
+    order, loses removed students, has moved students' rows updated, gains new
+    ones at the end, and is swapped in atomically. With a store, new rows are upserted (queuing them for profile
+    scraping) and removed students are deleted.
+
+    Returns:
+        EnrollmentDiff
+    """
+    fresh_file = f"{output_file}.fresh"
+    own_harvester = harvester is None
+    if own_harvester:
+        harvester = RanklistHarvester(max_workers=max_workers)
+    try:
+        harvester.harvest(load_combos(course_csv, batches), fresh_file)
+    finally:
+        if own_harvester:
+            harvester.close()
+
+    fresh = list(iter_enrollment_rows(fresh_file))
+    existing = list(iter_enrollment_rows(output_file)) if os.path.exists(output_file) else []
+    diff = diff_enrollments(existing, fresh)
+
+    removed_ids = {row['enrollment'] for row in diff.removed}
+    changed = {row['enrollment']: row for row in diff.changed}
+    tmp_path = f"{output_file}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADER)
+        for row in existing:
+            if row['enrollment'] not in removed_ids:
+                row = changed.get(row['enrollment'], row)
+                writer.writerow([row[field] for field in FIELDS])
+        for row in diff.added:
+            writer.writerow([row[field] for field in FIELDS])
+    os.replace(tmp_path, output_file)
+    os.remove(fresh_file)
+
+    if store is not None:
+        store.upsert_enrollments(fresh)
+        store.delete(removed_ids)
+
+    print(f"🔄 {output_file}: +{len(diff.added)} new, -{len(diff.removed)} removed, "
+          f"{len(diff.changed)} moved, {diff.unchanged} unchanged across {diff.combos_refreshed} ranklists")
+    return diff
+
+
+def merge_profiles_jsonl(store: StudentStore, jsonl_path: str, enrollments: Optional[Iterable[str]] = None,
+                         removed: Iterable[str] = (), **filters) -> dict:
+    """
+    Merge the store's profiles back into a data.json-style file.
+
+    The store may hold several datasets (e.g. data.json and dataMSIT.json share
+    students.db), so the merge is scoped to this file's own students:
+    `enrollments` (typically the rows of its enrollment CSV) further narrows
+    the store rows matching `filters`. Records in scope are replaced by the
+    store's version; records of `removed` students are dropped; in-scope store
+    rows missing from the file are appended; every other record, including
+    ones the store never knew about, is kept as it was. Rewritten via temp
+    file + os.replace.
+    """
+    enrollments = set(enrollments) if enrollments is not None else None
+    removed = set(removed)
+    in_scope = {row['enrollment']: row for row in store.iter_query(**filters)
+                if enrollments is None or row['enrollment'] in enrollments}
+
+    def to_record(row: dict) -> dict:
+        record = build_record({**row, 'batch': str(row['batch'])}, row['image'], row['name'])
+        record.update(elo=row['elo'], matches=row['matches'], gender=row['gender'])
+        return record
+
+    stats = {'replaced': 0, 'dropped': 0, 'appended': 0, 'kept': 0}
+    seen = set()
+    tmp_path = f"{jsonl_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as dst:
+        if os.path.exists(jsonl_path):
+            with open(jsonl_path, 'r', encoding='utf-8') as src:
+                for line in src:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    enrollment = record.get('enrollment')
+                    if enrollment in in_scope:
+                        record = to_record(in_scope[enrollment])
+                        seen.add(enrollment)
+                        stats['replaced'] += 1
+                    elif enrollment in removed:
+                        stats['dropped'] += 1
+                        continue
+                    else:
+                        stats['kept'] += 1
+                    dst.write(json.dumps(record, ensure_ascii=False) + "\n")
+        for enrollment, row in in_scope.items():
+            if enrollment not in seen and row['scraped_at'] is not None:
+                dst.write(json.dumps(to_record(row), ensure_ascii=False) + "\n")
+                stats['appended'] += 1
+    os.replace(tmp_path, jsonl_path)
+    return stats
+
+
+def sync_profiles(store: StudentStore, scraper: Optional[ProxyScraper] = None, max_age: float = 90 * DAY,
+                  missing_image_age: Optional[float] = 7 * DAY, availability: Optional[AvailabilityIndex] = None,
+                  gender_classifier: Optional[GenderClassifier] = None, output_file: Optional[str] = None,
+                  batch_size: int = 100, max_workers: int = 5, enrollments: Optional[Iterable[str]] = None,
+                  removed: Iterable[str] = (), **filters) -> dict:
+    """
+    Scrape only the profiles that are new or stale, and merge them into the store.
+
+    Queued: students never scraped, scraped more than `max_age` ago, or without
+    an image and last checked more than `missing_image_age` ago - except in
+    combos the availability index knows to be imageless. Failed lookups are not
+    written, so they stay queued for the next run.
+
+    Args:
+        store: StudentStore holding enrollments and profiles
+        scraper: ProxyScraper to use (default: one without a scrape cache, so stale entries really are re-fetched)
+        max_age: Seconds before any profile is re-scraped
+        missing_image_age: Seconds before a profile without image is re-checked (None: never)
+        availability: AvailabilityIndex (default: loaded from image_availability_report.json)
+        gender_classifier: Optional classifier run on each batch before it is stored
+        output_file: Optional data.json-style file the results are merged back into
+        batch_size: Results upserted per transaction
+        max_workers: Scraper workers when `scraper` isn't given
+        enrollments: Only sync (and merge) these students, e.g. one dataset of a shared store
+        removed: Students to drop from `output_file` (EnrollmentDiff.removed)
+        **filters: Restrict the sync, e.g. batch=23 or college='150'
+
+    Returns:
+        Stats dict
+    """
+    availability = availability or AvailabilityIndex.load()
+    verdicts = availability.verdicts()
+
+    enrollments = set(enrollments) if enrollments is not None else None
+    queue = {}
+    for row in store.iter_stale(max_age, missing_image_age, **filters):
+        if enrollments is not None and row['enrollment'] not in enrollments:
+            continue
+        fresh_enough = row['scraped_at'] is not None and row['scraped_at'] >= time.time() - max_age
+        if fresh_enough and verdicts.get(_row_combo({**row, 'batch': str(row['batch'])})) is False:
+            continue  # only queued for its missing image, which this combo doesn't serve
+        queue[row['enrollment']] = {**row, 'batch': str(row['batch'])}
+
+    stats = {'queued': len(queue), 'updated': 0, 'with_image': 0, 'failed': 0}
+    in_scope = store.count(**filters) if enrollments is None else len(enrollments)
+    print(f"🔄 {len(queue)} profiles to scrape ({in_scope} in scope)")
+
+    own_scraper = scraper is None
+    if own_scraper:
+        scraper = ProxyScraper(max_workers=max_workers, availability=availability)
+
+    start_time = time.time()
+    batch = []
+
+    def flush():
+        if gender_classifier is not None:
+            gender_classifier.fill_records(batch)
+        store.upsert_profiles(batch)
+        batch.clear()
+
+    try:
+        for enrollment, image_url, name in scraper.scrape_iter(list(queue), combo_of=lambda e: _row_combo(queue[e])):
+            if not image_url and not name:
+                stats['failed'] += 1
+                continue
+            batch.append(build_record(queue[enrollment], image_url, name))
+            stats['updated'] += 1
+            stats['with_image'] += bool(image_url)
+            if len(batch) >= batch_size:
+                flush()
+        flush()
+    finally:
+        availability.save()
+        if own_scraper:
+            scraper.close()
+
+    if output_file:
+        print(f"📄 Merged into {output_file}: {merge_profiles_jsonl(store, output_file, enrollments, removed, **filters)}")
+
+    stats['seconds'] = round(time.time() - start_time, 2)
+    print(f"✅ Profile sync: {stats}")
+    return stats
+
+
+def delta_sync(course_csv: str, enrollments_csv: str, profiles_jsonl: str, batches: Iterable = (23,),
+               store_path: str = 'students.db', max_age: float = 90 * DAY, max_workers: int = 4,
+               harvester: Optional[RanklistHarvester] = None, scraper: Optional[ProxyScraper] = None) -> dict:
+    """
+    Incremental semester refresh: ranklists -> enrollment diff -> stale/new profiles -> merged outputs.
+
+    Costs one ranklist pass plus one profile page per new or stale student,
+    instead of re-scraping every student from scratch.
+    """
+    batches = list(batches)
+    with StudentStore(store_path) as store:
+        # Seed students of these outputs the store doesn't know yet. Checked per file rather
+        # than "store is empty", since several datasets share one store; profiles go first so
+        # the CSV import doesn't mark their students as known.
+        if os.path.exists(profiles_jsonl):
+            store.import_jsonl(profiles_jsonl, only_new=True)
+        if os.path.exists(enrollments_csv):
+            store.import_csv(enrollments_csv, only_new=True)
+
+        diff = sync_enrollments(course_csv, enrollments_csv, batches, max_workers=max_workers, store=store,
+                                harvester=harvester)
+        dataset = [row['enrollment'] for row in iter_enrollment_rows(enrollments_csv)]
+        profiles = sync_profiles(store, scraper, max_age=max_age, output_file=profiles_jsonl, max_workers=max_workers,
+                                 enrollments=dataset, removed=[row['enrollment'] for row in diff.removed],
+                                 batch=batches)
+    return {'added': len(diff.added), 'removed': len(diff.removed), 'changed': len(diff.changed),
+            'unchanged': diff.unchanged, **profiles}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Incrementally refresh enrollments and profiles")
+    parser.add_argument('course_csv', help="Course list, e.g. filtered.csv")
+    parser.add_argument('enrollments_csv', help="Enrollment CSV to update, e.g. enrollments23MSIT.csv")
+    parser.add_argument('profiles_jsonl', help="Profile JSONL to update, e.g. dataMSIT.json")
+    parser.add_argument('--batch', type=int, nargs='+', default=[23])
+    parser.add_argument('--max-age-days', type=float, default=90)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    delta_sync(args.course_csv, args.enrollments_csv, args.profiles_jsonl, batches=args.batch,
+               max_age=args.max_age_days * DAY, max_workers=args.workers)
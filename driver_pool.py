@@ -0,0 +1,211 @@
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+
+class PooledDriver:
+    """A Chrome driver checked out of a DriverPool, plus its bookkeeping."""
+
+    __slots__ = ('driver', 'key', 'user_agent', 'pages', 'created_at')
+
+    def __init__(self, driver, key: Optional[str], user_agent: Optional[str]):
+        self.driver = driver
+        self.key = key
+        self.user_agent = user_agent
+        self.pages = 0
+        self.created_at = time.time()
+
+
+class DriverPool:
+    """
+    Bounded pool of long-lived headless Chrome drivers.
+
+    Drivers are keyed by proxy so a worker asking for the same proxy gets a
+    warm browser back instead of paying Chrome startup again. A driver is
+    recycled after `max_pages` page loads, or immediately when the caller
+    reports it as broken.
+
+    Example:
+        pool = DriverPool(options_factory, max_size=5)
+        with pool.driver(proxy=None) as driver:
+            driver.get("https://www.ipuranklist.com/student/09518241723")
+        pool.close()
+    """
+
+    def __init__(self,
+                 options_factory: Callable[[Optional[str], Optional[str]], Options],
+                 max_size: int = 5,
+                 max_pages: int = 200,
+                 user_agent_factory: Optional[Callable[[], str]] = None,
+                 page_load_timeout: int = 15):
+        """
+        Args:
+            options_factory: Callable (proxy, user_agent) -> Chrome Options
+            max_size: Maximum number of live drivers (idle + checked out)
+            max_pages: Recycle a driver after this many page loads
+            user_agent_factory: Callable returning a user agent for a new driver
+            page_load_timeout: Page load timeout applied to every new driver
+        """
+        self.options_factory = options_factory
+        self.max_size = max_size
+        self.max_pages = max_pages
+        self.user_agent_factory = user_agent_factory
+        self.page_load_timeout = page_load_timeout
+
+        self._idle: Dict[Optional[str], List[PooledDriver]] = {}
+        self._live = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+        # Counters for the summary / benchmarks
+        self.created = 0
+        self.recycled = 0
+        self.reused = 0
+
+    def _create(self, key: Optional[str]) -> PooledDriver:
+        user_agent = self.user_agent_factory() if self.user_agent_factory else None
+        options = self.options_factory(key, user_agent)
+        driver = webdriver.Chrome(options=options)
+        driver.set_page_load_timeout(self.page_load_timeout)
+        return PooledDriver(driver, key, user_agent)
+
+    def _quit(self, pooled: PooledDriver):
+        try:
+            pooled.driver.quit()
+        except Exception:
+            pass
+
+    def _evict_idle_locked(self) -> Optional[PooledDriver]:
+        """Pop the oldest idle driver of any key (caller holds the lock)."""
+        oldest_key = None
+        oldest = None
+        for key, drivers in self._idle.items():
+            if drivers and (oldest is None or drivers[0].created_at < oldest.created_at):
+                oldest_key, oldest = key, drivers[0]
+        if oldest is None:
+            return None
+        self._idle[oldest_key].pop(0)
+        self._live -= 1
+        return oldest
+
+    def acquire(self, proxy: Optional[str] = None, timeout: Optional[float] = None) -> PooledDriver:
+        """
+        Check out a driver for `proxy`, creating one if the pool has room.
+
+        Blocks while the pool is full and every driver is in use.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        evicted = None
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("DriverPool is closed")
+
+                idle = self._idle.get(proxy)
+                if idle:
+                    self.reused += 1
+                    return idle.pop()
+
+                if self._live < self.max_size:
+                    self._live += 1
+                    break
+
+                # Pool is full: make room by dropping an idle driver bound to another proxy
+                evicted = self._evict_idle_locked()
+                if evicted is not None:
+                    self._live += 1
+                    break
+
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError("Timed out waiting for a free driver")
+                self._cond.wait(remaining)
+
+        if evicted is not None:
+            self._quit(evicted)
+
+        try:
+            pooled = self._create(proxy)
+        except Exception:
+            with self._cond:
+                self._live -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self.created += 1
+        return pooled
+
+    def release(self, pooled: PooledDriver, broken: bool = False):
+        """
+        Return a driver to the pool.
+
+        Args:
+            pooled: Driver obtained from acquire()
+            broken: True if the driver crashed or is in an unknown state
+        """
+        pooled.pages += 1
+        retire = broken or pooled.pages >= self.max_pages
+
+        with self._cond:
+            if retire or self._closed:
+                self._live -= 1
+                if retire:
+                    self.recycled += 1
+            else:
+                self._idle.setdefault(pooled.key, []).append(pooled)
+            self._cond.notify()
+
+        if retire or self._closed:
+            self._quit(pooled)
+
+    def driver(self, proxy: Optional[str] = None):
+        """Context manager yielding a raw WebDriver; marks it broken on error."""
+        return _DriverLease(self, proxy)
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            idle = sum(len(drivers) for drivers in self._idle.values())
+            return {
+                'live': self._live,
+                'idle': idle,
+                'created': self.created,
+                'reused': self.reused,
+                'recycled': self.recycled,
+            }
+
+    def close(self):
+        """Quit every idle driver; drivers still checked out are quit on release."""
+        with self._cond:
+            self._closed = True
+            to_quit = [d for drivers in self._idle.values() for d in drivers]
+            self._idle.clear()
+            self._live -= len(to_quit)
+            self._cond.notify_all()
+
+        for pooled in to_quit:
+            self._quit(pooled)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class _DriverLease:
+    def __init__(self, pool: DriverPool, proxy: Optional[str]):
+        self.pool = pool
+        self.proxy = proxy
+        self.pooled: Optional[PooledDriver] = None
+
+    def __enter__(self):
+        self.pooled = self.pool.acquire(self.proxy)
+        return self.pooled.driver
+
+    def __exit__(self, exc_type, exc, tb):
+        self.pool.release(self.pooled, broken=exc_type is not None)
+        return False
@@ -0,0 +1,250 @@
+import json
+import os
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from datastore import StudentStore
+
+DEFAULT_RATING = 1200
+K_FACTOR = 32
+
+
+def conflict_free_rounds(winners: np.ndarray, losers: np.ndarray) -> np.ndarray:
+    """
+    Round number of each match such that no player appears twice in a round.
+
+    A match goes one round after the latest earlier match of either of its
+    players, so applying the rounds in order gives exactly the same ratings as
+    applying the matches one by one.
+    """
+    last_round: Dict[int, int] = {}
+    rounds = np.empty(len(winners), dtype=np.int64)
+    for i, (w, l) in enumerate(zip(winners.tolist(), losers.tolist())):
+        r = max(last_round.get(w, -1), last_round.get(l, -1)) + 1
+        rounds[i] = r
+        last_round[w] = r
+        last_round[l] = r
+    return rounds
+
+
+class EloEngine:
+    """
+    Array-backed Elo ratings for every profile in the dataset.
+
+    Ratings and match counts are NumPy columns indexed by position; a batch of
+    (winner, loser) outcomes is applied with a handful of vectorised ops.
+    np.add.at accumulates, so a player appearing several times in one batch
+    gets every one of their updates (plain fancy-index `+=` would keep only the
+    last). With sequential=True (default) the batch is also split into
+    conflict-free rounds, giving the same result as applying the matches one
+    at a time; sequential=False rates the whole batch against its starting
+    ratings, like a rating period.
+
+    Example:
+        engine = EloEngine.from_jsonl(['data.json', 'dataMSIT.json'])
+        engine.apply(['09518241723', ...], ['00119421622', ...])
+        engine.save_jsonl(['data.json', 'dataMSIT.json'])
+    """
+
+    def __init__(self, enrollments: Sequence[str], ratings: Optional[np.ndarray] = None,
+                 matches: Optional[np.ndarray] = None, k_factor: float = K_FACTOR, sequential: bool = True):
+        """
+        Args:
+            enrollments: Enrollment number of each position
+            ratings: Initial ratings (default: 1200 each)
+            matches: Initial match counts (default: 0 each)
+            k_factor: Max rating change per match
+            sequential: Apply repeated players in batch order (see class docstring)
+        """
+        self.enrollments = list(enrollments)
+        self.position = {enrollment: i for i, enrollment in enumerate(self.enrollments)}
+        n = len(self.enrollments)
+        self.ratings = np.full(n, DEFAULT_RATING, dtype=np.float64) if ratings is None else np.asarray(ratings, dtype=np.float64).copy()
+        self.matches = np.zeros(n, dtype=np.int64) if matches is None else np.asarray(matches, dtype=np.int64).copy()
+        self.k_factor = k_factor
+        self.sequential = sequential
+
+        self._listeners: List[Callable[[np.ndarray], None]] = []
+        self.stats = {'matches_applied': 0, 'batches': 0, 'seconds': 0.0}
+
+    def __len__(self) -> int:
+        return len(self.enrollments)
+
+    @classmethod
+    def from_records(cls, records: Iterable[dict], **kwargs) -> 'EloEngine':
+        enrollments, ratings, matches = [], [], []
+        for record in records:
+            enrollment = str(record.get('enrollment'))
+            if not enrollment.isdigit():
+                continue  # stray CSV header row
+            enrollments.append(enrollment)
+            ratings.append(record.get('elo', DEFAULT_RATING))
+            matches.append(record.get('matches', 0))
+        return cls(enrollments, np.array(ratings, dtype=np.float64), np.array(matches, dtype=np.int64), **kwargs)
+
+    @classmethod
+    def from_jsonl(cls, paths: Iterable[str], **kwargs) -> 'EloEngine':
+        """Load every profile of data.json-style files (first occurrence of an enrollment wins)"""
+        def records():
+            seen = set()
+            for path in paths:
+                with open(path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        record = json.loads(line)
+                        if record.get('enrollment') not in seen:
+                            seen.add(record.get('enrollment'))
+                            yield record
+        return cls.from_records(records(), **kwargs)
+
+    @classmethod
+    def from_store(cls, store: StudentStore, k_factor: float = K_FACTOR, sequential: bool = True,
+                   **filters) -> 'EloEngine':
+        """Load the students matching `filters` (see StudentStore.query)"""
+        return cls.from_records(store.iter_query(**filters), k_factor=k_factor, sequential=sequential)
+
+    def subscribe(self, callback: Callable[[np.ndarray], None]):
+        """Call `callback(positions)` with the positions whose rating changed after each batch"""
+        self._listeners.append(callback)
+
+    def positions(self, enrollments: Iterable[str]) -> np.ndarray:
+        """Positions of enrollment numbers (KeyError for unknown ones)"""
+        position = self.position
+        return np.fromiter((position[e] for e in enrollments), dtype=np.int64)
+
+    def _apply_round(self, winners: np.ndarray, losers: np.ndarray):
+        ratings = self.ratings
+        expected = 1.0 / (1.0 + 10.0 ** ((ratings[losers] - ratings[winners]) / 400.0))
+        delta = self.k_factor * (1.0 - expected)
+        np.add.at(ratings, winners, delta)
+        np.add.at(ratings, losers, -delta)
+
+    def apply_positions(self, winners: np.ndarray, losers: np.ndarray) -> np.ndarray:
+        """
+        Apply a batch of outcomes given as positions.
+
+        Returns:
+            Positions whose rating changed
+
+        Raises:
+            ValueError: Lengths differ, or a match has the same student on both sides
+        """
+        start = time.perf_counter()
+        winners = np.asarray(winners, dtype=np.int64)
+        losers = np.asarray(losers, dtype=np.int64)
+        if len(winners) != len(losers):
+            raise ValueError("winners and losers must have the same length")
+        self_matches = np.flatnonzero(winners == losers)
+        if len(self_matches):
+            raise ValueError(f"match {int(self_matches[0])} has position {int(winners[self_matches[0]])} on both sides")
+        if len(winners) == 0:
+            return np.array([], dtype=np.int64)
+
+        if self.sequential:
+            rounds = conflict_free_rounds(winners, losers)
+            order = np.argsort(rounds, kind='stable')
+            bounds = np.searchsorted(rounds[order], np.arange(rounds.max() + 2))
+            for lo, hi in zip(bounds[:-1], bounds[1:]):
+                idx = order[lo:hi]
+                self._apply_round(winners[idx], losers[idx])
+        else:
+            self._apply_round(winners, losers)
+
+        np.add.at(self.matches, winners, 1)
+        np.add.at(self.matches, losers, 1)
+
+        changed = np.unique(np.concatenate([winners, losers]))
+        self.stats['matches_applied'] += len(winners)
+        self.stats['batches'] += 1
+        self.stats['seconds'] += time.perf_counter() - start
+
+        for callback in self._listeners:
+            callback(changed)
+        return changed
+
+    def apply(self, winners: Iterable[str], losers: Iterable[str]) -> np.ndarray:
+        """Apply a batch of (winner, loser) outcomes given as enrollment numbers"""
+        return self.apply_positions(self.positions(winners), self.positions(losers))
+
+    def apply_match_log(self, path: str, batch_size: int = 100_000) -> int:
+        """
+        Apply a CSV of `winner,loser` enrollment pairs in batches.
+
+        Returns:
+            Number of matches applied
+        """
+        applied = 0
+        winners, losers = [], []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                parts = line.strip().split(',')
+                if len(parts) < 2 or not parts[0].isdigit():
+                    continue
+                winners.append(parts[0])
+                losers.append(parts[1])
+                if len(winners) >= batch_size:
+                    self.apply(winners, losers)
+                    applied += len(winners)
+                    winners, losers = [], []
+        if winners:
+            self.apply(winners, losers)
+            applied += len(winners)
+        return applied
+
+    def rating(self, enrollment: str) -> Tuple[float, int]:
+        i = self.position[enrollment]
+        return float(self.ratings[i]), int(self.matches[i])
+
+    def throughput(self) -> dict:
+        """Matches applied so far and updates per second of engine time"""
+        seconds = self.stats['seconds']
+        return {
+            **self.stats,
+            'seconds': round(seconds, 4),
+            'updates_per_s': round(self.stats['matches_applied'] / seconds, 1) if seconds else None,
+        }
+
+    def save_store(self, store: StudentStore) -> int:
+        """Write (rounded) ratings and match counts back to a StudentStore"""
+        return store.update_ratings(zip(self.enrollments, np.rint(self.ratings).astype(np.int64).tolist(),
+                                        self.matches.tolist()))
+
+    def save_jsonl(self, paths: Iterable[str]) -> int:
+        """
+        Write ratings back into data.json-style files (temp file + os.replace).
+
+        Returns:
+            Number of records updated
+        """
+        ratings = np.rint(self.ratings).astype(np.int64)
+        updated = 0
+        for path in paths:
+            tmp_path = f"{path}.tmp"
+            with open(path, 'r', encoding='utf-8') as src, open(tmp_path, 'w', encoding='utf-8') as dst:
+                for line in src:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    i = self.position.get(record.get('enrollment'))
+                    if i is not None:
+                        record['elo'] = int(ratings[i])
+                        record['matches'] = int(self.matches[i])
+                        updated += 1
+                    dst.write(json.dumps(record, ensure_ascii=False) + "\n")
+            os.replace(tmp_path, path)
+        return updated
+
+
+if __name__ == "__main__":
+    # Synthetic load test: random pairs over the real profile set
+    engine = EloEngine.from_jsonl(['data.json', 'dataMSIT.json'])
+    rng = np.random.default_rng(0)
+    n = len(engine)
+    for _ in range(10):
+        winners = rng.integers(0, n, 100_000)
+        losers = (winners + rng.integers(1, n, 100_000)) % n
+        engine.apply_positions(winners, losers)
+    print(f"⚡ {len(engine)} players: {engine.throughput()}")
@@ -0,0 +1,38 @@
+import csv
+from typing import Dict, Iterator
+
+FIELDS = ('enrollment', 'course', 'batch', 'college', 'branch')
+
+
+def iter_enrollment_rows(csv_file: str) -> Iterator[Dict[str, str]]:
+    """
+    Stream rows of an enrollments CSV as dicts.
+
+    Handles both layouts in the repo: with the "Enrollment Number,Course,Batch,
+    College ID,Branch" header (enrollments22.csv) and without one
+    (enrollments24MSIT.csv). A row whose enrollment isn't numeric is treated as
+    a header and skipped.
+
+    Yields:
+        Dicts with keys enrollment, course, batch, college, branch
+    """
+    with open(csv_file, mode='r', newline='', encoding='utf-8') as file:
+        reader = csv.reader(file)
+        for row in reader:
+            if len(row) < len(FIELDS):
+                continue
+            values = [value.strip() for value in row[:len(FIELDS)]]
+            if not values[0].isdigit():
+                continue
+            yield dict(zip(FIELDS, values))
+
+
+def iter_enrollment_ids(csv_file: str) -> Iterator[str]:
+    """Stream just the enrollment numbers of an enrollments CSV"""
+    for row in iter_enrollment_rows(csv_file):
+        yield row['enrollment']
+
+
+def combo_key(course: str, batch: str, college: str, branch: str) -> str:
+    """course|batch|college|branch key used by the image availability report"""
+    return f"{course}|{batch}|{college}|{branch}"
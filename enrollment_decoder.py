@@ -0,0 +1,157 @@
+from typing import Dict, Iterable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from enrollment_csv import FIELDS
+
+# Enrollment number layout, e.g. 03961101722 -> roll 039 | institution 611 | program 017 | batch 22
+ENROLLMENT_LENGTH = 11
+SEGMENTS = {
+    'roll': (0, 3),
+    'institution': (3, 6),
+    'program': (6, 9),
+    'batch_code': (9, 11),
+}
+
+
+def read_enrollments(csv_file: str) -> pd.DataFrame:
+    """
+    Load an enrollments CSV (with or without header) as string columns.
+
+    Header rows are recognised the same way as enrollment_csv does: a row whose
+    enrollment isn't numeric is dropped. Files with fewer columns (e.g. just
+    enrollment numbers) get the missing FIELDS as empty strings.
+    """
+    df = pd.read_csv(csv_file, header=None, dtype=str, keep_default_na=False).iloc[:, :len(FIELDS)]
+    df.columns = list(FIELDS[:len(df.columns)])
+    df = df.reindex(columns=list(FIELDS), fill_value='')
+    df = df.apply(lambda column: column.str.strip())
+    return df[df['enrollment'].str.fullmatch(r'\d+')].reset_index(drop=True)
+
+
+def rows_to_frame(rows: Iterable[Dict[str, str]]) -> pd.DataFrame:
+    """Enrollment rows (dicts keyed by FIELDS, e.g. from StudentStore) as a frame shaped like read_enrollments"""
+    df = pd.DataFrame.from_records(list(rows), columns=list(FIELDS)).fillna('').astype(str)
+    for column in FIELDS:
+        df[column] = df[column].str.strip()
+    return df[df['enrollment'].str.fullmatch(r'\d+')].reset_index(drop=True)
+
+
+def shard_keys(values: pd.Series) -> np.ndarray:
+    """
+    Stable uint64 hash per value.
+
+    pd.util.hash_pandas_object uses a fixed hash key, so the same value maps
+    to the same key on every run, process and machine.
+    """
+    return pd.util.hash_pandas_object(values.astype(str), index=False).to_numpy()
+
+
+def decode_enrollments(enrollments: pd.Series) -> pd.DataFrame:
+    """
+    Split a whole column of enrollment numbers into their segments at once.
+
+    Returns:
+        DataFrame with roll, institution, program, batch_code (strings) and
+        valid_format (exactly 11 digits), aligned with `enrollments`
+    """
+    enrollments = enrollments.astype(str).str.strip()
+    decoded = pd.DataFrame({'valid_format': enrollments.str.fullmatch(r'\d{%d}' % ENROLLMENT_LENGTH)},
+                           index=enrollments.index)
+    for name, (start, end) in SEGMENTS.items():
+        decoded[name] = enrollments.str.slice(start, end)
+    return decoded
+
+
+def decode_frame(df: pd.DataFrame, n_shards: int = 1, shard_by: str = 'enrollment') -> pd.DataFrame:
+    """
+    Decode and validate an enrollments frame (columns as in enrollment_csv.FIELDS).
+
+    Adds the decoded segments plus:
+        institution_match: institution code equals the college column (or it is empty)
+        batch_match: batch code equals the batch column (or it is empty)
+        lateral_entry: batch code is the year after the batch column (second-year entrants)
+        valid: all of the above and a well-formed number
+        shard_key: stable uint64 hash of the enrollment number, or of the
+            course|batch|college|branch combo with shard_by='combo' (keeps a
+            combo on one worker, as the availability scanner needs)
+        shard: shard_key % n_shards
+    """
+    decoded = decode_enrollments(df['enrollment'])
+    out = pd.concat([df, decoded], axis=1)
+
+    # College IDs are written without leading zeros in some CSVs (e.g. "63" for 063)
+    # An empty column (enrollment-only files) has nothing to mismatch
+    out['institution_match'] = (out['college'] == '') | (out['institution'] == out['college'].str.zfill(3))
+    out['batch_match'] = (out['batch'] == '') | (out['batch_code'] == out['batch'].str.zfill(2))
+    # Lateral-entry students join in the second year and are listed with the batch before their code
+    next_batch = (pd.to_numeric(out['batch'], errors='coerce') + 1).astype('Int64').astype(str).str.zfill(2)
+    out['lateral_entry'] = ~out['batch_match'] & (out['batch_code'] == next_batch)
+    out['valid'] = (out['valid_format'] & out['institution_match']
+                    & (out['batch_match'] | out['lateral_entry']))
+
+    if shard_by == 'combo':
+        out['shard_key'] = shard_keys(out['course'] + '|' + out['batch'] + '|' + out['college'] + '|' + out['branch'])
+    elif shard_by == 'enrollment':
+        out['shard_key'] = shard_keys(out['enrollment'])
+    else:
+        raise ValueError(f"shard_by must be 'enrollment' or 'combo', not {shard_by!r}")
+    out['shard'] = (out['shard_key'] % np.uint64(max(n_shards, 1))).astype(np.int64)
+    return out
+
+
+def validation_report(decoded: pd.DataFrame) -> Dict[str, int]:
+    """Counts of each problem in a frame from decode_frame"""
+    return {
+        'rows': len(decoded),
+        'valid': int(decoded['valid'].sum()),
+        'malformed': int((~decoded['valid_format']).sum()),
+        'institution_mismatch': int((decoded['valid_format'] & ~decoded['institution_match']).sum()),
+        'lateral_entry': int(decoded['lateral_entry'].sum()),
+        'batch_mismatch': int((decoded['valid_format'] & ~decoded['batch_match'] & ~decoded['lateral_entry']).sum()),
+    }
+
+
+def iter_valid_rows(csv_file: str, shard: Optional[int] = None, n_shards: int = 1,
+                    drop_invalid: bool = True, shard_by: str = 'enrollment',
+                    rows: Optional[Iterable[Dict[str, str]]] = None) -> Iterator[Dict[str, str]]:
+    """
+    Rows of an enrollments CSV, decoded and filtered in one vectorised pass.
+
+    Yields dicts shaped like enrollment_csv.iter_enrollment_rows, so it can
+    feed the scrapers and the availability scanner directly. Pass `rows`
+    (e.g. StudentStore.iter_enrollment_rows()) to filter those instead of the CSV.
+
+    Args:
+        csv_file: Enrollments CSV (only used as a label when `rows` is given)
+        shard: Only yield rows of this shard (None: all shards)
+        n_shards: Number of shards work is split into
+        drop_invalid: Skip malformed / mismatched enrollment numbers
+        shard_by: 'enrollment' or 'combo' (see decode_frame)
+        rows: Optional rows to use instead of reading `csv_file`
+    """
+    frame = read_enrollments(csv_file) if rows is None else rows_to_frame(rows)
+    decoded = decode_frame(frame, n_shards=n_shards, shard_by=shard_by)
+    report = validation_report(decoded)
+    keep = pd.Series(True, index=decoded.index)
+    if drop_invalid:
+        keep &= decoded['valid']
+    if shard is not None:
+        keep &= decoded['shard'] == shard
+
+    print(f"🔢 {csv_file}: {report} -> {int(keep.sum())} rows"
+          + (f" in shard {shard}/{n_shards}" if shard is not None else ""))
+    for row in decoded.loc[keep, list(FIELDS)].itertuples(index=False):
+        yield dict(zip(FIELDS, row))
+
+
+if __name__ == "__main__":
+    import sys
+
+    for csv_file in sys.argv[1:] or ['enrollments22.csv']:
+        frame = decode_frame(read_enrollments(csv_file))
+        print(f"{csv_file}: {validation_report(frame)}")
+        bad = frame[~frame['valid']]
+        if len(bad):
+            print(bad[list(FIELDS) + ['institution', 'batch_code']].head(10).to_string(index=False))
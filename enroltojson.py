@@ -1,100 +1,135 @@
-import csv
-import json
-import os
 from dotenv import load_dotenv
-from extract_student_image import extract_student_image_and_name,ProxyScraper
+from availability_index import AvailabilityIndex
+from datastore import StudentStore
+from extract_student_image import ProxyScraper
+from enrollment_csv import combo_key
+from enrollment_decoder import iter_valid_rows
+from gender_classifier import GenderClassifier, GroqGenderBackend, backfill_genders
+from jsonl_writer import BufferedJsonlWriter
+from scrape_cache import ScrapeCache
 import time
 
 load_dotenv()
-# --------- 1️⃣  Groq client ---------------------------------
-# Make sure you have installed: pip install groq
-# and set your API key either as an env var or hard‑code it here.
-try:
-    from groq import Groq
-except ImportError:
-    raise RuntimeError(
-        "The Groq Python library is required. Install it with:\n"
-        "    pip install groq"
-    )
-
-# Prefer environment variable, but you can also hard‑code for quick testing
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-if not GROQ_API_KEY:
-    raise RuntimeError(
-        "GROQ_API_KEY not found. Set it in your environment, e.g.:\n"
-        "    export GROQ_API_KEY='your‑key-here'"
-    )
-
-groq_client = Groq(api_key=GROQ_API_KEY)
+# --------- 1️⃣  Gender classifier ---------------------------
+# Names are classified once the scrape is done: first names are deduplicated
+# across the whole output, answered from gender_cache.json where possible, and
+# only the unknown ones are sent to Groq (pip install groq, GROQ_API_KEY in env / .env).
+_gender_classifier = None
+
+
+def get_gender_classifier() -> GenderClassifier:
+    global _gender_classifier
+    if _gender_classifier is None:
+        _gender_classifier = GenderClassifier(backend=GroqGenderBackend())
+    return _gender_classifier
 
 # --------- 2️⃣  Helper to detect gender ---------------------
 def detect_gender_from_name(name: str) -> str | None:
     """
-    Uses Groq’s llama‑8.1‑8b to determine the gender of a name.
+    Determine the gender of a single name via the shared GenderClassifier.
     Returns one of: 'male', 'female', or None for ambiguous/unknown.
     """
-    # A short prompt that is unlikely to trigger hallucinations
-    prompt = (
-        f"Given the full name '{name}', answer with only one of the words: "
-        "'male', 'female', or 'unknown'. Do not add any additional text."
-    )
-
-    try:
-        response = groq_client.chat.completions.create(
-            model="llama-3.1-8b-instant",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.0,          # deterministic answer
-            max_tokens=10,             # we expect a short reply
-            stop=None,
-        )
-        # The response comes back as a list of choices; take the first token
-        gender_raw = response.choices[0].message.content.strip().lower()
-
-        # Normalise the output
-        if gender_raw in {"male", "female"}:
-            return gender_raw
-        return None
-
-    except Exception as exc:  # pragma: no cover
-        # Log the exception if you have a logger; here we just print
-        print(f"[WARN] Gender detection failed for '{name}': {exc}")
-        return None
-
-#scraper = ProxyScraper(max_workers = 5)
-# --------- 3️⃣  Main loop -------------------------------------
-with open("enrollments24MSIT.csv", mode="r", newline="", encoding="utf-8") as file:
-    reader = csv.reader(file)
-    # Skip header if present (uncomment the next line)
-    # next(reader, None)
-
-    for row in reader:
-        # Assuming CSV layout: enrollment,course,batch,college,branch
-        college = row[3]
-        course = row[1]
-        batch = row[2]
-        branch = row[4]
-        enrollment = row[0]
-
-        image, name = extract_student_image_and_name(row[0])
-
-        # Detect gender
-        gender = detect_gender_from_name(name)
-
-        data = {
-            "name": name,
-            "image": image,
-            "college": college,
-            "course": course,
-            "batch": batch,
-            "branch": branch,
-            "enrollment": enrollment,
-            "elo": 1200,
-            "matches": 0,
-            "gender": gender,
-        }
-
-        # Append a JSON line per student
-        with open("dataMSIT.json", mode="a", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False)
-            f.write("\n")
+    return get_gender_classifier().classify(name)
+
+# --------- 3️⃣  Pipeline stage -------------------------------
+def build_record(row: dict, image: str | None, name: str | None) -> dict:
+    """Output schema (see scraping_pipeline.md, Phase 5)"""
+    return {
+        "name": name,
+        "image": image,
+        "college": row["college"],
+        "course": row["course"],
+        "batch": row["batch"],
+        "branch": row["branch"],
+        "enrollment": row["enrollment"],
+        "elo": 1200,
+        "matches": 0,
+        "gender": None,
+    }
+
+
+def enrollments_to_json(csv_file: str = "enrollments24MSIT.csv",
+                        output_file: str = "dataMSIT.json",
+                        max_workers: int = 5,
+                        batch_size: int = 50,
+                        scraper: ProxyScraper | None = None,
+                        gender_classifier: GenderClassifier | None = None,
+                        store: StudentStore | None = None,
+                        shard: int | None = None,
+                        n_shards: int = 1) -> int:
+    """
+    Scrape every enrollment in `csv_file` and append one JSON line per student.
+
+    Restartable: enrollments already in the output are skipped, so re-running
+    after a crash only processes the remaining rows; profiles that failed to
+    load (no name and no image) are not written, so the next run retries them.
+    Rows are validated in one vectorised pass (iter_valid_rows), so malformed
+    or mismatched enrollment numbers never reach the scraper, then streamed
+    through ProxyScraper.scrape_iter (bounded in-flight window) into a single
+    buffered writer that flushes `batch_size` records at a time. Genders are
+    filled in afterwards for the whole output at once, so classification never
+    holds up the writer and each distinct first name is looked up once. With a
+    StudentStore, each batch is also upserted into it. With `shard` set, only
+    that shard's enrollments are scraped (run one process or machine per shard,
+    each with its own output file).
+
+    Returns:
+        Number of records written in this run (failed profiles not included)
+    """
+    own_scraper = scraper is None
+    if own_scraper:
+        scraper = ProxyScraper(max_workers=max_workers, cache=ScrapeCache(),
+                               availability=AvailabilityIndex.load())
+
+    gender_classifier = gender_classifier or get_gender_classifier()
+
+    on_flush = store.upsert_profiles if store is not None else None
+
+    start_time = time.time()
+    with BufferedJsonlWriter(output_file, batch_size=batch_size, on_flush=on_flush) as writer:
+        print(f"▶ Resuming with {len(writer.done)} enrollments already done")
+
+        # Rows currently being scraped, so results can be joined back to their CSV columns
+        in_flight = {}
+        failed = 0
+
+        def pending_ids():
+            for row in iter_valid_rows(csv_file, shard=shard, n_shards=n_shards):
+                enrollment = row["enrollment"]
+                if writer.is_done(enrollment) or enrollment in in_flight:
+                    continue
+                in_flight[enrollment] = row
+                yield enrollment
+
+        def combo_of(enrollment):
+            row = in_flight[enrollment]
+            return combo_key(row["course"], row["batch"], row["college"], row["branch"])
+
+        try:
+            for enrollment, image, name in scraper.scrape_iter(pending_ids(), combo_of=combo_of):
+                row = in_flight.pop(enrollment)
+                if name is None and image is None:
+                    failed += 1  # left out of the output so a re-run retries it
+                    continue
+                writer.write(build_record(row, image, name))
+        finally:
+            if scraper.availability is not None:
+                scraper.availability.save()
+            if own_scraper:
+                scraper.close()
+
+    written = writer.written  # read after close: the last batch is flushed there
+
+    def store_genders(records):
+        store.update_genders((record['enrollment'], record['gender']) for record in records)
+
+    backfill_genders(output_file, gender_classifier, on_filled=store_genders if store is not None else None)
+    elapsed = time.time() - start_time
+    print(f"✅ Wrote {written} records to {output_file} in {elapsed:.1f}s")
+    if failed:
+        print(f"⚠️  {failed} profiles failed to load; re-run to retry them")
+    return written
+
 
+if __name__ == "__main__":
+    enrollments_to_json("enrollments24MSIT.csv", "dataMSIT.json")
@@ -1,14 +1,23 @@
 import time
 import requests
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from selenium.common.exceptions import WebDriverException
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+import atexit
 import random
-from typing import Optional, Tuple, List
+import threading
+from typing import Callable, Iterable, Iterator, Optional, Tuple, List
+from availability_index import AvailabilityIndex
+from driver_pool import DriverPool
+from http_fetcher import BASE_URL, StaticProfileFetcher, is_throttling, looks_like_name
+from image_downloader import stream_to_file
+from proxy_pool import ProxyPool
+from rate_limiter import AdaptiveRateLimiter, default_limiter
+from scrape_cache import ScrapeCache
 
 # Global scraper instance for simple function calls
 _global_scraper = None
@@ -36,21 +45,73 @@ def extract_student_image_and_name(enrollment_id: str) -> Tuple[Optional[str], O
     global _global_scraper
     if _global_scraper is None:
         _global_scraper = ProxyScraper(max_workers=4)
+        atexit.register(_global_scraper.close)
     
     return _global_scraper.extract_student_image_and_name(enrollment_id)
 
 
 class ProxyScraper:
-    def __init__(self, proxies: List[str] = None, max_workers: int = 5):
+    def __init__(self, proxies: List[str] = None, max_workers: int = 5, max_pages_per_driver: int = 200,
+                 use_http: bool = True, base_url: str = BASE_URL, cache: Optional[ScrapeCache] = None,
+                 rate_limiter: Optional[AdaptiveRateLimiter] = None, proxy_pool: Optional[ProxyPool] = None,
+                 availability: Optional[AvailabilityIndex] = None, use_selenium: bool = True):
         """
         Initialize the scraper with optional proxies and parallel workers
         
         Args:
             proxies: List of proxy addresses (e.g., ['http://proxy1:port', 'http://proxy2:port'])
             max_workers: Number of parallel threads (default: 5)
+            max_pages_per_driver: Recycle a pooled Chrome after this many pages (default: 200)
+            use_http: Try a plain HTTP fetch before falling back to Selenium (default: True)
+            base_url: Site root, overridable for local testing
+            cache: Optional ScrapeCache consulted before (and filled after) every lookup
+            rate_limiter: AdaptiveRateLimiter every fetch goes through (default: shared instance)
+            proxy_pool: ProxyPool to share with other scrapers (default: one built from `proxies`)
+            availability: Optional AvailabilityIndex; shortens the image wait for imageless combos
+            use_selenium: Render pages in Chrome when the static HTML lacks the profile (default: True);
+                turn off for HTTP-only runs such as benchmark.py, where such lookups are retried instead
         """
-        self.proxies = proxies or []
+        self._own_proxy_pool = proxy_pool is None
+        self.proxy_pool = proxy_pool or ProxyPool(proxies or [], probe_url=base_url)
+        self.proxies = self.proxy_pool.proxies
         self.max_workers = max_workers
+        self.use_http = use_http
+        self.use_selenium = use_selenium
+        self.cache = cache
+        self.rate_limiter = rate_limiter or default_limiter
+        self.availability = availability
+        
+        # Browser-free fast path; Chrome is only used when the static HTML lacks the data
+        self.http_fetcher = StaticProfileFetcher(pool_size=max(max_workers, 10), base_url=base_url)
+        self.stats = {
+            'http_ok': 0,          # static HTML had the profile
+            'http_incomplete': 0,  # static HTML fetched but no name in it
+            'http_error': 0,       # HTTP request failed
+            'fallback': 0,         # lookups handed to Selenium after trying HTTP
+            'selenium': 0,         # Selenium page loads (fallbacks + use_http=False)
+        }
+        self._stats_lock = threading.Lock()
+        
+        # One warm Chrome per worker, reused across students and retries
+        self.driver_pool = DriverPool(
+            self.get_chrome_options,
+            max_size=max_workers,
+            max_pages=max_pages_per_driver,
+            user_agent_factory=self.get_random_user_agent,
+        )
+
+    def close(self):
+        """Shut down every pooled Chrome driver, the HTTP session and the proxy prober"""
+        self.driver_pool.close()
+        self.http_fetcher.close()
+        if self._own_proxy_pool:
+            self.proxy_pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
         
     def get_chrome_options(self, proxy: Optional[str] = None, user_agent: Optional[str] = None) -> Options:
         """Create optimized Chrome options"""
@@ -97,35 +158,62 @@ class ProxyScraper:
         ]
         return random.choice(user_agents)
 
-    def extract_student_data(self, student_id: str, retry_count: int = 2) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    def _record(self, counter: str):
+        with self._stats_lock:
+            self.stats[counter] += 1
+
+    def _extract_with_http(self, student_id: str, proxy: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
         """
-        Extract student image URL and name with retry logic
-        
-        Returns:
-            Tuple of (student_id, image_url, name)
+        Fast path: plain HTTP fetch + HTML parse, no browser
+
+        Returns (image_url, name) of a page that loaded, either possibly None.
+        Raises the requests exception when the fetch itself failed, after
+        reporting it to the rate limiter and proxy pool.
         """
-        url = f"https://www.ipuranklist.com/student/{student_id}"
-        proxy = random.choice(self.proxies) if self.proxies else None
-        
-        for attempt in range(retry_count + 1):
-            driver = None
+        with self.rate_limiter.request(self.http_fetcher.student_url(student_id)) as slot:
+            start = time.time()
             try:
-                # Setup Chrome with options
-                chrome_options = self.get_chrome_options(
-                    proxy=proxy,
-                    user_agent=self.get_random_user_agent()
+                image_url, name = self.http_fetcher.fetch(
+                    student_id, proxy=proxy, user_agent=self.get_random_user_agent()
                 )
-                
-                driver = webdriver.Chrome(options=chrome_options)
-                driver.set_page_load_timeout(15)  # Timeout after 15 seconds
-                
+                self.proxy_pool.report(proxy, ok=True, latency=time.time() - start)
+            except requests.RequestException as e:
+                self._record('http_error')
+                if is_throttling(e):
+                    slot.throttled()
+                    self.proxy_pool.report(proxy, ok=False)
+                else:
+                    # The proxy delivered the site's answer (404, 403...): not its fault
+                    slot.error()
+                    self.proxy_pool.report(proxy, ok=True, latency=time.time() - start)
+                raise
+
+        self._record('http_ok' if name else 'http_incomplete')
+        return image_url, name
+
+    def _extract_with_selenium(self, url: str, proxy: Optional[str], image_wait: float = 5) -> Tuple[Optional[str], Optional[str]]:
+        """Slow path: render the page in a pooled Chrome (waiting up to `image_wait`s for the image)"""
+        self._record('selenium')
+        pooled = self.driver_pool.acquire(proxy)
+        broken = False
+        try:
+            driver = pooled.driver
+            with self.rate_limiter.request(url) as slot:
                 # Navigate to URL
-                driver.get(url)
-                
+                start = time.time()
+                try:
+                    driver.get(url)
+                except WebDriverException:
+                    # Timed out or crashed mid-load: don't hand this driver to the next student
+                    broken = True
+                    self.proxy_pool.report(proxy, ok=False)
+                    raise
+                load_time = time.time() - start
+            
                 # Try to extract image URL (but don't fail if unavailable)
                 image_url = None
                 try:
-                    wait = WebDriverWait(driver, 5)  # Shorter timeout for image
+                    wait = WebDriverWait(driver, image_wait)  # Shorter timeout for image
                     img_element = wait.until(
                         EC.presence_of_element_located((By.CSS_SELECTOR, "img[src*='assets.ipuranklist.com']"))
                     )
@@ -133,7 +221,7 @@ class ProxyScraper:
                 except:
                     # Image not found, but continue to extract name
                     pass
-                
+            
                 # Extract name (this should always work if page loaded)
                 name = None
                 try:
@@ -142,11 +230,77 @@ class ProxyScraper:
                     all_tds = driver.find_elements(By.TAG_NAME, "td")
                     for td in all_tds:
                         text = td.text.strip()
-                        if text and 5 < len(text) < 50 and text.replace(' ', '').isalpha():
+                        if looks_like_name(text):
                             name = text
                             break
                 except:
                     pass
+            
+                if not image_url and not name:
+                    # A blank page is usually the site pushing back (or a bad proxy)
+                    slot.throttled()
+                self.proxy_pool.report(proxy, ok=bool(image_url or name), latency=load_time)
+            return image_url, name
+        finally:
+            self.driver_pool.release(pooled, broken=broken)
+
+    def extract_student_data(self, student_id: str, retry_count: int = 2,
+                             combo: Optional[str] = None) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+        """
+        Extract student image URL and name with retry logic
+        
+        Answers from the scrape cache when it holds a fresh result; otherwise
+        scrapes the page and stores the outcome if it loaded.
+        
+        Args:
+            student_id: Student enrollment/ID number
+            retry_count: Extra attempts after the first
+            combo: The student's course|batch|college|branch key, used with the availability index
+        
+        Returns:
+            Tuple of (student_id, image_url, name)
+        """
+        if self.cache is not None:
+            cached = self.cache.get(student_id)
+            if cached is not None:
+                return cached
+        
+        result = self._scrape_student_data(student_id, retry_count, combo)
+        
+        if self.cache is not None:
+            self.cache.put(*result)
+        return result
+
+    def _scrape_student_data(self, student_id: str, retry_count: int,
+                             combo: Optional[str] = None) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+        """
+        Scrape one student page, bypassing the cache
+        
+        Tries the HTTP fast path first (when use_http is on) and only renders the
+        page in Chrome when it loaded but the static HTML doesn't contain the
+        student's name. A failed fetch is retried (the rate limiter has already
+        backed off) rather than rendered; 4xx other than 429 is not retried.
+        """
+        url = self.http_fetcher.student_url(student_id)
+        proxy = self.proxy_pool.choose()
+        availability = self.availability if combo is not None else None
+        
+        for attempt in range(retry_count + 1):
+            try:
+                image_url, name = None, None
+                if self.use_http:
+                    image_url, name = self._extract_with_http(student_id, proxy)
+                
+                # Page loaded but its static HTML lacks the profile: render it
+                if not name and self.use_selenium:
+                    if self.use_http:
+                        self._record('fallback')
+                    image_wait = availability.image_wait(combo) if availability is not None else 5
+                    image_url, name = self._extract_with_selenium(url, proxy, image_wait)
+                
+                # A loaded profile is evidence about its whole combo
+                if availability is not None and name:
+                    availability.record(combo, bool(image_url))
                 
                 # Determine success level and log accordingly
                 if image_url and name:
@@ -163,30 +317,71 @@ class ProxyScraper:
                     raise Exception("Could not extract name or image")
                 
             except Exception as e:
+                if isinstance(e, requests.RequestException) and not is_throttling(e):
+                    print(f"✗ FAILED {student_id}: {e}")
+                    return student_id, None, None
                 if attempt < retry_count:
+                    # No fixed sleep: the rate limiter has already backed off for this host
                     print(f"⚠ Retry {attempt + 1}/{retry_count} for {student_id}")
-                    time.sleep(1)
-                    # Try different proxy on retry
-                    proxy = random.choice(self.proxies) if self.proxies else None
+                    # Try different proxy on retry (health-weighted, skipping quarantined ones)
+                    proxy = self.proxy_pool.choose()
                 else:
                     print(f"✗ FAILED {student_id}: Could not load page or extract data")
                     return student_id, None, None
-            
-            finally:
-                if driver:
-                    try:
-                        driver.quit()
-                    except:
-                        pass
         
         return student_id, None, None
 
-    def scrape_multiple(self, student_ids: List[str]) -> List[Tuple[str, Optional[str], Optional[str]]]:
+    def fetch_stats(self) -> dict:
+        """Snapshot of how lookups were served (HTTP fast path vs Selenium fallback)"""
+        with self._stats_lock:
+            return dict(self.stats)
+
+    def scrape_iter(self, student_ids: Iterable[str], window: Optional[int] = None,
+                    combo_of: Optional[Callable[[str], Optional[str]]] = None) -> Iterator[Tuple[str, Optional[str], Optional[str]]]:
+        """
+        Scrape student IDs in parallel, yielding results as they complete
+        
+        IDs are pulled lazily from `student_ids` (e.g. a CSV reader) and at most
+        `window` lookups are in flight, so memory stays flat on any input size.
+        
+        Args:
+            student_ids: Any iterable of student IDs
+            window: Max in-flight lookups (default: 2 x max_workers)
+            combo_of: Optional callable mapping a student ID to its combo key (see availability)
+            
+        Yields:
+            Tuples (student_id, image_url, name) in completion order
+        """
+        window = window or self.max_workers * 2
+        ids = iter(student_ids)
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+
+        def submit(student_id):
+            combo = combo_of(student_id) if combo_of is not None else None
+            return executor.submit(self.extract_student_data, student_id, combo=combo)
+
+        try:
+            pending = {submit(student_id) for student_id in islice(ids, window)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    # Refill the window before handing the result to the consumer
+                    for student_id in islice(ids, 1):
+                        pending.add(submit(student_id))
+                    yield future.result()
+        finally:
+            # Consumer stopped early (or failed): drop queued lookups, finish running ones
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def scrape_multiple(self, student_ids: List[str],
+                        baseline: Optional[float] = None) -> List[Tuple[str, Optional[str], Optional[str]]]:
         """
         Scrape multiple student IDs in parallel
         
         Args:
             student_ids: List of student IDs to scrape
+            baseline: Seconds per student of a reference run (e.g. a benchmark.py result's
+                seconds_per_item) to report the speed-up against; no comparison when None
             
         Returns:
             List of tuples (student_id, image_url, name)
@@ -196,17 +391,8 @@ class ProxyScraper:
         
         print(f"Starting parallel scraping of {len(student_ids)} students with {self.max_workers} workers...")
         
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # Submit all tasks
-            future_to_id = {
-                executor.submit(self.extract_student_data, student_id): student_id 
-                for student_id in student_ids
-            }
-            
-            # Process completed tasks
-            for future in as_completed(future_to_id):
-                result = future.result()
-                results.append(result)
+        for result in self.scrape_iter(student_ids):
+            results.append(result)
         
         elapsed = time.time() - start_time
         success_count = sum(1 for _, img_url, _ in results if img_url)
@@ -215,14 +401,26 @@ class ProxyScraper:
         failed_count = len(results) - total_success
         
         print(f"\n{'='*60}")
-        print(f"📊 SCRAPING SUMMARY")
+        print("📊 SCRAPING SUMMARY")
         print(f"{'='*60}")
         print(f"Total processed: {len(results)}")
         print(f"✓ Full success (name + image): {success_count}")
         print(f"⚠️  Partial success (name only, image unavailable): {name_only_count}")
         print(f"✗ Complete failures: {failed_count}")
-        print(f"⏱️  Time: {elapsed:.2f}s ({elapsed/len(student_ids):.2f}s per student)")
-        print(f"🚀 Speed improvement: ~{4/(elapsed/len(student_ids)):.1f}x faster")
+        per_student = elapsed / len(results) if results else 0.0
+        print(f"⏱️  Time: {elapsed:.2f}s ({per_student:.2f}s per student, "
+              f"{len(results) / elapsed if elapsed else 0:.1f} students/s)")
+        if baseline and per_student:
+            print(f"🚀 Speed-up vs baseline ({baseline:.3f}s per student): ~{baseline / per_student:.1f}x")
+        print(f"🧭 Drivers: {self.driver_pool.stats()}")
+        print(f"🌐 Fetch paths: {self.fetch_stats()}")
+        print(f"🚦 Rate limits: {self.rate_limiter.snapshot()}")
+        if len(self.proxy_pool):
+            print(f"🛰️  Proxies: {self.proxy_pool.stats()}")
+        if self.cache is not None:
+            print(f"💾 Cache: {self.cache.stats()}")
+        if self.availability is not None:
+            print(f"🖼️  Availability: {self.availability.stats()}")
         print(f"{'='*60}")
         
         return results
@@ -242,12 +440,11 @@ class ProxyScraper:
         return image_url, name
 
     def download_image(self, image_url: str, filename: str) -> bool:
-        """Download image from URL"""
+        """Download image from URL (streamed over the pooled session, written atomically)"""
         try:
-            response = requests.get(image_url, timeout=10)
-            response.raise_for_status()
-            with open(filename, 'wb') as f:
-                f.write(response.content)
+            with self.http_fetcher.session.get(image_url, stream=True, timeout=10) as response:
+                response.raise_for_status()
+                stream_to_file(response, filename)
             return True
         except Exception as e:
             print(f"Download error: {e}")
@@ -264,8 +461,9 @@ if __name__ == "__main__":
     # ]
     proxies = []  # No proxies by default
     
-    # Initialize scraper with 5 parallel workers
+    # Initialize scraper with 5 parallel workers (pooled Chrome drivers are shut down by close())
     scraper = ProxyScraper(proxies=proxies, max_workers=5)
+    atexit.register(scraper.close)
     
     # ============================================================
     # OPTION 1: Single student (legacy compatible format)
@@ -279,7 +477,7 @@ if __name__ == "__main__":
     elif name:
         print(f"Result: image=None, name={name} (Image unavailable)")
     else:
-        print(f"Result: image=None, name=None (Failed)")
+        print("Result: image=None, name=None (Failed)")
     
     print("\n" + "="*60 + "\n")
     
@@ -303,7 +501,8 @@ if __name__ == "__main__":
     for student_id, image_url, name in results:
         if image_url and name:
             print(f"✓ {student_id} - {name}: {image_url}")
-            # Optional: Download image
+            # Optional: Download image (bulk: image_downloader.py, then image_store.py to file it
+            # into the content-addressed FaceImageStore instead of loose {student_id}.jpg files)
             # scraper.download_image(image_url, f"{student_id}.jpg")
         elif name and not image_url:
             print(f"⚠️  {student_id} - {name}: NO IMAGE AVAILABLE")
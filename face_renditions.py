@@ -0,0 +1,152 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from image_store import FaceImageStore
+
+
+class Rendition(NamedTuple):
+    """One fixed face-card output size / format"""
+    name: str
+    width: int
+    height: int
+    format: str = 'webp'   # 'webp' or 'jpeg'
+    quality: int = 80
+
+    @property
+    def tag(self) -> str:
+        # Part of the output directory, so changing a spec never reuses stale files
+        return f"{self.name}_{self.width}x{self.height}_{self.format}_q{self.quality}"
+
+    @property
+    def ext(self) -> str:
+        return '.jpg' if self.format == 'jpeg' else f'.{self.format}'
+
+
+# 3:4 portrait, matching the profile photos
+DEFAULT_RENDITIONS = [
+    Rendition('thumb', 96, 128, 'webp', 75),
+    Rendition('card', 360, 480, 'webp', 80),
+    Rendition('card', 360, 480, 'jpeg', 82),
+]
+
+
+def _require_pillow():
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        raise RuntimeError(
+            "Pillow is required for face-card renditions. Install it with:\n"
+            "    pip install pillow"
+        )
+    return Image, ImageOps
+
+
+def rendition_path(out_dir: str, rendition: Rendition, sha256: str) -> str:
+    return os.path.join(out_dir, rendition.tag, sha256[:2], sha256 + rendition.ext)
+
+
+def render_image(source_path: str, sha256: str, out_dir: str, renditions: List[Rendition]) -> Tuple[str, int, Optional[str]]:
+    """
+    Decode one source image and write every rendition that is missing or stale.
+
+    Runs inside a worker process.
+
+    Returns:
+        Tuple of (sha256, renditions written, error message or None)
+    """
+    Image, ImageOps = _require_pillow()
+
+    source_mtime = os.path.getmtime(source_path)
+    todo = [
+        r for r in renditions
+        if not os.path.exists(rendition_path(out_dir, r, sha256))
+        or os.path.getmtime(rendition_path(out_dir, r, sha256)) < source_mtime
+    ]
+    if not todo:
+        return sha256, 0, None
+
+    try:
+        with Image.open(source_path) as img:
+            # JPEG: let the decoder downscale by 1/2..1/8 while still covering the largest output
+            largest = max(todo, key=lambda r: r.width * r.height)
+            img.draft('RGB', (largest.width, largest.height))
+            img = ImageOps.exif_transpose(img).convert('RGB')
+            for rendition in todo:
+                # Crop slightly above centre: faces sit in the upper part of profile photos
+                card = ImageOps.fit(img, (rendition.width, rendition.height),
+                                    method=Image.Resampling.LANCZOS, centering=(0.5, 0.4))
+                path = rendition_path(out_dir, rendition, sha256)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.part"
+                card.save(tmp_path, format=rendition.format.upper(), quality=rendition.quality,
+                          **({'method': 4} if rendition.format == 'webp' else {'optimize': True, 'progressive': True}))
+                os.replace(tmp_path, path)
+    except Exception as e:
+        return sha256, 0, str(e)
+
+    return sha256, len(todo), None
+
+
+def rendition_for_enrollment(store: FaceImageStore, enrollment: str, rendition: Rendition,
+                             out_dir: str = 'data/external/renditions') -> Optional[str]:
+    """Path of a student's pre-sized face card, or None if they have no stored image"""
+    entry = store.lookup(enrollment)
+    if entry is None:
+        return None
+    return rendition_path(out_dir, rendition, entry['sha256'])
+
+
+def _render_task(args) -> Tuple[str, int, Optional[str]]:
+    return render_image(*args)
+
+
+def render_all(sources: Iterable[Tuple[str, str]], out_dir: str = 'data/external/renditions',
+               renditions: Optional[List[Rendition]] = None, max_workers: Optional[int] = None,
+               chunksize: int = 16) -> Dict[str, int]:
+    """
+    Produce face-card renditions for many images on a process pool.
+
+    Incremental: a rendition is only (re)written when its file is missing or
+    older than the source, so re-runs touch only new images.
+
+    Args:
+        sources: (sha256, source_path) pairs, e.g. FaceImageStore.iter_blobs()
+        out_dir: Root directory for renditions
+        renditions: Sizes/formats to produce (default: DEFAULT_RENDITIONS)
+        max_workers: Worker processes (default: all cores)
+        chunksize: Images handed to a worker at a time
+
+    Returns:
+        Stats dict
+    """
+    _require_pillow()
+    renditions = renditions or DEFAULT_RENDITIONS
+    tasks = [(path, sha256, out_dir, renditions) for sha256, path in sources]
+
+    stats = {'images': len(tasks), 'rendered': 0, 'up_to_date': 0, 'failed': 0, 'files_written': 0}
+    start_time = time.time()
+    print(f"Rendering {len(tasks)} images into {len(renditions)} renditions on {max_workers or os.cpu_count()} processes...")
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for sha256, written, error in executor.map(_render_task, tasks, chunksize=chunksize):
+            if error:
+                stats['failed'] += 1
+                print(f"✗ {sha256[:12]}: {error}")
+            elif written:
+                stats['rendered'] += 1
+                stats['files_written'] += written
+            else:
+                stats['up_to_date'] += 1
+
+    elapsed = time.time() - start_time
+    stats['seconds'] = round(elapsed, 2)
+    print(f"🖼️  Rendered {stats['rendered']} images ({stats['files_written']} files), "
+          f"{stats['up_to_date']} up to date, {stats['failed']} failed in {elapsed:.1f}s")
+    return stats
+
+
+if __name__ == "__main__":
+    with FaceImageStore() as store:
+        render_all(store.iter_blobs())
@@ -0,0 +1,257 @@
+import csv
+import json
+import os
+import threading
+from typing import Callable, Dict, Iterable, List, Optional
+
+GENDERS = {'male', 'female'}
+UNKNOWN = 'unknown'
+
+# Honorifics / prefixes that say nothing about the given name
+_SKIP_TOKENS = {'MR', 'MS', 'MRS', 'DR', 'KM', 'KUMARI', 'SMT', 'SHRI'}
+
+
+def first_name(full_name: Optional[str]) -> Optional[str]:
+    """Normalised first name used as the classification key ("PUNISHKA GAMBHIR" -> "PUNISHKA")"""
+    if not full_name:
+        return None
+    for token in full_name.replace('.', ' ').split():
+        token = token.upper()
+        if len(token) > 1 and token.isalpha() and token not in _SKIP_TOKENS:
+            return token
+    return None
+
+
+def _normalise(answer) -> str:
+    answer = str(answer or '').strip().lower()
+    return answer if answer in GENDERS else UNKNOWN
+
+
+def get_groq_client():
+    """Create a Groq client from GROQ_API_KEY"""
+    try:
+        from groq import Groq
+    except ImportError:
+        raise RuntimeError(
+            "The Groq Python library is required. Install it with:\n"
+            "    pip install groq"
+        )
+
+    GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+    if not GROQ_API_KEY:
+        raise RuntimeError(
+            "GROQ_API_KEY not found. Set it in your environment, e.g.:\n"
+            "    export GROQ_API_KEY='your‑key-here'"
+        )
+    return Groq(api_key=GROQ_API_KEY)
+
+
+class GroqGenderBackend:
+    """Classifies many first names per Groq completion"""
+
+    def __init__(self, client=None, model: str = "llama-3.1-8b-instant", batch_size: int = 100):
+        self._client = client
+        self.model = model
+        self.batch_size = batch_size
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = get_groq_client()
+        return self._client
+
+    def classify(self, names: List[str]) -> Dict[str, str]:
+        """
+        Args:
+            names: Distinct first names
+
+        Returns:
+            Dict of name -> 'male' / 'female' / 'unknown'; names the model didn't
+            answer are left out so they are asked again next time
+        """
+        results = {}
+        for start in range(0, len(names), self.batch_size):
+            results.update(self._classify_batch(names[start:start + self.batch_size]))
+        return results
+
+    def _classify_batch(self, names: List[str]) -> Dict[str, str]:
+        prompt = (
+            "For each Indian first name below, decide the most likely gender. "
+            "Answer with only a JSON object mapping each name exactly as given to one of "
+            "'male', 'female' or 'unknown'. Do not add any additional text.\n\n"
+            + "\n".join(names)
+        )
+        try:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.0,
+                max_tokens=12 * len(names) + 20,
+                response_format={"type": "json_object"},
+            )
+            answers = json.loads(response.choices[0].message.content)
+        except Exception as exc:  # pragma: no cover
+            print(f"[WARN] Gender detection failed for {len(names)} names: {exc}")
+            return {}
+
+        answers = {str(key).strip().upper(): value for key, value in answers.items()}
+        return {name: _normalise(answers[name]) for name in names if answers.get(name) is not None}
+
+
+class StaticGenderBackend:
+    """Offline backend answering from a fixed mapping; stands in for Groq in tests"""
+
+    def __init__(self, mapping: Optional[Dict[str, str]] = None):
+        self.mapping = {key.upper(): _normalise(value) for key, value in (mapping or {}).items()}
+        self.calls = 0
+
+    def classify(self, names: List[str]) -> Dict[str, str]:
+        self.calls += 1
+        return {name: self.mapping.get(name, UNKNOWN) for name in names}
+
+
+class GenderClassifier:
+    """
+    Name -> gender lookup that keeps remote calls off the critical path.
+
+    Full names are reduced to distinct first names, answered from a persistent
+    cache, then from an optional offline table, and only the remaining unknown
+    names are sent to the backend in batches.
+
+    Example:
+        classifier = GenderClassifier(backend=GroqGenderBackend())
+        genders = classifier.classify_many(["PUNISHKA GAMBHIR", "ANANYA JHA"])
+    """
+
+    def __init__(self, cache_path: str = 'gender_cache.json', table_path: Optional[str] = None, backend=None):
+        """
+        Args:
+            cache_path: JSON file holding first name -> gender answers
+            table_path: Optional CSV of first_name,gender used before the backend
+            backend: Object with classify(names) -> dict; None means cache/table only
+        """
+        self.cache_path = cache_path
+        self.backend = backend
+        self._lock = threading.Lock()
+
+        self.cache: Dict[str, str] = {}
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                self.cache = json.load(f)
+
+        self.table: Dict[str, str] = {}
+        if table_path:
+            with open(table_path, 'r', newline='', encoding='utf-8') as f:
+                for row in csv.DictReader(f):
+                    self.table[row['first_name'].strip().upper()] = _normalise(row['gender'])
+
+        self.stats = {'names': 0, 'cache_hits': 0, 'table_hits': 0, 'remote_names': 0, 'remote_calls': 0}
+
+    def _save_cache(self):
+        if not self.cache_path:
+            return
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.cache, f, ensure_ascii=False, sort_keys=True)
+        os.replace(tmp_path, self.cache_path)
+
+    def classify_first_names(self, names: Iterable[str]) -> Dict[str, str]:
+        """Classify distinct first names; returns name -> 'male' / 'female' / 'unknown'"""
+        with self._lock:
+            results = {}
+            unknown = []
+            cached = len(self.cache)
+            for name in set(names):
+                self.stats['names'] += 1
+                if name in self.cache:
+                    self.stats['cache_hits'] += 1
+                    results[name] = self.cache[name]
+                elif name in self.table:
+                    self.stats['table_hits'] += 1
+                    results[name] = self.cache[name] = self.table[name]
+                else:
+                    unknown.append(name)
+
+            if unknown and self.backend is not None:
+                self.stats['remote_names'] += len(unknown)
+                self.stats['remote_calls'] += 1
+                answers = self.backend.classify(sorted(unknown))
+                for name, gender in answers.items():
+                    results[name] = self.cache[name] = gender
+
+            if len(self.cache) > cached:
+                self._save_cache()
+            return results
+
+    def classify_many(self, full_names: Iterable[Optional[str]]) -> Dict[str, Optional[str]]:
+        """
+        Classify full names.
+
+        Returns:
+            Dict of full name -> 'male' / 'female' / None (unknown)
+        """
+        keys = {full_name: first_name(full_name) for full_name in full_names if full_name}
+        answers = self.classify_first_names(key for key in keys.values() if key)
+        return {
+            full_name: (answers.get(key) if answers.get(key) in GENDERS else None)
+            for full_name, key in keys.items()
+        }
+
+    def classify(self, full_name: Optional[str]) -> Optional[str]:
+        """Classify a single full name ('male' / 'female' / None)"""
+        if not full_name:
+            return None
+        return self.classify_many([full_name]).get(full_name)
+
+    def fill_records(self, records: List[dict]):
+        """Set `gender` on output records in place, with one backend call for the whole batch"""
+        genders = self.classify_many(record.get('name') for record in records)
+        for record in records:
+            if record.get('gender') is None:
+                record['gender'] = genders.get(record.get('name'))
+
+
+def backfill_genders(jsonl_path: str, classifier: GenderClassifier,
+                     on_filled: Optional[Callable[[List[dict]], None]] = None) -> int:
+    """
+    Fill missing `gender` fields across a whole data.json-style file.
+
+    First names are deduplicated over the entire file before anything is sent
+    to the backend; the file is rewritten via temp file + os.replace.
+
+    Args:
+        jsonl_path: File to fill in place
+        classifier: GenderClassifier to answer with
+        on_filled: Optional callable(records) given the records whose gender was filled
+
+    Returns:
+        Number of records whose gender was filled
+    """
+    with open(jsonl_path, 'r', encoding='utf-8') as f:
+        records = [json.loads(line) for line in f if line.strip()]
+
+    missing = [record for record in records if record.get('gender') is None and record.get('name')]
+    if not missing:
+        return 0
+    classifier.fill_records(missing)
+    filled = [record for record in missing if record.get('gender') is not None]
+    if filled and on_filled is not None:
+        on_filled(filled)
+
+    tmp_path = f"{jsonl_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for record in records:
+            json.dump(record, f, ensure_ascii=False)
+            f.write("\n")
+    os.replace(tmp_path, jsonl_path)
+
+    print(f"👤 Filled gender for {len(filled)}/{len(missing)} records ({classifier.stats})")
+    return len(filled)
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    classifier = GenderClassifier(backend=GroqGenderBackend())
+    backfill_genders("dataMSIT.json", classifier)
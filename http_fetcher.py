@@ -0,0 +1,106 @@
+import re
+from typing import Optional, Tuple
+
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+
+BASE_URL = "https://www.ipuranklist.com"
+IMAGE_HOST = "assets.ipuranklist.com"
+
+# Matches an asset URL anywhere in the raw page (e.g. inside embedded JSON)
+_IMAGE_URL_RE = re.compile(r"https://assets\.ipuranklist\.com/[\w\-./]+\.(?:jpe?g|png|webp)", re.IGNORECASE)
+
+
+def looks_like_name(text: str) -> bool:
+    """Same heuristic the Selenium path uses to pick the name <td>"""
+    return bool(text) and 5 < len(text) < 50 and text.replace(' ', '').isalpha()
+
+
+def is_throttling(error: requests.RequestException) -> bool:
+    """Timeouts, connection drops, 429 and 5xx mean "slow down"; other HTTP errors (404, 403...) don't"""
+    status = error.response.status_code if error.response is not None else None
+    return status is None or status == 429 or status >= 500
+
+
+def parse_student_html(html: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Extract (image_url, name) from a /student/{id} page.
+
+    Args:
+        html: Raw HTML of the student page
+
+    Returns:
+        Tuple of (image_url, name) - either can be None if not in the HTML
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+
+    image_url = None
+    img = soup.select_one(f"img[src*='{IMAGE_HOST}']")
+    if img is not None:
+        image_url = img.get('src')
+    else:
+        match = _IMAGE_URL_RE.search(html)
+        if match:
+            image_url = match.group(0)
+
+    name = None
+    for td in soup.find_all('td'):
+        text = td.get_text(strip=True)
+        if looks_like_name(text):
+            name = text
+            break
+
+    return image_url, name
+
+
+class StaticProfileFetcher:
+    """
+    Browser-free fetcher for /student/{id} pages.
+
+    Uses one pooled keep-alive requests.Session shared by all worker threads,
+    so a lookup costs one HTTP round trip instead of a Chrome page load.
+    """
+
+    def __init__(self, pool_size: int = 32, timeout: float = 10, base_url: str = BASE_URL):
+        """
+        Args:
+            pool_size: Max keep-alive connections kept per host
+            timeout: Per-request timeout in seconds
+            base_url: Site root (overridable for local testing)
+        """
+        self.timeout = timeout
+        self.base_url = base_url.rstrip('/')
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def student_url(self, student_id: str) -> str:
+        return f"{self.base_url}/student/{student_id}"
+
+    def fetch_html(self, student_id: str, proxy: Optional[str] = None, user_agent: Optional[str] = None) -> str:
+        """Fetch the raw student page; raises requests exceptions on failure"""
+        headers = {'User-Agent': user_agent} if user_agent else None
+        proxies = {'http': proxy, 'https': proxy} if proxy else None
+        response = self.session.get(
+            self.student_url(student_id),
+            headers=headers,
+            proxies=proxies,
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return response.text
+
+    def fetch(self, student_id: str, proxy: Optional[str] = None, user_agent: Optional[str] = None) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Fetch and parse a student page.
+
+        Returns:
+            Tuple of (image_url, name) - either can be None if the static HTML lacks it
+        """
+        return parse_student_html(self.fetch_html(student_id, proxy=proxy, user_agent=user_agent))
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,281 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from rate_limiter import AdaptiveRateLimiter, default_limiter
+
+CHUNK_SIZE = 64 * 1024
+
+
+def iter_image_urls(jsonl_files: Iterable[str]) -> Iterator[Tuple[str, str]]:
+    """
+    Yield (enrollment, image_url) from data.json-style files, each URL once.
+
+    Records without an image (and the stray CSV header row) are skipped.
+    """
+    seen = set()
+    for path in jsonl_files:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                url = record.get('image')
+                if url and url not in seen:
+                    seen.add(url)
+                    yield record.get('enrollment'), url
+
+
+def stream_to_file(response: requests.Response, path: str) -> Tuple[str, int]:
+    """
+    Stream a response body to `path` via a temp file + atomic rename.
+
+    Returns:
+        Tuple of (sha256 hex digest, size in bytes)
+    """
+    digest = hashlib.sha256()
+    size = 0
+    tmp_path = f"{path}.part"
+    try:
+        with open(tmp_path, 'wb') as f:
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                f.write(chunk)
+                digest.update(chunk)
+                size += len(chunk)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return digest.hexdigest(), size
+
+
+class BulkImageDownloader:
+    """
+    Concurrent downloader for assets.ipuranklist.com profile images.
+
+    Bodies are streamed to `<name>.part` and renamed into place, so a crash never
+    leaves a truncated image behind. A JSON manifest records each URL's file,
+    sha256, ETag and Last-Modified, which makes re-runs resumable: files already
+    on disk are skipped (or revalidated with a conditional GET), and identical
+    content from different URLs is stored once.
+
+    Example:
+        downloader = BulkImageDownloader('data/external/student_images')
+        downloader.download_all(iter_image_urls(['data.json', 'dataMSIT.json']))
+    """
+
+    def __init__(self, dest_dir: str = 'data/external/student_images', max_workers: int = 16,
+                 timeout: float = 20, manifest_path: Optional[str] = None, revalidate: bool = False,
+                 rate_limiter: Optional[AdaptiveRateLimiter] = None, on_downloaded=None):
+        """
+        Args:
+            dest_dir: Directory images are written to
+            max_workers: Parallel downloads (and keep-alive connections)
+            timeout: Per-request timeout in seconds
+            manifest_path: Manifest JSON (default: `<dest_dir>/manifest.json`)
+            revalidate: Re-check existing files with If-None-Match / If-Modified-Since
+            rate_limiter: AdaptiveRateLimiter gating every request (default: shared instance)
+            on_downloaded: Optional callable(enrollment, url, path) run after each new file lands
+        """
+        self.dest_dir = dest_dir
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.manifest_path = manifest_path or os.path.join(dest_dir, 'manifest.json')
+        self.revalidate = revalidate
+        self.rate_limiter = rate_limiter or default_limiter
+        self.on_downloaded = on_downloaded
+
+        os.makedirs(dest_dir, exist_ok=True)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=max_workers, max_retries=2)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._lock = threading.Lock()
+        self.manifest: Dict[str, dict] = {}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                self.manifest = json.load(f)
+        self._by_hash = {entry['sha256']: entry['path'] for entry in self.manifest.values()}
+
+        self.stats = {'downloaded': 0, 'not_modified': 0, 'skipped': 0, 'deduplicated': 0, 'failed': 0, 'bytes': 0}
+
+    def _filename(self, url: str) -> str:
+        name = os.path.basename(urlsplit(url).path)
+        return os.path.join(self.dest_dir, name or hashlib.sha1(url.encode()).hexdigest())
+
+    def _save_manifest_locked(self):
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _count(self, key: str, amount: int = 1):
+        with self._lock:
+            self.stats[key] += amount
+
+    def download(self, url: str, enrollment: Optional[str] = None) -> Optional[str]:
+        """
+        Download one image unless an up-to-date copy is already on disk.
+
+        Returns:
+            Local path of the image, or None if the download failed
+        """
+        with self._lock:
+            entry = self.manifest.get(url)
+
+        headers = {}
+        if entry and os.path.exists(entry['path']):
+            if not self.revalidate:
+                self._count('skipped')
+                return entry['path']
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        path = self._filename(url)
+        if entry is None and os.path.exists(path):
+            # On disk from an earlier run whose manifest was lost: adopt it
+            with open(path, 'rb') as f:
+                sha256 = hashlib.file_digest(f, 'sha256').hexdigest()
+            with self._lock:
+                self.manifest[url] = {
+                    'path': path,
+                    'sha256': sha256,
+                    'size': os.path.getsize(path),
+                    'etag': None,
+                    'last_modified': None,
+                    'enrollment': enrollment,
+                    'fetched_at': os.path.getmtime(path),
+                }
+                self._by_hash.setdefault(sha256, path)
+                self.stats['skipped'] += 1
+            return path
+
+        try:
+            with self.rate_limiter.request(url) as slot:
+                with self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+                    if response.status_code == 304:
+                        self._count('not_modified')
+                        return entry['path']
+                    if response.status_code == 429 or response.status_code >= 500:
+                        slot.throttled()
+                    elif response.status_code >= 400:
+                        slot.error()  # a missing image says nothing about load; don't back off
+                    response.raise_for_status()
+                    try:
+                        sha256, size = stream_to_file(response, path)
+                    except requests.RequestException:
+                        raise
+                    except OSError:
+                        slot.error()  # local disk problem, not the server's
+                        raise
+                    etag = response.headers.get('ETag')
+                    last_modified = response.headers.get('Last-Modified')
+        except OSError as e:  # includes requests.RequestException
+            print(f"Download error for {url}: {e}")
+            self._count('failed')
+            return None
+
+        with self._lock:
+            existing = self._by_hash.get(sha256)
+            if existing and existing != path and os.path.exists(existing):
+                # Same bytes under another URL (e.g. a placeholder): keep one copy
+                os.remove(path)
+                path = existing
+                self.stats['deduplicated'] += 1
+            else:
+                self._by_hash[sha256] = path
+
+            self.manifest[url] = {
+                'path': path,
+                'sha256': sha256,
+                'size': size,
+                'etag': etag,
+                'last_modified': last_modified,
+                'enrollment': enrollment,
+                'fetched_at': time.time(),
+            }
+            self.stats['downloaded'] += 1
+            self.stats['bytes'] += size
+
+        if self.on_downloaded is not None:
+            self.on_downloaded(enrollment, url, path)
+        return path
+
+    def download_all(self, items: Iterable[Tuple[Optional[str], str]], save_every: int = 200) -> dict:
+        """
+        Download every (enrollment, url) concurrently.
+
+        The manifest is saved every `save_every` completions and at the end.
+
+        Returns:
+            Stats dict including bytes/s and images/s
+        """
+        start_time = time.time()
+        completed = 0
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self.download, url, enrollment) for enrollment, url in items]
+            print(f"Downloading {len(futures)} images with {self.max_workers} workers...")
+
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    # One bad item (e.g. a failing on_downloaded callback) mustn't abort the run
+                    print(f"Download error: {e}")
+                    self._count('failed')
+                completed += 1
+                if completed % save_every == 0:
+                    with self._lock:
+                        self._save_manifest_locked()
+                    elapsed = time.time() - start_time
+                    print(f"  {completed}/{len(futures)} "
+                          f"({self.stats['bytes'] / elapsed / 1024:.0f} KB/s, {self.stats['downloaded'] / elapsed:.1f} img/s)")
+
+        with self._lock:
+            self._save_manifest_locked()
+
+        elapsed = max(time.time() - start_time, 1e-9)
+        report = dict(self.stats)
+        report['seconds'] = round(elapsed, 2)
+        report['bytes_per_s'] = round(self.stats['bytes'] / elapsed, 1)
+        report['images_per_s'] = round(self.stats['downloaded'] / elapsed, 2)
+
+        print(f"\n{'='*60}")
+        print("🖼️  DOWNLOAD SUMMARY")
+        print(f"{'='*60}")
+        print(f"✓ Downloaded: {report['downloaded']} ({report['bytes'] / 1024 / 1024:.1f} MB)")
+        print(f"↺ Skipped (already on disk): {report['skipped']}, not modified: {report['not_modified']}")
+        print(f"≡ Duplicate content: {report['deduplicated']}")
+        print(f"✗ Failed: {report['failed']}")
+        print(f"⏱️  {report['seconds']}s — {report['bytes_per_s'] / 1024:.0f} KB/s, {report['images_per_s']} images/s")
+        print(f"{'='*60}")
+        return report
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+if __name__ == "__main__":
+    with BulkImageDownloader() as downloader:
+        downloader.download_all(iter_image_urls(['data.json', 'dataMSIT.json']))
@@ -0,0 +1,267 @@
+import hashlib
+import json
+import os
+import sqlite3
+import struct
+import threading
+import time
+from typing import Dict, Iterator, Optional, Tuple
+
+_EXTENSIONS = {'jpeg': '.jpg', 'png': '.png', 'webp': '.webp', 'gif': '.gif'}
+
+
+def image_format(data: bytes) -> Optional[str]:
+    """Sniff the image format from its magic bytes"""
+    if data[:3] == b'\xff\xd8\xff':
+        return 'jpeg'
+    if data[:8] == b'\x89PNG\r\n\x1a\n':
+        return 'png'
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'webp'
+    if data[:6] in (b'GIF87a', b'GIF89a'):
+        return 'gif'
+    return None
+
+
+def image_dimensions(data: bytes) -> Optional[Tuple[int, int]]:
+    """
+    Read (width, height) from the image header without decoding pixels.
+
+    Supports JPEG, PNG, GIF and WebP; returns None for anything else.
+    """
+    fmt = image_format(data)
+    try:
+        if fmt == 'png':
+            return struct.unpack('>II', data[16:24])
+        if fmt == 'gif':
+            return struct.unpack('<HH', data[6:10])
+        if fmt == 'webp':
+            chunk = data[12:16]
+            if chunk == b'VP8 ':
+                width, height = struct.unpack('<HH', data[26:30])
+                return width & 0x3fff, height & 0x3fff
+            if chunk == b'VP8L':
+                bits = struct.unpack('<I', data[21:25])[0]
+                return (bits & 0x3fff) + 1, ((bits >> 14) & 0x3fff) + 1
+            if chunk == b'VP8X':
+                width = int.from_bytes(data[24:27], 'little') + 1
+                height = int.from_bytes(data[27:30], 'little') + 1
+                return width, height
+            return None
+        if fmt == 'jpeg':
+            i = 2
+            while i + 9 < len(data):
+                if data[i] != 0xff:
+                    i += 1
+                    continue
+                marker = data[i + 1]
+                if marker in (0xd8, 0x01) or 0xd0 <= marker <= 0xd7:
+                    i += 2
+                    continue
+                length = struct.unpack('>H', data[i + 2:i + 4])[0]
+                # SOF0..SOF15 except DHT (c4), JPG (c8), DAC (cc)
+                if 0xc0 <= marker <= 0xcf and marker not in (0xc4, 0xc8, 0xcc):
+                    height, width = struct.unpack('>HH', data[i + 5:i + 9])
+                    return width, height
+                i += 2 + length
+    except struct.error:
+        return None
+    return None
+
+
+class FaceImageStore:
+    """
+    Content-addressed store for profile images.
+
+    Each distinct image is written once under `root/ab/cd/<sha256><ext>`
+    (sharded by hash prefix so no directory grows past a few hundred files).
+    A SQLite manifest maps enrollment -> hash, and hash -> size, dimensions and
+    format, giving O(1) lookups without listing directories. Identical images
+    (e.g. the site's placeholder) are stored once and shared.
+
+    Example:
+        store = FaceImageStore('data/external/face_store')
+        digest = store.put_file('09518241723', 'photo.jpeg', source_url=url)
+        path = store.path_for_enrollment('09518241723')
+    """
+
+    def __init__(self, root: str = 'data/external/face_store', index_path: Optional[str] = None):
+        """
+        Args:
+            root: Store directory
+            index_path: Manifest database (default: `<root>/index.db`)
+        """
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(index_path or os.path.join(root, 'index.db'), check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript(
+            '''CREATE TABLE IF NOT EXISTS blobs (
+                   sha256 TEXT PRIMARY KEY,
+                   ext    TEXT NOT NULL,
+                   size   INTEGER NOT NULL,
+                   width  INTEGER,
+                   height INTEGER
+               );
+               CREATE TABLE IF NOT EXISTS images (
+                   enrollment TEXT PRIMARY KEY,
+                   sha256     TEXT NOT NULL REFERENCES blobs(sha256),
+                   source_url TEXT,
+                   stored_at  REAL NOT NULL
+               );
+               CREATE INDEX IF NOT EXISTS images_sha256 ON images(sha256);'''
+        )
+        self._conn.commit()
+
+    def blob_path(self, sha256: str, ext: str) -> str:
+        return os.path.join(self.root, sha256[:2], sha256[2:4], sha256 + ext)
+
+    def put_bytes(self, enrollment: str, data: bytes, source_url: Optional[str] = None) -> str:
+        """
+        Store image bytes for an enrollment (no-op write if the content is already stored).
+
+        Returns:
+            sha256 hex digest of the image
+        """
+        sha256 = hashlib.sha256(data).hexdigest()
+        ext = _EXTENSIONS.get(image_format(data), '.bin')
+        path = self.blob_path(sha256, ext)
+
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.part"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+        dimensions = image_dimensions(data) or (None, None)
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR IGNORE INTO blobs (sha256, ext, size, width, height) VALUES (?, ?, ?, ?, ?)',
+                (sha256, ext, len(data), *dimensions),
+            )
+            self._conn.execute(
+                'INSERT OR REPLACE INTO images (enrollment, sha256, source_url, stored_at) VALUES (?, ?, ?, ?)',
+                (enrollment, sha256, source_url, time.time()),
+            )
+            self._conn.commit()
+        return sha256
+
+    def put_file(self, enrollment: str, path: str, source_url: Optional[str] = None) -> str:
+        """Store an image file already on disk (e.g. from BulkImageDownloader)"""
+        with open(path, 'rb') as f:
+            return self.put_bytes(enrollment, f.read(), source_url=source_url)
+
+    def lookup(self, enrollment: str) -> Optional[Dict]:
+        """
+        Manifest entry for an enrollment.
+
+        Returns:
+            Dict with sha256, path, size, width, height, source_url - or None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT b.sha256, b.ext, b.size, b.width, b.height, i.source_url '
+                'FROM images i JOIN blobs b ON b.sha256 = i.sha256 WHERE i.enrollment = ?',
+                (enrollment,),
+            ).fetchone()
+        if row is None:
+            return None
+        sha256, ext, size, width, height, source_url = row
+        return {
+            'sha256': sha256,
+            'path': self.blob_path(sha256, ext),
+            'size': size,
+            'width': width,
+            'height': height,
+            'source_url': source_url,
+        }
+
+    def path_for_enrollment(self, enrollment: str) -> Optional[str]:
+        entry = self.lookup(enrollment)
+        return entry['path'] if entry else None
+
+    def read(self, enrollment: str, verify: bool = True) -> Optional[bytes]:
+        """Image bytes for an enrollment, optionally checked against its hash"""
+        entry = self.lookup(enrollment)
+        if entry is None:
+            return None
+        with open(entry['path'], 'rb') as f:
+            data = f.read()
+        if verify and hashlib.sha256(data).hexdigest() != entry['sha256']:
+            raise ValueError(f"Corrupt image for {enrollment}: {entry['path']}")
+        return data
+
+    def iter_blobs(self) -> Iterator[Tuple[str, str]]:
+        """Yield (sha256, path) for every distinct stored image"""
+        with self._lock:
+            rows = self._conn.execute('SELECT sha256, ext FROM blobs').fetchall()
+        for sha256, ext in rows:
+            yield sha256, self.blob_path(sha256, ext)
+
+    def iter_images(self) -> Iterator[Tuple[str, str]]:
+        """Yield (enrollment, sha256) for every stored enrollment"""
+        with self._lock:
+            rows = self._conn.execute('SELECT enrollment, sha256 FROM images').fetchall()
+        yield from rows
+
+    def enrollments_for(self, sha256: str) -> list:
+        """All enrollments sharing one image (more than one usually means a placeholder)"""
+        with self._lock:
+            return [row[0] for row in self._conn.execute('SELECT enrollment FROM images WHERE sha256 = ?', (sha256,))]
+
+    def verify(self) -> Dict[str, list]:
+        """
+        Re-hash every blob.
+
+        Returns:
+            Dict with 'missing' and 'corrupt' lists of sha256 digests
+        """
+        problems = {'missing': [], 'corrupt': []}
+        for sha256, path in self.iter_blobs():
+            if not os.path.exists(path):
+                problems['missing'].append(sha256)
+                continue
+            with open(path, 'rb') as f:
+                if hashlib.file_digest(f, 'sha256').hexdigest() != sha256:
+                    problems['corrupt'].append(sha256)
+        return problems
+
+    def stats(self) -> dict:
+        with self._lock:
+            images = self._conn.execute('SELECT COUNT(*) FROM images').fetchone()[0]
+            blobs, total = self._conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs').fetchone()
+        return {'enrollments': images, 'distinct_images': blobs, 'bytes': total}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def import_downloads(store: FaceImageStore, manifest_path: str = 'data/external/student_images/manifest.json') -> int:
+    """Load everything BulkImageDownloader has fetched into the store"""
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    imported = 0
+    for url, entry in manifest.items():
+        if entry.get('enrollment') and os.path.exists(entry['path']):
+            store.put_file(entry['enrollment'], entry['path'], source_url=url)
+            imported += 1
+    print(f"📦 Imported {imported} images ({store.stats()})")
+    return imported
+
+
+if __name__ == "__main__":
+    with FaceImageStore() as store:
+        import_downloads(store)
+        problems = store.verify()
+        print(f"Integrity: {len(problems['missing'])} missing, {len(problems['corrupt'])} corrupt")
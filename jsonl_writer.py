@@ -0,0 +1,144 @@
+import json
+import os
+import threading
+from typing import Set
+
+
+def repair_jsonl(path: str) -> int:
+    """
+    Truncate a JSONL file back to its last complete line.
+
+    A crash mid-write can leave a partial record at the end of the file; this
+    drops it so appends start on a clean line.
+
+    Returns:
+        Number of bytes removed
+    """
+    if not os.path.exists(path):
+        return 0
+
+    size = os.path.getsize(path)
+    if size == 0:
+        return 0
+
+    with open(path, 'rb+') as f:
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) == b'\n':
+            return 0
+
+        # Walk back to the last newline
+        pos = size
+        chunk = 4096
+        while pos > 0:
+            step = min(chunk, pos)
+            pos -= step
+            f.seek(pos)
+            block = f.read(step)
+            idx = block.rfind(b'\n')
+            if idx != -1:
+                keep = pos + idx + 1
+                f.truncate(keep)
+                return size - keep
+
+        f.truncate(0)
+        return size
+
+
+def completed_ids(path: str, key: str = 'enrollment') -> Set[str]:
+    """Collect the `key` of every complete record in a JSONL file"""
+    done = set()
+    if not os.path.exists(path):
+        return done
+
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            value = record.get(key)
+            if value:
+                done.add(value)
+    return done
+
+
+class BufferedJsonlWriter:
+    """
+    Single writer for a JSONL output file, shared by worker threads.
+
+    Records are buffered and flushed in batches: each batch goes out as one
+    write + fsync. The output itself is the checkpoint: on open it is repaired
+    and its IDs are read back, so a restart never sees a partial line and never
+    re-emits a record that already made it to disk.
+
+    Example:
+        with BufferedJsonlWriter('dataMSIT.json') as writer:
+            if not writer.is_done(enrollment):
+                writer.write(record)
+    """
+
+    def __init__(self, path: str, batch_size: int = 100, key: str = 'enrollment', on_flush=None):
+        """
+        Args:
+            path: JSONL output file (appended to)
+            batch_size: Records buffered before a flush
+            key: Record field identifying a completed row
+            on_flush: Optional callable(records) run on each batch just before it is written
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.key = key
+        self.on_flush = on_flush
+
+        self._lock = threading.Lock()
+        self._buffer = []
+
+        removed = repair_jsonl(path)
+        if removed:
+            print(f"🩹 Dropped {removed} bytes of partial record from {path}")
+
+        # IDs of every record on disk (one read at open, then kept up to date in memory)
+        self.done: Set[str] = completed_ids(path, key)
+
+        self.written = 0
+        self._file = open(path, 'ab')
+
+    def is_done(self, record_id: str) -> bool:
+        return record_id in self.done
+
+    def write(self, record: dict):
+        with self._lock:
+            self._buffer.append(record)
+            if len(self._buffer) >= self.batch_size:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._buffer:
+            return
+
+        records, self._buffer = self._buffer, []
+        if self.on_flush is not None:
+            self.on_flush(records)
+
+        payload = ''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records)
+        self._file.write(payload.encode('utf-8'))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+        self.done.update(record[self.key] for record in records)
+        self.written += len(records)
+
+    def close(self):
+        with self._lock:
+            self._flush_locked()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,240 @@
+import json
+import os
+import time
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from elo import EloEngine
+
+# Views maintained by default: overall, each field on its own, and college x course x batch
+DEFAULT_GROUPINGS = (
+    (),
+    ('college',),
+    ('course',),
+    ('batch',),
+    ('branch',),
+    ('gender',),
+    ('college', 'course', 'batch'),
+)
+FIELDS = ('college', 'course', 'batch', 'branch', 'gender')
+
+GroupKey = Tuple[Tuple[str, ...], Tuple[str, ...]]   # (grouping fields, their values)
+
+
+class Leaderboards:
+    """
+    Incrementally maintained leaderboards for every college / course / batch /
+    branch / gender view.
+
+    Each group is a list of (-rating, enrollment) kept sorted with bisect, so
+    top-K is a slice and a student's rank is one binary search. When the
+    EloEngine applies a batch, each changed student is moved within their own
+    groups only (remove + insort); a group where a large share of members
+    changed is re-sorted in one go instead. Snapshots store every group's
+    order, so startup rebuilds the lists in linear time and only re-positions
+    students whose rating moved since the snapshot.
+
+    Example:
+        engine = EloEngine.from_jsonl(['data.json'])
+        boards = Leaderboards.from_jsonl(engine, ['data.json'])
+        boards.top(10, college='150')
+        boards.rank('09518241723', college='150', course='btech', batch='23')
+    """
+
+    def __init__(self, engine: EloEngine, attributes: Dict[str, List[Optional[str]]],
+                 groupings: Sequence[Tuple[str, ...]] = DEFAULT_GROUPINGS, rebuild_fraction: float = 0.25,
+                 snapshot: Optional[dict] = None):
+        """
+        Args:
+            engine: EloEngine holding ratings
+            attributes: college / course / batch / branch / gender column per engine position
+            groupings: Field combinations to maintain a board for
+            rebuild_fraction: Re-sort a group instead of moving members one by one
+                when more than this share of it changed in one batch
+            snapshot: Loaded snapshot (see load); internal
+        """
+        self.engine = engine
+        self.groupings = [tuple(field for field in FIELDS if field in grouping) for grouping in groupings]
+        self.rebuild_fraction = rebuild_fraction
+        n = len(engine)
+        columns = {field: attributes.get(field) or [None] * n for field in FIELDS}
+
+        # Group keys each student belongs to
+        self._groups_of: List[List[GroupKey]] = [[] for _ in range(n)]
+        members: Dict[GroupKey, List[int]] = {}
+        for position in range(n):
+            for grouping in self.groupings:
+                values = tuple(columns[field][position] for field in grouping)
+                if any(value is None for value in values):
+                    continue
+                key = (grouping, tuple(str(value) for value in values))
+                members.setdefault(key, []).append(position)
+                self._groups_of[position].append(key)
+        self._members = {key: np.array(positions, dtype=np.int64) for key, positions in members.items()}
+
+        self.boards: Dict[GroupKey, List[Tuple[float, str]]] = {}
+        self.stats = {'moved': 0, 'rebuilt': 0}
+        enrollments = engine.enrollments
+        if snapshot is not None and snapshot['enrollments'] == enrollments:
+            # Linear-time restore from the saved order, then catch up on rating changes
+            self._scores = snapshot['scores']
+            scores = self._scores.tolist()
+            for key, order in snapshot['orders'].items():
+                # Attributes may have changed since the snapshot (e.g. a corrected gender):
+                # only reuse an order whose members are exactly the group's current ones
+                members = self._members.get(key)
+                if members is not None and np.array_equal(np.sort(order), members):
+                    self.boards[key] = [(-scores[i], enrollments[i]) for i in order.tolist()]
+            for key in self._members.keys() - self.boards.keys():
+                self._rebuild(key)
+            changed = np.flatnonzero(self._scores != engine.ratings)
+            if len(changed):
+                self.update(changed)
+        else:
+            self._scores = engine.ratings.copy()
+            for key in self._members:
+                self._rebuild(key)
+
+        engine.subscribe(self.update)
+
+    @classmethod
+    def from_records(cls, engine: EloEngine, records: Iterable[dict], **kwargs) -> 'Leaderboards':
+        n = len(engine)
+        attributes = {field: [None] * n for field in FIELDS}
+        for record in records:
+            position = engine.position.get(record.get('enrollment'))
+            if position is not None:
+                for field in FIELDS:
+                    attributes[field][position] = record.get(field)
+        return cls(engine, attributes, **kwargs)
+
+    @classmethod
+    def from_jsonl(cls, engine: EloEngine, paths: Iterable[str], snapshot_path: Optional[str] = None,
+                   **kwargs) -> 'Leaderboards':
+        """Build from data.json-style files, restoring from `snapshot_path` when it matches"""
+        def records():
+            for path in paths:
+                with open(path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        if line.strip():
+                            yield json.loads(line)
+        if snapshot_path and os.path.exists(snapshot_path):
+            kwargs['snapshot'] = cls.load_snapshot(snapshot_path)
+        return cls.from_records(engine, records(), **kwargs)
+
+    def _rebuild(self, key: GroupKey):
+        positions = self._members[key]
+        scores = self._scores[positions]
+        enrollments = self.engine.enrollments
+        board = [(-score, enrollments[i]) for score, i in zip(scores.tolist(), positions.tolist())]
+        board.sort()
+        self.boards[key] = board
+
+    def update(self, changed: np.ndarray):
+        """Re-position students whose rating changed (EloEngine listener)"""
+        ratings = self.engine.ratings
+        enrollments = self.engine.enrollments
+
+        per_group: Dict[GroupKey, List[int]] = {}
+        for position in changed.tolist():
+            for key in self._groups_of[position]:
+                per_group.setdefault(key, []).append(position)
+
+        old_scores = dict(zip(changed.tolist(), self._scores[changed].tolist()))
+        new_scores = dict(zip(changed.tolist(), ratings[changed].tolist()))
+        self._scores[changed] = ratings[changed]
+
+        for key, positions in per_group.items():
+            board = self.boards[key]
+            if len(positions) > len(board) * self.rebuild_fraction:
+                self._rebuild(key)
+                self.stats['rebuilt'] += 1
+                continue
+            for position in positions:
+                enrollment = enrollments[position]
+                del board[bisect_left(board, (-old_scores[position], enrollment))]
+                insort(board, (-new_scores[position], enrollment))
+            self.stats['moved'] += len(positions)
+
+    def _key(self, scope: Dict[str, Optional[str]]) -> GroupKey:
+        scope = {field: value for field, value in scope.items() if value is not None}
+        grouping = tuple(field for field in FIELDS if field in scope)
+        if grouping not in self.groupings:
+            raise KeyError(f"No leaderboard maintained for {grouping or 'overall'}; have {self.groupings}")
+        return grouping, tuple(str(scope[field]) for field in grouping)
+
+    def top(self, k: int = 10, **scope) -> List[Tuple[int, str, float]]:
+        """
+        Best `k` students of a view, e.g. top(10, college='150', course='btech', batch='23').
+
+        Returns:
+            List of (rank, enrollment, rating)
+        """
+        board = self.boards.get(self._key(scope), [])
+        return [(i + 1, enrollment, -score) for i, (score, enrollment) in enumerate(board[:k])]
+
+    def rank(self, enrollment: str, **scope) -> Optional[int]:
+        """1-based rank of a student within a view, or None if they aren't in it"""
+        board = self.boards.get(self._key(scope))
+        position = self.engine.position.get(enrollment)
+        if board is None or position is None:
+            return None
+        entry = (-float(self._scores[position]), enrollment)
+        index = bisect_left(board, entry)
+        if index < len(board) and board[index] == entry:
+            return index + 1
+        return None
+
+    def size(self, **scope) -> int:
+        return len(self.boards.get(self._key(scope), []))
+
+    def save(self, path: str = 'data/external/leaderboards.npz'):
+        """Snapshot every board's order (temp file + os.replace)"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        position = self.engine.position
+        arrays = {
+            'enrollments': np.array(self.engine.enrollments),
+            'scores': self._scores,
+            'keys': np.array([json.dumps([list(g), list(v)]) for g, v in self.boards]),
+        }
+        for i, board in enumerate(self.boards.values()):
+            arrays[f'order_{i}'] = np.fromiter((position[e] for _, e in board), dtype=np.int64, count=len(board))
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def load_snapshot(path: str) -> dict:
+        with np.load(path) as data:
+            orders = {}
+            for i, raw in enumerate(data['keys'].tolist()):
+                grouping, values = json.loads(raw)
+                orders[(tuple(grouping), tuple(values))] = data[f'order_{i}']
+            return {
+                'enrollments': [str(e) for e in data['enrollments'].tolist()],
+                'scores': data['scores'].astype(np.float64),
+                'orders': orders,
+            }
+
+
+if __name__ == "__main__":
+    files = ['data.json', 'dataMSIT.json']
+    engine = EloEngine.from_jsonl(files)
+
+    start = time.perf_counter()
+    boards = Leaderboards.from_jsonl(engine, files, snapshot_path='data/external/leaderboards.npz')
+    print(f"🏆 {len(boards.boards)} leaderboards ready in {time.perf_counter() - start:.3f}s")
+
+    rng = np.random.default_rng(0)
+    n = len(engine)
+    start = time.perf_counter()
+    for _ in range(100):
+        winners = rng.integers(0, n, 200)
+        engine.apply_positions(winners, (winners + rng.integers(1, n, 200)) % n)
+    print(f"⚡ 100 batches of 200 results applied in {time.perf_counter() - start:.3f}s ({boards.stats})")
+    print(boards.top(5))
+    boards.save()
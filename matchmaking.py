@@ -0,0 +1,220 @@
+import itertools
+import json
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from elo import EloEngine
+
+# Attributes pairs can be restricted to; a query may fix any subset of them
+SCOPE_FIELDS = ('gender', 'college', 'course')
+
+BucketKey = Tuple[Optional[str], Optional[str], Optional[str]]
+
+
+class _Bucket:
+    """Members of one (gender, college, course) scope, kept sorted by rating"""
+    __slots__ = ('members', 'order', 'ratings', 'cum_weights', 'dirty')
+
+    def __init__(self, members: np.ndarray):
+        self.members = members
+        self.order = members
+        self.ratings = np.empty(0)
+        self.cum_weights = np.empty(0)
+        self.dirty = True
+
+    def refresh(self, ratings: np.ndarray, matches: np.ndarray):
+        sort = np.argsort(ratings[self.members], kind='stable')
+        self.order = self.members[sort]
+        self.ratings = ratings[self.order]
+        # Students with few matches are shown more often
+        self.cum_weights = np.cumsum(1.0 / (1.0 + matches[self.order]))
+        self.dirty = False
+
+
+class MatchmakingIndex:
+    """
+    Picks face-card pairs by Elo, gender and college/course in O(log n).
+
+    Every student is placed in one bucket per combination of fixed / wildcard
+    (gender, college, course). Each bucket holds its members sorted by rating
+    plus the cumulative sampling weight 1 / (1 + matches), so:
+
+      * the first card is drawn weighted toward students with few matches
+        (one searchsorted on the cumulative weights),
+      * the opponent is drawn, with the same weighting, from the students
+        within +/- delta rating (two searchsorted calls for the window, one to
+        sample inside it).
+
+    The index subscribes to an EloEngine: after each batch of results only the
+    buckets containing changed students are marked dirty, and each is re-sorted
+    once, on its next query.
+
+    Example:
+        engine = EloEngine.from_jsonl(['data.json', 'dataMSIT.json'])
+        index = MatchmakingIndex.from_jsonl(engine, ['data.json', 'dataMSIT.json'])
+        left, right = index.pair(gender='female', college='150')
+    """
+
+    def __init__(self, engine: EloEngine, attributes: Dict[str, List[Optional[str]]],
+                 eligible: Optional[np.ndarray] = None, seed: Optional[int] = None):
+        """
+        Args:
+            engine: EloEngine holding ratings and match counts
+            attributes: gender / college / course column per engine position
+            eligible: Boolean mask of students that may be shown (e.g. those with an image)
+            seed: RNG seed
+        """
+        self.engine = engine
+        self.rng = np.random.default_rng(seed)
+        n = len(engine)
+        eligible = np.ones(n, dtype=bool) if eligible is None else np.asarray(eligible, dtype=bool)
+
+        columns = [attributes.get(field) or [None] * n for field in SCOPE_FIELDS]
+        members: Dict[BucketKey, List[int]] = {}
+        for position in np.flatnonzero(eligible).tolist():
+            values = [column[position] for column in columns]
+            # Every fixed/wildcard combination of the attributes this student has
+            for mask in itertools.product((False, True), repeat=len(SCOPE_FIELDS)):
+                if any(fixed and value is None for fixed, value in zip(mask, values)):
+                    continue
+                key = tuple(value if fixed else None for fixed, value in zip(mask, values))
+                members.setdefault(key, []).append(position)
+
+        self.buckets: Dict[BucketKey, _Bucket] = {}
+        self._bucket_of = np.full((n, 2 ** len(SCOPE_FIELDS)), -1, dtype=np.int64)
+        fill = np.zeros(n, dtype=np.int64)
+        self._bucket_list: List[_Bucket] = []
+        for bucket_id, (key, positions) in enumerate(members.items()):
+            positions = np.array(positions, dtype=np.int64)
+            bucket = _Bucket(positions)
+            self.buckets[key] = bucket
+            self._bucket_list.append(bucket)
+            self._bucket_of[positions, fill[positions]] = bucket_id
+            fill[positions] += 1
+
+        engine.subscribe(self.update)
+        self.stats = {'pairs': 0, 'widened': 0, 'refreshes': 0}
+
+    @classmethod
+    def from_records(cls, engine: EloEngine, records: Iterable[dict], require_image: bool = True,
+                     seed: Optional[int] = None) -> 'MatchmakingIndex':
+        """Take gender / college / course (and image presence) from data.json-style records"""
+        n = len(engine)
+        attributes = {field: [None] * n for field in SCOPE_FIELDS}
+        eligible = np.zeros(n, dtype=bool)
+        for record in records:
+            position = engine.position.get(record.get('enrollment'))
+            if position is None:
+                continue
+            for field in SCOPE_FIELDS:
+                attributes[field][position] = record.get(field)
+            eligible[position] = bool(record.get('image')) or not require_image
+        return cls(engine, attributes, eligible=eligible, seed=seed)
+
+    @classmethod
+    def from_jsonl(cls, engine: EloEngine, paths: Iterable[str], **kwargs) -> 'MatchmakingIndex':
+        def records():
+            for path in paths:
+                with open(path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        if line.strip():
+                            yield json.loads(line)
+        return cls.from_records(engine, records(), **kwargs)
+
+    def update(self, changed: np.ndarray):
+        """Mark every bucket containing a changed position for re-sorting (EloEngine listener)"""
+        bucket_ids = np.unique(self._bucket_of[changed].ravel())
+        for bucket_id in bucket_ids[bucket_ids >= 0].tolist():
+            self._bucket_list[bucket_id].dirty = True
+
+    def _bucket(self, gender: Optional[str], college: Optional[str], course: Optional[str]) -> Optional[_Bucket]:
+        bucket = self.buckets.get((gender, college, course))
+        if bucket is not None and bucket.dirty:
+            bucket.refresh(self.engine.ratings, self.engine.matches)
+            self.stats['refreshes'] += 1
+        return bucket
+
+    def _sample(self, bucket: _Bucket, lo: int, hi: int) -> int:
+        """Weighted draw of a sorted index in [lo, hi)"""
+        cum = bucket.cum_weights
+        base = cum[lo - 1] if lo > 0 else 0.0
+        target = base + self.rng.random() * (cum[hi - 1] - base)
+        return min(int(np.searchsorted(cum, target, side='right')), hi - 1)
+
+    def _opponent(self, bucket: _Bucket, index: int, delta: float, max_delta: float) -> Optional[int]:
+        rating = bucket.ratings[index]
+        while True:
+            lo = int(np.searchsorted(bucket.ratings, rating - delta, side='left'))
+            hi = int(np.searchsorted(bucket.ratings, rating + delta, side='right'))
+            if hi - lo > 1:
+                for _ in range(8):
+                    candidate = self._sample(bucket, lo, hi)
+                    if candidate != index:
+                        return candidate
+                # Heavily weighted toward ourselves: take a neighbour
+                return index + 1 if index + 1 < hi else index - 1
+            if delta >= max_delta:
+                return None
+            delta *= 2
+            self.stats['widened'] += 1
+
+    def find_opponent(self, enrollment: str, delta: float = 100, max_delta: float = 800,
+                      gender: Optional[str] = None, college: Optional[str] = None,
+                      course: Optional[str] = None) -> Optional[str]:
+        """
+        An opponent within +/- delta rating of `enrollment` in the given scope.
+
+        The window is doubled (up to `max_delta`) when nobody else is in it.
+        """
+        bucket = self._bucket(gender, college, course)
+        if bucket is None:
+            return None
+        position = self.engine.position[enrollment]
+        rating = self.engine.ratings[position]
+        # Locate ourselves among equal ratings
+        lo = int(np.searchsorted(bucket.ratings, rating, side='left'))
+        hi = int(np.searchsorted(bucket.ratings, rating, side='right'))
+        matches = np.flatnonzero(bucket.order[lo:hi] == position)
+        if len(matches) == 0:
+            return None  # not in this scope
+        opponent = self._opponent(bucket, lo + int(matches[0]), delta, max_delta)
+        return None if opponent is None else self.engine.enrollments[bucket.order[opponent]]
+
+    def pair(self, gender: Optional[str] = None, college: Optional[str] = None, course: Optional[str] = None,
+             delta: float = 100, max_delta: float = 800) -> Optional[Tuple[str, str]]:
+        """
+        Two students of the given scope with close ratings, favouring those with few matches.
+
+        Returns:
+            (enrollment, enrollment) or None if the scope has fewer than two students
+        """
+        bucket = self._bucket(gender, college, course)
+        if bucket is None or len(bucket.order) < 2:
+            return None
+        first = self._sample(bucket, 0, len(bucket.order))
+        second = self._opponent(bucket, first, delta, max_delta)
+        if second is None:
+            return None
+        self.stats['pairs'] += 1
+        enrollments = self.engine.enrollments
+        return enrollments[bucket.order[first]], enrollments[bucket.order[second]]
+
+
+if __name__ == "__main__":
+    files = ['data.json', 'dataMSIT.json']
+    engine = EloEngine.from_jsonl(files)
+    index = MatchmakingIndex.from_jsonl(engine, files, seed=0)
+    print(f"🗂️  {len(index.buckets)} buckets over {len(engine)} students")
+
+    start = time.perf_counter()
+    pairs = [index.pair(gender=None) for _ in range(20_000)]
+    elapsed = time.perf_counter() - start
+    print(f"🎯 {len(pairs) / elapsed:.0f} pairs/s ({index.stats})")
+
+    engine.apply([a for a, _ in pairs[:5000]], [b for _, b in pairs[:5000]])
+    start = time.perf_counter()
+    for _ in range(20_000):
+        index.pair()
+    print(f"🎯 after 5000 results: {20_000 / (time.perf_counter() - start):.0f} pairs/s ({index.stats})")
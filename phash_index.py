@@ -0,0 +1,329 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from image_store import FaceImageStore
+
+HASH_SIZE = 8        # 8x8 low-frequency DCT block -> 64-bit hash
+IMG_SIZE = 32        # image is reduced to 32x32 before the DCT
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    matrix = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2 / n)
+    matrix[0] /= np.sqrt(2)
+    return matrix
+
+
+_DCT = _dct_matrix(IMG_SIZE)
+
+
+def phash_pixels(pixels: np.ndarray) -> np.uint64:
+    """64-bit perceptual hash of a 32x32 grayscale array"""
+    dct = _DCT @ pixels.astype(np.float64) @ _DCT.T
+    low = dct[:HASH_SIZE, :HASH_SIZE].ravel()
+    # Median of the AC terms; the DC term would dominate
+    bits = low > np.median(low[1:])
+    return np.packbits(bits).view('>u8')[0].astype(np.uint64)
+
+
+def phash_file(path: str) -> Optional[int]:
+    """Perceptual hash of an image file, or None if it can't be decoded"""
+    try:
+        from PIL import Image
+    except ImportError:
+        raise RuntimeError(
+            "Pillow is required for perceptual hashing. Install it with:\n"
+            "    pip install pillow"
+        )
+    try:
+        with Image.open(path) as img:
+            img.draft('L', (IMG_SIZE * 2, IMG_SIZE * 2))
+            small = img.convert('L').resize((IMG_SIZE, IMG_SIZE), Image.Resampling.LANCZOS)
+            return int(phash_pixels(np.asarray(small)))
+    except Exception:
+        return None
+
+
+def popcount64(values: np.ndarray) -> np.ndarray:
+    """Number of set bits in each uint64"""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(values)
+    table = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+    return table[values.view(np.uint8).reshape(*values.shape, 8)].sum(axis=-1)
+
+
+def _hash_task(item: Tuple[str, str]) -> Tuple[str, Optional[int]]:
+    key, path = item
+    return key, phash_file(path)
+
+
+class PHashIndex:
+    """
+    Perceptual-hash index over stored profile images.
+
+    Hashes live in one uint64 NumPy array; near-duplicate search XORs a block
+    of query hashes against the whole array and popcounts the result, so
+    comparing 50k images is a few hundred vectorised blocks instead of 1.25
+    billion Python comparisons. Exact-duplicate hashes are collapsed first, so a
+    placeholder shared by thousands of students costs a single row.
+
+    Example:
+        index = PHashIndex.load_or_build(store)
+        report = index.find_clusters(max_distance=6)
+    """
+
+    def __init__(self, keys: List[str], hashes: np.ndarray):
+        """
+        Args:
+            keys: sha256 of each stored image
+            hashes: uint64 perceptual hash of each image (same order as keys)
+        """
+        self.keys = list(keys)
+        self.hashes = np.asarray(hashes, dtype=np.uint64)
+        self._position = {key: i for i, key in enumerate(self.keys)}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @classmethod
+    def build(cls, sources: Iterable[Tuple[str, str]], existing: Optional['PHashIndex'] = None,
+              max_workers: Optional[int] = None) -> 'PHashIndex':
+        """
+        Hash (sha256, path) sources on a process pool, reusing hashes already in `existing`.
+        """
+        keys, hashes, todo = [], [], []
+        for key, path in sources:
+            if existing is not None and key in existing._position:
+                keys.append(key)
+                hashes.append(int(existing.hashes[existing._position[key]]))
+            else:
+                todo.append((key, path))
+
+        if todo:
+            print(f"Hashing {len(todo)} new images...")
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                for key, value in executor.map(_hash_task, todo, chunksize=32):
+                    if value is not None:
+                        keys.append(key)
+                        hashes.append(value)
+
+        return cls(keys, np.array(hashes, dtype=np.uint64))
+
+    def save(self, path: str):
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, keys=np.array(self.keys), hashes=self.hashes)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'PHashIndex':
+        with np.load(path) as data:
+            return cls([str(key) for key in data['keys']], data['hashes'])
+
+    @classmethod
+    def load_or_build(cls, store: FaceImageStore, path: str = 'data/external/phash_index.npz') -> 'PHashIndex':
+        """Incrementally refresh the on-disk index from the image store"""
+        existing = cls.load(path) if os.path.exists(path) else None
+        index = cls.build(store.iter_blobs(), existing=existing)
+        index.save(path)
+        return index
+
+    def search(self, query_hashes: np.ndarray, max_distance: int, candidates: Optional[np.ndarray] = None,
+               block_size: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        All (query, candidate) pairs within `max_distance` bits.
+
+        Args:
+            query_hashes: uint64 hashes to look up
+            max_distance: Max Hamming distance (inclusive)
+            candidates: uint64 hashes to search (default: the whole index)
+            block_size: Queries compared per vectorised block (default: ~2M comparisons per block)
+
+        Returns:
+            Arrays (query_idx, candidate_idx, distance)
+        """
+        query_hashes = np.asarray(query_hashes, dtype=np.uint64)
+        candidates = self.hashes if candidates is None else np.asarray(candidates, dtype=np.uint64)
+        # Bound the (block x candidates) distance matrix to a few MB
+        block_size = block_size or max(1, 2_000_000 // max(1, len(candidates)))
+
+        found_q, found_c, found_d = [], [], []
+        for start in range(0, len(query_hashes), block_size):
+            block = query_hashes[start:start + block_size]
+            distances = popcount64(block[:, None] ^ candidates[None, :])
+            q, c = np.nonzero(distances <= max_distance)
+            found_q.append(q + start)
+            found_c.append(c)
+            found_d.append(distances[q, c])
+
+        if not found_q:
+            empty = np.array([], dtype=np.int64)
+            return empty, empty, empty
+        return np.concatenate(found_q), np.concatenate(found_c), np.concatenate(found_d)
+
+    def find_clusters(self, max_distance: int = 6) -> List[List[str]]:
+        """
+        Group images whose hashes are within `max_distance` bits of each other.
+
+        Returns:
+            Clusters (lists of sha256) with at least two members, largest first
+        """
+        unique, inverse = np.unique(self.hashes, return_inverse=True)
+
+        # Union-find over distinct hashes
+        parent = np.arange(len(unique))
+
+        def find(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        q, c, _ = self.search(unique, max_distance, candidates=unique)
+        for a, b in zip(q[q < c], c[q < c]):
+            ra, rb = find(a), find(b)
+            if ra != rb:
+                parent[rb] = ra
+
+        roots = np.array([find(i) for i in range(len(unique))])
+        groups: Dict[int, List[str]] = {}
+        for key, hash_idx in zip(self.keys, inverse):
+            groups.setdefault(int(roots[hash_idx]), []).append(key)
+
+        clusters = [members for members in groups.values() if len(members) > 1]
+        return sorted(clusters, key=len, reverse=True)
+
+    def diameter(self, keys: Iterable[str]) -> int:
+        """Largest pairwise Hamming distance among the hashes of `keys` (0 for fewer than two)"""
+        hashes = np.unique(self.hashes[[self._position[key] for key in keys]])
+        if len(hashes) < 2:
+            return 0
+        return int(popcount64(hashes[:, None] ^ hashes[None, :]).max())
+
+    def match_known(self, placeholder_hashes: Iterable[int], max_distance: int = 6) -> List[str]:
+        """sha256 of every image within `max_distance` of a known placeholder hash"""
+        placeholder_hashes = np.array(list(placeholder_hashes), dtype=np.uint64)
+        if len(placeholder_hashes) == 0:
+            return []
+        _, c, _ = self.search(placeholder_hashes, max_distance)
+        return sorted({self.keys[i] for i in c})
+
+
+def placeholder_report(store: FaceImageStore, index: PHashIndex, max_distance: int = 6,
+                       min_shared: int = 3, known_placeholders: Iterable[int] = (),
+                       output_file: str = 'placeholder_report.json') -> dict:
+    """
+    Find near-duplicate clusters and likely placeholder images.
+
+    A cluster is treated as a placeholder when its images are shared by at
+    least `min_shared` enrollments (real students don't share a photo) and
+    every pair of its images is within `max_distance` bits, or when it matches
+    a known placeholder hash. find_clusters links images transitively, so a
+    chain of similar-but-distinct portraits can form one large cluster; the
+    diameter check keeps such chains from being labelled placeholders.
+
+    Returns:
+        Report dict (also written to `output_file`), including 'imageless_enrollments'
+    """
+    start_time = time.time()
+
+    by_hash: Dict[str, List[str]] = {}
+    for enrollment, sha256 in store.iter_images():
+        by_hash.setdefault(sha256, []).append(enrollment)
+
+    clusters = index.find_clusters(max_distance)
+    known = set(index.match_known(known_placeholders, max_distance))
+
+    # Singletons can still be placeholders if many enrollments share the exact file
+    clustered = {sha256 for cluster in clusters for sha256 in cluster}
+    clusters += [[sha256] for sha256, members in by_hash.items()
+                 if sha256 not in clustered and len(members) >= min_shared]
+
+    report_clusters = []
+    imageless = set()
+    for cluster in clusters:
+        enrollments = sorted(e for sha256 in cluster for e in by_hash.get(sha256, []))
+        diameter = index.diameter(cluster)
+        is_placeholder = ((len(enrollments) >= min_shared and diameter <= max_distance)
+                          or any(sha256 in known for sha256 in cluster))
+        report_clusters.append({
+            'images': cluster,
+            'enrollments': enrollments,
+            'diameter': diameter,
+            'placeholder': is_placeholder,
+        })
+        if is_placeholder:
+            imageless.update(enrollments)
+
+    report = {
+        'summary': {
+            'images_indexed': len(index),
+            'near_duplicate_clusters': len(report_clusters),
+            'placeholder_clusters': sum(1 for c in report_clusters if c['placeholder']),
+            'imageless_enrollments': len(imageless),
+            'max_distance': max_distance,
+            'seconds': round(time.time() - start_time, 2),
+        },
+        'clusters': report_clusters,
+        'imageless_enrollments': sorted(imageless),
+    }
+
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print(f"🔎 {report['summary']}")
+    return report
+
+
+def mark_imageless(jsonl_path: str, enrollments: Iterable[str]) -> int:
+    """
+    Set `image` to null for the given enrollments in a data.json-style file.
+
+    The file is rewritten via temp file + os.replace.
+
+    Returns:
+        Number of records changed
+    """
+    enrollments = set(enrollments)
+    changed = 0
+    tmp_path = f"{jsonl_path}.tmp"
+    with open(jsonl_path, 'r', encoding='utf-8') as src, open(tmp_path, 'w', encoding='utf-8') as dst:
+        for line in src:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record.get('enrollment') in enrollments and record.get('image'):
+                record['image'] = None
+                changed += 1
+            json.dump(record, dst, ensure_ascii=False)
+            dst.write("\n")
+    os.replace(tmp_path, jsonl_path)
+
+    print(f"🚫 Marked {changed} records in {jsonl_path} as imageless (placeholder / duplicate)")
+    return changed
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Find placeholder / duplicate face images")
+    parser.add_argument('--max-distance', type=int, default=6)
+    parser.add_argument('--apply', action='store_true',
+                        help="Null the image of flagged enrollments in the JSONL files (default: report only)")
+    parser.add_argument('jsonl', nargs='*', default=['data.json', 'dataMSIT.json'])
+    args = parser.parse_args()
+
+    with FaceImageStore() as store:
+        index = PHashIndex.load_or_build(store)
+        report = placeholder_report(store, index, max_distance=args.max_distance)
+    if args.apply:
+        for path in args.jsonl:
+            mark_imageless(path, report['imageless_enrollments'])
+    else:
+        print(f"📄 Review placeholder_report.json; rerun with --apply to null "
+              f"{len(report['imageless_enrollments'])} images in {', '.join(args.jsonl)}")
@@ -0,0 +1,311 @@
+import glob
+import json
+import os
+import shutil
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from elo import DEFAULT_RATING, EloEngine
+
+# Field order of a data.json record
+RECORD_FIELDS = ('name', 'image', 'college', 'course', 'batch', 'branch', 'enrollment', 'elo', 'matches', 'gender')
+# Low-cardinality fields stored as int32 codes into a per-field category list (-1 = null)
+CATEGORICAL = ('college', 'course', 'batch', 'branch', 'gender')
+# Free-text fields stored as one UTF-8 blob plus offsets
+TEXT = ('name', 'image')
+FORMAT_VERSION = 1
+
+
+def _pack_text(values: Sequence[Optional[str]]) -> Dict[str, np.ndarray]:
+    encoded = [(value or '').encode('utf-8') for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum(np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)), out=offsets[1:])
+    return {
+        'offsets': offsets,
+        'data': np.frombuffer(b''.join(encoded), dtype=np.uint8).copy(),
+        'null': np.fromiter((value is None for value in values), dtype=bool, count=len(values)),
+    }
+
+
+class ProfileStore:
+    """
+    Read-mostly columnar copy of the profile JSONL files.
+
+    Instead of one dict per student, every field is a NumPy column:
+
+      * enrollment: fixed-width bytes, plus an argsort so lookups are a binary search
+      * college / course / batch / branch / gender: int32 codes into a category list
+      * name / image: one UTF-8 blob with int64 offsets and a null mask
+      * elo (float64) and matches (int32)
+
+    save() writes each column as a .npy file next to a meta.json in a new
+    version directory and atomically re-points the store's symlink at it;
+    load() memory-maps them read-only, so startup costs a few file opens
+    regardless of size, pages are only read when touched, and worker
+    processes that load the same version share one copy through the page
+    cache. Pickling a loaded store (e.g. into a ProcessPool) just re-opens
+    that version.
+
+    Example:
+        profiles = ProfileStore.load_or_build(['data.json', 'dataMSIT.json'])
+        profiles.count(college='150', has_image=True)
+        engine = profiles.engine()
+        index = MatchmakingIndex(engine, profiles.attributes(), eligible=profiles.has_image())
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray], categories: Dict[str, List[str]],
+                 path: Optional[str] = None):
+        """
+        Args:
+            columns: Column arrays, as built by from_records or loaded from disk
+            categories: Category list of each CATEGORICAL field
+            path: Directory the columns were loaded from (None if built in memory)
+        """
+        self.columns = columns
+        self.categories = categories
+        self.path = path
+        self._codes = {field: {value: code for code, value in enumerate(values)}
+                       for field, values in categories.items()}
+        # Appending None lets code -1 index straight to a null
+        self._values = {field: np.array(list(values) + [None], dtype=object) for field, values in categories.items()}
+
+    def __len__(self) -> int:
+        return len(self.columns['enrollment'])
+
+    def __reduce__(self):
+        if self.path is not None:
+            return self.__class__.load, (self.path,)
+        return self.__class__, (self.columns, self.categories)
+
+    @classmethod
+    def from_records(cls, records: Iterable[dict]) -> 'ProfileStore':
+        """Build from data.json-style records (header rows skipped, first occurrence of an enrollment wins)"""
+        seen = set()
+        enrollments, ratings, matches = [], [], []
+        codes: Dict[str, List[int]] = {field: [] for field in CATEGORICAL}
+        interned: Dict[str, Dict[str, int]] = {field: {} for field in CATEGORICAL}
+        text: Dict[str, List[Optional[str]]] = {field: [] for field in TEXT}
+
+        for record in records:
+            enrollment = str(record.get('enrollment'))
+            if not enrollment.isdigit() or enrollment in seen:
+                continue
+            seen.add(enrollment)
+            enrollments.append(enrollment)
+            ratings.append(record.get('elo', DEFAULT_RATING))
+            matches.append(record.get('matches', 0))
+            for field in CATEGORICAL:
+                value = record.get(field)
+                table = interned[field]
+                codes[field].append(-1 if value is None else table.setdefault(str(value), len(table)))
+            for field in TEXT:
+                text[field].append(record.get(field))
+
+        enrollment_column = np.array(enrollments, dtype='S') if enrollments else np.empty(0, dtype='S11')
+        columns = {
+            'enrollment': enrollment_column,
+            'order': np.argsort(enrollment_column, kind='stable').astype(np.int64),
+            'elo': np.array(ratings, dtype=np.float64),
+            'matches': np.array(matches, dtype=np.int32),
+        }
+        for field in CATEGORICAL:
+            columns[field] = np.array(codes[field], dtype=np.int32)
+        for field in TEXT:
+            for part, array in _pack_text(text[field]).items():
+                columns[f"{field}_{part}"] = array
+        return cls(columns, {field: list(table) for field, table in interned.items()})
+
+    @classmethod
+    def from_jsonl(cls, paths: Iterable[str]) -> 'ProfileStore':
+        def records():
+            for path in paths:
+                with open(path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        if line.strip():
+                            yield json.loads(line)
+        return cls.from_records(records())
+
+    def save(self, path: str = 'data/external/profiles', sources: Sequence[str] = ()):
+        """
+        Write the columns as .npy files plus meta.json and publish them at `path`.
+
+        Each save goes to a new `<path>.v<n>` directory; `path` is a symlink
+        that is then swapped to it with one os.replace, so a load sees either
+        the old or the new version, never a mix. The previous version is kept
+        for loads that resolved it just before the swap; older ones are removed.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        version_path = f"{path}.v{time.time_ns()}"
+        os.makedirs(version_path)
+        for name, column in self.columns.items():
+            np.save(os.path.join(version_path, f"{name}.npy"), column)
+        meta = {
+            'version': FORMAT_VERSION,
+            'rows': len(self),
+            'columns': list(self.columns),
+            'categories': self.categories,
+            'sources': list(sources),
+        }
+        with open(os.path.join(version_path, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+        if os.path.isdir(path) and not os.path.islink(path):
+            # Plain directory from before versioned saves: becomes the oldest version
+            os.replace(path, f"{path}.v0")
+        link_tmp = f"{path}.link.tmp"
+        if os.path.lexists(link_tmp):
+            os.remove(link_tmp)
+        os.symlink(os.path.basename(version_path), link_tmp)
+        os.replace(link_tmp, path)
+
+        versions = sorted(glob.glob(f"{glob.escape(path)}.v*"), key=lambda p: int(p.rsplit('.v', 1)[1]))
+        for old in versions[:-2]:
+            shutil.rmtree(old)
+
+    @classmethod
+    def load(cls, path: str = 'data/external/profiles', mmap: bool = True) -> 'ProfileStore':
+        """
+        Open a saved store; with mmap=True columns are read-only memory maps.
+
+        The `path` link is resolved once, so every column comes from the same version.
+        """
+        path = os.path.realpath(path)
+        with open(os.path.join(path, 'meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('version') != FORMAT_VERSION:
+            raise ValueError(f"{path}: unsupported profile store version {meta.get('version')}")
+        columns = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r' if mmap else None)
+                   for name in meta['columns']}
+        return cls(columns, meta['categories'], path=path if mmap else None)
+
+    @classmethod
+    def load_or_build(cls, sources: Sequence[str], path: str = 'data/external/profiles') -> 'ProfileStore':
+        """Memory-map the saved store, rebuilding it first if any source file is newer or the list changed"""
+        sources = list(sources)
+        meta_path = os.path.join(path, 'meta.json')
+        if os.path.exists(meta_path):
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                saved_sources = json.load(f).get('sources')
+            built_at = os.path.getmtime(meta_path)
+            if saved_sources == sources and all(os.path.getmtime(source) <= built_at for source in sources):
+                return cls.load(path)
+        print(f"🧱 Building profile store from {', '.join(sources)}...")
+        cls.from_jsonl(sources).save(path, sources=sources)
+        return cls.load(path)
+
+    def position(self, enrollment: str) -> Optional[int]:
+        """Row of an enrollment number, or None"""
+        enrollments = self.columns['enrollment']
+        key = str(enrollment).encode('ascii')
+        if len(key) > enrollments.dtype.itemsize:
+            return None
+        order = self.columns['order']
+        index = int(np.searchsorted(enrollments, key, sorter=order))
+        if index < len(order) and enrollments[order[index]] == key:
+            return int(order[index])
+        return None
+
+    def _text(self, field: str, i: int) -> Optional[str]:
+        if self.columns[f"{field}_null"][i]:
+            return None
+        offsets = self.columns[f"{field}_offsets"]
+        return self.columns[f"{field}_data"][offsets[i]:offsets[i + 1]].tobytes().decode('utf-8')
+
+    def record(self, i: int) -> dict:
+        """Row `i` as a data.json-style dict"""
+        columns = self.columns
+        values = {field: self._values[field][columns[field][i]] for field in CATEGORICAL}
+        values.update({field: self._text(field, i) for field in TEXT})
+        values['enrollment'] = columns['enrollment'][i].decode('ascii')
+        values['elo'] = int(np.rint(columns['elo'][i]))
+        values['matches'] = int(columns['matches'][i])
+        return {field: values[field] for field in RECORD_FIELDS}
+
+    def get(self, enrollment: str) -> Optional[dict]:
+        i = self.position(enrollment)
+        return None if i is None else self.record(i)
+
+    def __iter__(self) -> Iterator[dict]:
+        for i in range(len(self)):
+            yield self.record(i)
+
+    def has_image(self) -> np.ndarray:
+        """Boolean column: the profile has a non-empty image URL"""
+        return np.diff(self.columns['image_offsets']) > 0
+
+    def mask(self, has_image: Optional[bool] = None, **filters) -> np.ndarray:
+        """
+        Boolean row mask for equality filters (a list/tuple/set value means IN),
+        with the same semantics as StudentStore.query.
+        """
+        mask = np.ones(len(self), dtype=bool)
+        for field, value in filters.items():
+            if value is None:
+                continue
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            if field in CATEGORICAL:
+                codes = [self._codes[field][str(v)] for v in values if str(v) in self._codes[field]]
+                mask &= np.isin(self.columns[field], codes)
+            elif field == 'enrollment':
+                rows = np.zeros(len(self), dtype=bool)
+                rows[[i for i in map(self.position, values) if i is not None]] = True
+                mask &= rows
+            else:
+                raise ValueError(f"Unknown filter column: {field}")
+        if has_image is not None:
+            mask &= self.has_image() == has_image
+        return mask
+
+    def count(self, has_image: Optional[bool] = None, **filters) -> int:
+        return int(self.mask(has_image, **filters).sum())
+
+    def iter_records(self, has_image: Optional[bool] = None, **filters) -> Iterator[dict]:
+        """Records matching the filters, in file order"""
+        for i in np.flatnonzero(self.mask(has_image, **filters)).tolist():
+            yield self.record(i)
+
+    def enrollments(self) -> List[str]:
+        return self.columns['enrollment'].astype(str).tolist()
+
+    def attributes(self, fields: Sequence[str] = CATEGORICAL) -> Dict[str, List[Optional[str]]]:
+        """Decoded categorical columns, in the shape MatchmakingIndex and Leaderboards take"""
+        return {field: self._values[field][self.columns[field]].tolist() for field in fields}
+
+    def engine(self, **kwargs) -> EloEngine:
+        """EloEngine over every profile (ratings are copied, the store stays read-only)"""
+        return EloEngine(self.enrollments(), self.columns['elo'], self.columns['matches'], **kwargs)
+
+    def to_jsonl(self, path: str) -> int:
+        """Write every record as data.json-style JSONL (temp file + os.replace)"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for record in self:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, path)
+        return len(self)
+
+    def nbytes(self) -> int:
+        return sum(column.nbytes for column in self.columns.values())
+
+
+if __name__ == "__main__":
+    files = ['data.json', 'dataMSIT.json']
+
+    start = time.perf_counter()
+    records = []
+    for file in files:
+        with open(file, 'r', encoding='utf-8') as f:
+            records.extend(json.loads(line) for line in f if line.strip())
+    print(f"📄 json.loads: {len(records)} dicts in {time.perf_counter() - start:.3f}s")
+
+    ProfileStore.load_or_build(files)
+    start = time.perf_counter()
+    profiles = ProfileStore.load()
+    print(f"🗺️  mmap load: {len(profiles)} profiles in {time.perf_counter() - start:.4f}s, "
+          f"{profiles.nbytes() / 1024:.0f} KB of columns")
+    print(f"🖼️  {profiles.count(has_image=True)} with images; "
+          f"categories: { {field: len(values) for field, values in profiles.categories.items()} }")
@@ -0,0 +1,211 @@
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+
+import requests
+
+from http_fetcher import BASE_URL
+
+
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+# Weight of the newest sample in the latency moving average
+LATENCY_ALPHA = 0.2
+
+
+class _ProxyHealth:
+    __slots__ = ('proxy', 'successes', 'failures', 'consecutive_failures', 'latencies', 'latency',
+                 'quarantined_until', 'backoff', 'quarantines')
+
+    def __init__(self, proxy: str):
+        self.proxy = proxy
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.latencies = deque(maxlen=200)   # recent samples, for the p50/p95 in stats()
+        self.latency: Optional[float] = None  # exponentially weighted moving average
+        self.quarantined_until = 0.0
+        self.backoff = 0.0
+        self.quarantines = 0
+
+    def success_rate(self) -> float:
+        # Laplace smoothing so new proxies start at 50% instead of 0 or 100
+        return (self.successes + 1) / (self.successes + self.failures + 2)
+
+    def add_latency(self, latency: float):
+        self.latencies.append(latency)
+        self.latency = latency if self.latency is None else \
+            LATENCY_ALPHA * latency + (1 - LATENCY_ALPHA) * self.latency
+
+    def weight(self) -> float:
+        # O(1): choose() runs this for every proxy on every request
+        return self.success_rate() / max(self.latency or 1.0, 0.05)
+
+
+class ProxyPool:
+    """
+    Health-scored proxy selection shared by threads and async workers.
+
+    Tracks success rate, latency (moving average, plus p50/p95 in stats) and
+    consecutive failures per proxy, picks proxies with probability
+    proportional to success rate / average latency, and quarantines a proxy
+    after `failure_threshold` failures in a row with exponential backoff. A background thread re-probes quarantined proxies
+    once their backoff expires and puts healthy ones back into rotation.
+
+    Example:
+        pool = ProxyPool(['http://proxy1:8080', 'http://proxy2:8080'])
+        proxy = pool.choose()
+        ...
+        pool.report(proxy, ok=True, latency=0.8)
+    """
+
+    def __init__(self, proxies: Iterable[str], failure_threshold: int = 3,
+                 base_backoff: float = 10, max_backoff: float = 600,
+                 probe_url: str = BASE_URL, probe_timeout: float = 10, probe_interval: float = 5,
+                 background_probe: bool = True):
+        """
+        Args:
+            proxies: Proxy addresses (e.g. 'http://proxy1:port')
+            failure_threshold: Consecutive failures before a proxy is quarantined
+            base_backoff / max_backoff: Quarantine length in seconds, doubling per repeat
+            probe_url: URL fetched through a quarantined proxy to test it (pass the
+                scraper's base_url when it is overridden)
+            probe_timeout: Timeout for a probe request
+            probe_interval: Seconds between background probe sweeps
+            background_probe: Start the re-probe thread
+        """
+        self._health: Dict[str, _ProxyHealth] = {proxy: _ProxyHealth(proxy) for proxy in proxies}
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.probe_url = probe_url
+        self.probe_timeout = probe_timeout
+        self.probe_interval = probe_interval
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._probe_thread = None
+        if background_probe and self._health:
+            self._probe_thread = threading.Thread(target=self._probe_loop, name='proxy-probe', daemon=True)
+            self._probe_thread.start()
+
+    def __len__(self) -> int:
+        return len(self._health)
+
+    @property
+    def proxies(self) -> List[str]:
+        return list(self._health)
+
+    def choose(self) -> Optional[str]:
+        """Pick a healthy proxy, weighted by health; None when the pool is empty"""
+        with self._lock:
+            if not self._health:
+                return None
+
+            now = time.time()
+            active = [h for h in self._health.values() if h.quarantined_until <= now]
+            if not active:
+                # Everything is quarantined: use the one closest to release rather than nothing
+                return min(self._health.values(), key=lambda h: h.quarantined_until).proxy
+
+            weights = [h.weight() for h in active]
+            return random.choices(active, weights=weights, k=1)[0].proxy
+
+    def report(self, proxy: Optional[str], ok: bool, latency: Optional[float] = None):
+        """Record the outcome of a request made through `proxy`"""
+        if proxy is None:
+            return
+        with self._lock:
+            health = self._health.get(proxy)
+            if health is None:
+                return
+
+            if ok:
+                health.successes += 1
+                health.consecutive_failures = 0
+                health.quarantines = 0
+                if latency is not None:
+                    health.add_latency(latency)
+                return
+
+            health.failures += 1
+            health.consecutive_failures += 1
+            if health.consecutive_failures >= self.failure_threshold and health.quarantined_until <= time.time():
+                self._quarantine_locked(health)
+
+    def _quarantine_locked(self, health: _ProxyHealth):
+        health.backoff = min(self.max_backoff, self.base_backoff * (2 ** health.quarantines))
+        health.quarantines += 1
+        health.quarantined_until = time.time() + health.backoff
+        print(f"🚫 Proxy quarantined for {health.backoff:.0f}s: {health.proxy}")
+
+    def probe(self, proxy: str) -> bool:
+        """Fetch probe_url through `proxy` and fold the result into its health"""
+        start = time.time()
+        try:
+            response = requests.get(
+                self.probe_url,
+                proxies={'http': proxy, 'https': proxy},
+                timeout=self.probe_timeout,
+            )
+            ok = response.status_code < 400
+        except requests.RequestException:
+            ok = False
+        latency = time.time() - start
+
+        with self._lock:
+            health = self._health[proxy]
+            if ok:
+                health.consecutive_failures = 0
+                health.quarantined_until = 0.0
+                health.add_latency(latency)
+                print(f"✅ Proxy back in rotation: {proxy}")
+            else:
+                self._quarantine_locked(health)
+        return ok
+
+    def _probe_loop(self):
+        while not self._stop.wait(self.probe_interval):
+            now = time.time()
+            with self._lock:
+                due = [
+                    h.proxy for h in self._health.values()
+                    if h.quarantines and h.consecutive_failures and h.quarantined_until <= now
+                ]
+            for proxy in due:
+                if self._stop.is_set():
+                    return
+                self.probe(proxy)
+
+    def stats(self) -> Dict[str, dict]:
+        """Snapshot of per-proxy health"""
+        now = time.time()
+        with self._lock:
+            snapshot = {}
+            for proxy, health in self._health.items():
+                latencies = list(health.latencies)
+                p50 = _percentile(latencies, 50)
+                p95 = _percentile(latencies, 95)
+                snapshot[proxy] = {
+                    'success_rate': round(health.success_rate(), 3),
+                    'successes': health.successes,
+                    'failures': health.failures,
+                    'consecutive_failures': health.consecutive_failures,
+                    'p50': round(p50, 3) if p50 is not None else None,
+                    'p95': round(p95, 3) if p95 is not None else None,
+                    'quarantined_for': round(max(0.0, health.quarantined_until - now), 1),
+                }
+            return snapshot
+
+    def close(self):
+        self._stop.set()
+        if self._probe_thread is not None:
+            self._probe_thread.join(timeout=self.probe_timeout + 1)
@@ -0,0 +1,286 @@
+import csv
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterable, List, NamedTuple, Optional
+
+import pandas as pd
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from datastore import StudentStore
+from driver_pool import DriverPool
+from http_fetcher import BASE_URL, is_throttling
+from rate_limiter import AdaptiveRateLimiter, default_limiter
+
+# URL template
+URL_TEMPLATE = "{base_url}/ranklist/{Course}?batch={batch}&insti={Collegeid}&sem=0&branch={Branch}"
+
+CSV_HEADER = ["Enrollment Number", "Course", "Batch", "College ID", "Branch"]
+
+
+class Combo(NamedTuple):
+    """One ranklist page: course / batch / college / branch"""
+    course: str
+    batch: str
+    college: str
+    branch: str
+
+    def url(self, base_url: str = BASE_URL) -> str:
+        return URL_TEMPLATE.format(
+            base_url=base_url.rstrip('/'),
+            Course=self.course,
+            batch=self.batch,
+            Collegeid=self.college,
+            Branch=self.branch,
+        )
+
+
+def load_combos(csv_file: str, batches: Iterable) -> List[Combo]:
+    """
+    Build combos from a course list such as data/alldata.csv or filtered.csv.
+
+    Args:
+        csv_file: CSV with Course, Branch, College, Collegeid columns
+        batches: Batch years to harvest, e.g. [22, 23]
+
+    Returns:
+        One Combo per (row, batch)
+    """
+    df = pd.read_csv(csv_file, dtype=str)
+    return [
+        Combo(row['Course'], str(batch), row['Collegeid'], row['Branch'])
+        for batch in batches
+        for _, row in df.iterrows()
+    ]
+
+
+def parse_ranklist_html(html: str) -> List[str]:
+    """Enrollment numbers in the `td.limit-char` cells of a ranklist page"""
+    soup = BeautifulSoup(html, 'html.parser')
+    return [td.get_text(strip=True) for td in soup.find_all('td', class_='limit-char')]
+
+
+def ranklist_chrome_options(proxy: Optional[str] = None, user_agent: Optional[str] = None) -> Options:
+    """Headless Chrome setup for ranklist pages (JS must stay enabled)"""
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    if proxy:
+        chrome_options.add_argument(f'--proxy-server={proxy}')
+    if user_agent:
+        chrome_options.add_argument(f'user-agent={user_agent}')
+    return chrome_options
+
+
+class RanklistHarvester:
+    """
+    Concurrent ranklist scraper replacing enrollmentscraper.py / enrolment24.py.
+
+    Each worker drives a pooled Chrome, waits for the `td.limit-char` cells to
+    appear instead of sleeping a fixed 5 seconds, and hands the enrollment
+    numbers back so they are streamed into the output CSV as pages complete.
+
+    Example:
+        harvester = RanklistHarvester(max_workers=4)
+        harvester.harvest(load_combos('data/alldata.csv', [23]), 'enrollments23.csv')
+    """
+
+    def __init__(self, max_workers: int = 4, wait_timeout: float = 5, base_url: str = BASE_URL,
+                 driver_pool: Optional[DriverPool] = None, rate_limiter: Optional[AdaptiveRateLimiter] = None,
+                 use_http: bool = False, use_selenium: bool = True, retry_count: int = 2,
+                 http_timeout: float = 15):
+        """
+        Args:
+            max_workers: Ranklist pages loaded in parallel
+            wait_timeout: Seconds to wait for enrollment cells before treating a loaded page as empty
+                (the old scripts slept a fixed 5s)
+            base_url: Site root (overridable for local testing)
+            driver_pool: Optional shared DriverPool (default: a private one sized to max_workers)
+            rate_limiter: AdaptiveRateLimiter gating every page load (default: shared instance)
+            use_http: Try a plain HTTP fetch before Chrome (the live ranklist is rendered
+                client-side, so this mostly serves local mirrors such as benchmark.py's)
+            use_selenium: Load pages in Chrome when HTTP is off or returned no cells
+            retry_count: Extra HTTP attempts after a throttled failure (timeout, 429, 5xx)
+            http_timeout: Per-request timeout of the HTTP path in seconds
+        """
+        self.max_workers = max_workers
+        self.wait_timeout = wait_timeout
+        self.base_url = base_url
+        self.driver_pool = driver_pool or DriverPool(ranklist_chrome_options, max_size=max_workers)
+        self.rate_limiter = rate_limiter or default_limiter
+        self.use_http = use_http
+        self.use_selenium = use_selenium
+        self.retry_count = retry_count
+        self.http_timeout = http_timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(max_workers, 10), max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def fetch_enrollments(self, combo: Combo) -> List[str]:
+        """
+        Load one ranklist page and return its enrollment numbers.
+
+        An empty list means the page rendered no `td.limit-char` cells within wait_timeout.
+        """
+        url = combo.url(self.base_url)
+        if self.use_http:
+            # A failed fetch raises (after retries) rather than falling back: Chrome only
+            # helps when the page loaded but its cells are rendered client-side
+            enrollment_numbers = self._fetch_with_http(url)
+            if enrollment_numbers or not self.use_selenium:
+                return enrollment_numbers
+        return self._fetch_with_selenium(url)
+
+    def _fetch_with_http(self, url: str) -> List[str]:
+        """
+        Fast path: fetch the static HTML, no browser.
+
+        Throttled failures are retried once the rate limiter has backed off;
+        raises the requests exception when retries run out or the error isn't
+        a throttling signal (e.g. 404).
+        """
+        for attempt in range(self.retry_count + 1):
+            with self.rate_limiter.request(url) as slot:
+                try:
+                    response = self.session.get(url, timeout=self.http_timeout)
+                    response.raise_for_status()
+                    return parse_ranklist_html(response.text)
+                except requests.RequestException as e:
+                    if not is_throttling(e):
+                        slot.error()
+                        raise
+                    slot.throttled()
+                    if attempt == self.retry_count:
+                        raise
+            print(f"⚠ Retry {attempt + 1}/{self.retry_count} for {url}")
+        return []
+
+    def _fetch_with_selenium(self, url: str) -> List[str]:
+        pooled = self.driver_pool.acquire()
+        broken = False
+        try:
+            driver = pooled.driver
+            with self.rate_limiter.request(url) as slot:
+                try:
+                    driver.get(url)
+                except WebDriverException:
+                    broken = True
+                    raise
+
+                try:
+                    WebDriverWait(driver, self.wait_timeout).until(
+                        EC.presence_of_element_located((By.CSS_SELECTOR, "td.limit-char"))
+                    )
+                except TimeoutException:
+                    # A page that finished loading without cells is a genuinely empty combo;
+                    # only one that never finished loading says the site is struggling
+                    if driver.execute_script('return document.readyState') == 'complete':
+                        slot.ok()
+                    else:
+                        slot.throttled()
+                    return []
+
+                return parse_ranklist_html(driver.page_source)
+        finally:
+            self.driver_pool.release(pooled, broken=broken)
+
+    def harvest(self, combos: Iterable[Combo], output_file: str, mode: str = 'w',
+                store: Optional[StudentStore] = None) -> int:
+        """
+        Fetch every combo concurrently and stream rows into `output_file`.
+
+        Args:
+            combos: Ranklist pages to harvest
+            output_file: Enrollment CSV to write
+            mode: 'w' to start a fresh file with a header, 'a' to append
+            store: Optional StudentStore the rows are upserted into as well
+
+        Returns:
+            Number of enrollment rows written
+        """
+        combos = list(combos)
+        start_time = time.time()
+        rows_written = 0
+        empty = 0
+        failed = 0
+
+        print(f"Harvesting {len(combos)} ranklist pages with {self.max_workers} workers...")
+
+        with open(output_file, mode=mode, newline='') as file, \
+                ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            writer = csv.writer(file)
+            if mode == 'w':
+                writer.writerow(CSV_HEADER)
+
+            future_to_combo = {executor.submit(self.fetch_enrollments, combo): combo for combo in combos}
+            for future in as_completed(future_to_combo):
+                combo = future_to_combo[future]
+                url = combo.url(self.base_url)
+                try:
+                    enrollment_numbers = future.result()
+                except Exception as e:
+                    failed += 1
+                    print(f"Error scraping {url}: {e}")
+                    continue
+
+                if not enrollment_numbers:
+                    empty += 1
+
+                writer.writerows(
+                    [enrollment_number, combo.course, combo.batch, combo.college, combo.branch]
+                    for enrollment_number in enrollment_numbers
+                )
+                file.flush()
+                if store is not None:
+                    store.upsert_enrollments(
+                        {'enrollment': enrollment_number, 'course': combo.course, 'batch': combo.batch,
+                         'college': combo.college, 'branch': combo.branch}
+                        for enrollment_number in enrollment_numbers
+                    )
+                rows_written += len(enrollment_numbers)
+                print(f"Scraped: {url} ({len(enrollment_numbers)} enrollments)")
+
+        elapsed = time.time() - start_time
+        print(f"Done. {rows_written} enrollments from {len(combos)} pages "
+              f"({empty} empty, {failed} failed) in {elapsed:.1f}s. Data saved to '{output_file}'.")
+        print(f"🚦 Rate limits: {self.rate_limiter.snapshot()}")
+        return rows_written
+
+    def close(self):
+        self.driver_pool.close()
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def harvest_ranklists(course_csv: str, output_file: str, batches: Iterable = (23,), max_workers: int = 4) -> int:
+    """One-call harvest of every course row in `course_csv` for the given batches"""
+    with RanklistHarvester(max_workers=max_workers) as harvester:
+        return harvester.harvest(load_combos(course_csv, batches), output_file)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Harvest enrollment numbers from ipuranklist ranklist pages")
+    parser.add_argument('course_csv', help="Course list, e.g. data/alldata.csv")
+    parser.add_argument('output_file', help="Enrollment CSV to write")
+    parser.add_argument('--batch', type=int, nargs='+', default=[23], help="Batch year(s), e.g. 22 23")
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    harvest_ranklists(args.course_csv, args.output_file, batches=args.batch, max_workers=args.workers)
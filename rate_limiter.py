@@ -0,0 +1,188 @@
+import asyncio
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+OK = 'ok'                # healthy response: grow
+THROTTLED = 'throttled'  # timeout / 429 / 5xx / empty page: back off
+ERROR = 'error'          # failure that says nothing about load (e.g. 404): no change
+
+
+class _HostState:
+    __slots__ = ('rate', 'limit', 'tokens', 'updated', 'in_flight', 'ok', 'throttled', 'errors')
+
+    def __init__(self, rate: float, limit: float, burst: float):
+        self.rate = rate
+        self.limit = limit
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.in_flight = 0
+        self.ok = 0
+        self.throttled = 0
+        self.errors = 0
+
+
+class AdaptiveRateLimiter:
+    """
+    Per-host token bucket plus AIMD concurrency control.
+
+    Every request takes a token (refilled at `rate` per second) and a
+    concurrency slot (at most `limit` in flight). Healthy responses grow both
+    additively; timeouts, 429s and empty pages halve them. The limiter thus
+    settles at the throughput the site actually sustains.
+
+    Example:
+        with limiter.request(url) as slot:
+            response = session.get(url)
+            if response.status_code == 429:
+                slot.throttled()
+    """
+
+    def __init__(self, initial_rate: float = 2.0, min_rate: float = 0.2, max_rate: float = 50.0,
+                 initial_limit: float = 4, min_limit: float = 1, max_limit: float = 64,
+                 burst: float = 5.0):
+        """
+        Args:
+            initial_rate / min_rate / max_rate: Requests per second per host
+            initial_limit / min_limit / max_limit: Concurrent requests per host
+            burst: Token bucket capacity
+        """
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.initial_limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.burst = burst
+
+        self._hosts: Dict[str, _HostState] = {}
+        self._cond = threading.Condition()
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        return urlsplit(url).netloc or url
+
+    def _state(self, host: str) -> _HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostState(self.initial_rate, self.initial_limit, self.burst)
+        return state
+
+    def _try_acquire_locked(self, host: str) -> float:
+        """Take a token + slot if available; otherwise return seconds to wait"""
+        state = self._state(host)
+        now = time.monotonic()
+        state.tokens = min(self.burst, state.tokens + (now - state.updated) * state.rate)
+        state.updated = now
+
+        if state.in_flight >= int(state.limit):
+            return 0.05  # woken early by release()
+        if state.tokens < 1:
+            return (1 - state.tokens) / state.rate
+
+        state.tokens -= 1
+        state.in_flight += 1
+        return 0.0
+
+    def acquire(self, url: str):
+        """Block until a request to `url`'s host may start"""
+        host = self.host_of(url)
+        with self._cond:
+            while True:
+                wait = self._try_acquire_locked(host)
+                if wait == 0.0:
+                    return
+                self._cond.wait(wait)
+
+    async def acquire_async(self, url: str):
+        """asyncio flavour of acquire(): sleeps on the event loop instead of blocking it"""
+        host = self.host_of(url)
+        while True:
+            with self._cond:
+                wait = self._try_acquire_locked(host)
+            if wait == 0.0:
+                return
+            await asyncio.sleep(wait)
+
+    def release(self, url: str, outcome: str = OK):
+        """Finish a request and feed its outcome into the AIMD controller"""
+        host = self.host_of(url)
+        with self._cond:
+            state = self._state(host)
+            state.in_flight -= 1
+
+            if outcome == OK:
+                state.ok += 1
+                # Additive increase: about +1 slot / +1 req/s per `limit` healthy responses
+                state.limit = min(self.max_limit, state.limit + 1 / state.limit)
+                state.rate = min(self.max_rate, state.rate + 1 / state.limit)
+            elif outcome == THROTTLED:
+                state.throttled += 1
+                # Multiplicative decrease
+                state.limit = max(self.min_limit, state.limit / 2)
+                state.rate = max(self.min_rate, state.rate / 2)
+            else:
+                state.errors += 1
+
+            self._cond.notify_all()
+
+    def request(self, url: str) -> '_Slot':
+        """Context manager around acquire()/release(); an exception counts as THROTTLED"""
+        return _Slot(self, url)
+
+    def snapshot(self) -> Dict[str, dict]:
+        """Current rate, limit and counters per host"""
+        with self._cond:
+            return {
+                host: {
+                    'rate': round(state.rate, 2),
+                    'limit': int(state.limit),
+                    'in_flight': state.in_flight,
+                    'ok': state.ok,
+                    'throttled': state.throttled,
+                    'errors': state.errors,
+                }
+                for host, state in self._hosts.items()
+            }
+
+
+class _Slot:
+    def __init__(self, limiter: AdaptiveRateLimiter, url: str):
+        self.limiter = limiter
+        self.url = url
+        self.outcome: Optional[str] = None
+
+    def ok(self):
+        self.outcome = OK
+
+    def throttled(self):
+        self.outcome = THROTTLED
+
+    def error(self):
+        self.outcome = ERROR
+
+    def _finish(self, exc_type):
+        if self.outcome is None:
+            self.outcome = THROTTLED if exc_type is not None else OK
+        self.limiter.release(self.url, self.outcome)
+
+    def __enter__(self):
+        self.limiter.acquire(self.url)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._finish(exc_type)
+        return False
+
+    async def __aenter__(self):
+        await self.limiter.acquire_async(self.url)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._finish(exc_type)
+        return False
+
+
+# Shared by every fetch path unless a caller passes its own
+default_limiter = AdaptiveRateLimiter()
@@ -1,17 +1,121 @@
 import csv
 import json
-from extract_student_image import extract_student_image_and_name
-from collections import defaultdict
+import os
+import random
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from availability_index import AvailabilityIndex
+from datastore import StudentStore
+from extract_student_image import ProxyScraper
+from enrollment_csv import combo_key, iter_enrollment_rows
+from enrollment_decoder import iter_valid_rows
+from jsonl_writer import BufferedJsonlWriter, repair_jsonl
+from scrape_cache import ScrapeCache
 from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
 
-def scan_image_availability(csv_file='enrollments22.csv', output_file='image_availability_report.json', log_file='image_avail.txt'):
+
+def group_combos(csv_file: str, samples: int = 3, seed: int = 0,
+                 rows: Optional[Iterable[Dict[str, str]]] = None) -> Dict[str, dict]:
+    """
+    Group an enrollments CSV by course/batch/college/branch in a single pass.
+
+    Keeps a reservoir sample of up to `samples` enrollments per combo, so memory
+    is proportional to the number of combos, not rows. The seed makes the sample
+    (and therefore a resumed scan) reproducible for the same CSV. Pass `rows`
+    (e.g. StudentStore.iter_enrollment_rows()) to group those instead of the CSV.
+
+    Returns:
+        Dict of combo key -> {course, batch, college_id, branch, rows, samples}
+    """
+    rng = random.Random(seed)
+    combos = {}
+    for row in (rows if rows is not None else iter_enrollment_rows(csv_file)):
+        key = combo_key(row['course'], row['batch'], row['college'], row['branch'])
+        combo = combos.get(key)
+        if combo is None:
+            combo = combos[key] = {
+                'course': row['course'],
+                'batch': row['batch'],
+                'college_id': row['college'],
+                'branch': row['branch'],
+                'rows': 0,
+                'samples': [],
+            }
+        combo['rows'] += 1
+        if len(combo['samples']) < samples:
+            combo['samples'].append(row['enrollment'])
+        else:
+            slot = rng.randrange(combo['rows'])
+            if slot < samples:
+                combo['samples'][slot] = row['enrollment']
+    return combos
+
+
+def write_report(decided: list, output_file: str, summary_extra: Optional[dict] = None) -> dict:
+    """Write decided combos as image_availability_report.json (temp file + os.replace)"""
+    results = {'with_images': [], 'without_images': [], 'summary': {}}
+    for record in decided:
+        combo_data = {k: v for k, v in record.items() if k not in ('combo', 'has_images')}
+        results['with_images' if record['has_images'] else 'without_images'].append(combo_data)
+
+    total = len(decided)
+    with_images = len(results['with_images'])
+    results['summary'] = {
+        'total_combinations_tested': total,
+        'with_images': with_images,
+        'without_images': total - with_images,
+        'success_rate': f"{(with_images/total*100):.1f}%" if total > 0 else "0%",
+        **(summary_extra or {}),
+    }
+
+    tmp_path = f"{output_file}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, output_file)
+    return results
+
+
+def scan_image_availability(csv_file='enrollments22.csv', output_file='image_availability_report.json', log_file='image_avail.txt',
+                            samples: int = 3, max_workers: int = 8, scraper: Optional[ProxyScraper] = None,
+                            report_every: int = 10, store: Optional[StudentStore] = None,
+                            shard: Optional[int] = None, n_shards: int = 1):
     """
     Scan CSV file to identify which batches/courses/colleges have images available.
-    Tests the first enrollment number when course, college_id, or branch changes.
+
+    Combos are grouped in one pass over the CSV, then up to `samples` sampled
+    enrollments per combo are probed concurrently. Probes go out round-robin
+    (first sample of every combo, then the second, ...) and a combo is decided
+    as soon as one sample shows an image, so most combos cost a single page;
+    only combos where every sample lacks an image cost `samples` pages.
+
+    Decisions are appended to `<output_file>.progress.jsonl` as they happen and
+    the report is rewritten every `report_every` decisions, so an interrupted
+    scan resumes with only the undecided combos. A combo none of whose sampled
+    profiles loaded is left undecided too (a failed page says nothing about
+    images), so the next run probes it again.
+
+    Args:
+        csv_file: Enrollments CSV (with or without header)
+        output_file: Report JSON (same layout as before, plus a few summary fields)
+        log_file: Human-readable log (appended to when resuming)
+        samples: Enrollments probed per combo before declaring it imageless
+        max_workers: Parallel scraper workers (ignored when `scraper` is given)
+        scraper: Optional ProxyScraper to reuse
+        report_every: Rewrite the report after this many new decisions
+        store: Optional StudentStore to read enrollments from instead of `csv_file` (validated and sharded alike)
+        shard: Only scan the combos of this shard (split a scan across machines)
+        n_shards: Number of shards
+
+    Returns:
+        Report dict
     """
-    
+    progress_path = f"{output_file}.progress.jsonl"
+    resuming = os.path.exists(progress_path)
+
     # Open log file for writing
-    log = open(log_file, 'w', encoding='utf-8')
+    log = open(log_file, 'a' if resuming else 'w', encoding='utf-8')
     
     def log_print(message):
         """Print to console and write to log file"""
@@ -23,118 +127,132 @@ def scan_image_availability(csv_file='enrollments22.csv', output_file='image_ava
     log_print(f"IMAGE AVAILABILITY SCAN - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     log_print("="*60)
     log_print("\n🔍 Starting image availability scan...\n")
-    
-    # Track unique combinations
-    tested_combinations = set()
-    results = {
-        'with_images': [],
-        'without_images': [],
-        'summary': {}
-    }
-    
-    # Track previous values to detect changes
-    prev_course = None
-    prev_college = None
-    prev_branch = None
-    prev_batch = None
-    
-    total_tested = 0
-    with_images = 0
-    without_images = 0
-    
-    with open(csv_file, mode='r', encoding='utf-8') as file:
-        reader = csv.DictReader(file)
-        
-        for idx, row in enumerate(reader):
-            enrollment = row['Enrollment Number'].strip()
-            course = row['Course'].strip()
-            batch = row['Batch'].strip()
-            college_id = row['College ID'].strip()
-            branch = row['Branch'].strip()
-            
-            # Create a unique key for this combination
-            combo_key = f"{course}|{batch}|{college_id}|{branch}"
-            
-            # Check if any of the key fields changed or if this is the first row
-            fields_changed = (
-                course != prev_course or 
-                college_id != prev_college or 
-                branch != prev_branch or
-                batch != prev_batch
-            )
-            
-            # Test if this combination hasn't been tested yet and fields changed
-            if combo_key not in tested_combinations and fields_changed:
-                tested_combinations.add(combo_key)
-                total_tested += 1
-                
-                log_print(f"[{total_tested}] Testing: {course.upper()} | Batch {batch} | College {college_id} | {branch}")
-                log_print(f"    Enrollment: {enrollment}")
-                
-                # Try to extract image
-                try:
-                    image_url, name = extract_student_image_and_name(enrollment)
-                    
-                    combo_data = {
-                        'course': course,
-                        'batch': batch,
-                        'college_id': college_id,
-                        'branch': branch,
-                        'enrollment_tested': enrollment,
-                        'name': name
-                    }
-                    
-                    if image_url:
-                        log_print(f"    ✅ IMAGE FOUND: {name}")
-                        log_print(f"    URL: {image_url}")
-                        combo_data['image_url'] = image_url
-                        results['with_images'].append(combo_data)
-                        with_images += 1
-                    else:
-                        log_print(f"    ❌ NO IMAGE AVAILABLE")
-                        results['without_images'].append(combo_data)
-                        without_images += 1
-                        
-                except Exception as e:
-                    log_print(f"    ⚠️  ERROR: {e}")
-                    results['without_images'].append({
-                        'course': course,
-                        'batch': batch,
-                        'college_id': college_id,
-                        'branch': branch,
-                        'enrollment_tested': enrollment,
-                        'error': str(e)
-                    })
-                    without_images += 1
-                
-                log_print("")  # Empty line for readability
-            
-            # Update previous values
-            prev_course = course
-            prev_college = college_id
-            prev_branch = branch
-            prev_batch = batch
-    
-    # Generate summary
-    results['summary'] = {
-        'total_combinations_tested': total_tested,
-        'with_images': with_images,
-        'without_images': without_images,
-        'success_rate': f"{(with_images/total_tested*100):.1f}%" if total_tested > 0 else "0%"
-    }
-    
-    # Save results to JSON
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(results, f, indent=2, ensure_ascii=False)
-    
+
+    start_time = time.time()
+    # Malformed / mismatched enrollment numbers never get sampled, whichever the source
+    if store is not None:
+        rows = iter_valid_rows(store.path, shard=shard, n_shards=n_shards, shard_by='combo',
+                               rows=store.iter_enrollment_rows())
+    else:
+        rows = iter_valid_rows(csv_file, shard=shard, n_shards=n_shards, shard_by='combo')
+    combos = group_combos(csv_file, samples=samples, rows=rows)
+
+    # Combos decided by an earlier, interrupted run
+    decided = []
+    repair_jsonl(progress_path)
+    if resuming:
+        with open(progress_path, 'r', encoding='utf-8') as f:
+            decided = [json.loads(line) for line in f if line.strip()]
+    done = {record['combo'] for record in decided}
+    pending = {key: combo for key, combo in combos.items() if key not in done}
+    log_print(f"Found {len(combos)} combinations ({len(done)} already decided, {len(pending)} to probe)\n")
+
+    own_scraper = scraper is None
+    if own_scraper:
+        scraper = ProxyScraper(max_workers=max_workers, cache=ScrapeCache())
+
+    # Per-combo probe state
+    state = {key: {'issued': 0, 'outstanding': 0, 'no_image': [], 'failed': 0, 'decided': False} for key in pending}
+    owner = {}
+    probed = 0
+    failed_combos = []  # every sample failed to load: left for the next run
+
+    def probe_ids():
+        # Round-robin, checked lazily: a combo decided by an earlier sample is never probed again
+        for round_ in range(samples):
+            for key, combo in pending.items():
+                probe = state[key]
+                if probe['decided'] or round_ >= len(combo['samples']):
+                    continue
+                enrollment = combo['samples'][round_]
+                owner[enrollment] = key
+                probe['issued'] += 1
+                probe['outstanding'] += 1
+                yield enrollment
+
+    def decide(key: str, has_images: bool, enrollment: str, name: Optional[str], image_url: Optional[str] = None):
+        probe = state[key]
+        probe['decided'] = True
+        combo = pending[key]
+        combo_data = {
+            'combo': key,
+            'has_images': has_images,
+            'course': combo['course'],
+            'batch': combo['batch'],
+            'college_id': combo['college_id'],
+            'branch': combo['branch'],
+            'enrollment_tested': enrollment,
+            'name': name,
+        }
+        if image_url:
+            combo_data['image_url'] = image_url
+        combo_data['samples_probed'] = probe['issued']
+        combo_data['rows'] = combo['rows']
+
+        log_print(f"[{len(decided) + 1}/{len(combos)}] {combo['course'].upper()} | Batch {combo['batch']} | College {combo['college_id']} | {combo['branch']}")
+        if has_images:
+            log_print(f"    ✅ IMAGE FOUND: {name} ({enrollment}, sample {probe['issued']}/{len(combo['samples'])})")
+            log_print(f"    URL: {image_url}")
+        else:
+            log_print(f"    ❌ NO IMAGE AVAILABLE in {probe['issued']} samples")
+        log_print("")
+
+        decided.append(combo_data)
+        writer.write(combo_data)
+        if len(decided) % report_every == 0:
+            writer.flush()
+            write_report(decided, output_file, {'complete': False})
+
+    try:
+        with BufferedJsonlWriter(progress_path, batch_size=report_every, key='combo') as writer:
+            for enrollment, image_url, name in scraper.scrape_iter(probe_ids()):
+                probed += 1
+                key = owner.pop(enrollment)
+                probe = state[key]
+                probe['outstanding'] -= 1
+                if probe['decided']:
+                    continue  # late answer for a combo another sample already settled
+
+                if image_url:
+                    decide(key, True, enrollment, name, image_url)
+                    continue
+                if name:
+                    probe['no_image'].append((enrollment, name))
+                else:
+                    probe['failed'] += 1
+
+                if probe['outstanding'] == 0 and probe['issued'] == len(pending[key]['samples']):
+                    if not probe['no_image']:
+                        probe['decided'] = True
+                        failed_combos.append(key)
+                        continue
+                    enrollment, name = probe['no_image'][0]
+                    decide(key, False, enrollment, name)
+    finally:
+        if own_scraper:
+            scraper.close()
+        complete = len(decided) == len(combos)
+        results = write_report(decided, output_file, {
+            'samples_per_combo': samples,
+            'profiles_probed': probed,
+            'failed_combinations': len(failed_combos),
+            'seconds': round(time.time() - start_time, 2),
+            'complete': complete,
+        })
+        if complete and os.path.exists(progress_path):
+            os.remove(progress_path)
+
     # Print summary
     log_print("\n" + "="*60)
     log_print("📊 SCAN SUMMARY")
     log_print("="*60)
-    log_print(f"Total combinations tested: {total_tested}")
-    log_print(f"✅ With images: {with_images}")
-    log_print(f"❌ Without images: {without_images}")
+    log_print(f"Total combinations tested: {results['summary']['total_combinations_tested']}")
+    log_print(f"✅ With images: {results['summary']['with_images']}")
+    log_print(f"❌ Without images: {results['summary']['without_images']}")
     log_print(f"Success rate: {results['summary']['success_rate']}")
+    log_print(f"🔎 Profiles probed this run: {probed} in {results['summary']['seconds']}s")
+    if failed_combos:
+        log_print(f"⚠️  {len(failed_combos)} combinations had no sampled profile load; re-run to retry them")
     log_print(f"\n📄 Detailed report saved to: {output_file}")
     log_print("="*60)
     
@@ -150,62 +268,126 @@ def scan_image_availability(csv_file='enrollments22.csv', output_file='image_ava
     return results
 
 
+def filter_csv(input_csv: str, verdicts: Dict[str, bool], keep_unknown: bool = True,
+               backup_csv: Optional[str] = None) -> Tuple[str, int, int]:
+    """
+    Drop rows of imageless combos from one enrollments CSV, streaming.
+
+    Rows are written one at a time to a temp file next to the input, which is
+    fsynced and then swapped in with os.replace, so memory stays flat and a
+    crash leaves either the old or the new file, never a torn one. A header
+    row (if any) is passed through. The backup is a hard link to the original
+    file, so it costs no copy; it falls back to a copy where links aren't
+    supported.
+
+    Args:
+        input_csv: Enrollments CSV, rewritten in place
+        verdicts: combo key -> has images (see AvailabilityIndex.verdicts)
+        keep_unknown: Keep rows whose combo has no verdict
+        backup_csv: Optional path to keep the original file at
+
+    Returns:
+        Tuple of (input_csv, kept, removed)
+    """
+    kept = 0
+    removed = 0
+    tmp_path = f"{input_csv}.{os.getpid()}.tmp"
+    try:
+        with open(input_csv, mode='r', encoding='utf-8', newline='') as infile, \
+                open(tmp_path, mode='w', encoding='utf-8', newline='') as outfile:
+            reader = csv.reader(infile)
+            writer = csv.writer(outfile)
+            for row in reader:
+                if len(row) < 5 or not row[0].strip().isdigit():
+                    writer.writerow(row)  # header / malformed: leave as is
+                    continue
+                course, batch, college_id, branch = (value.strip() for value in row[1:5])
+                verdict = verdicts.get(combo_key(course, batch, college_id, branch))
+                if verdict or (verdict is None and keep_unknown):
+                    writer.writerow(row)
+                    kept += 1
+                else:
+                    removed += 1
+            outfile.flush()
+            os.fsync(outfile.fileno())
+
+        if backup_csv:
+            if os.path.exists(backup_csv):
+                os.remove(backup_csv)
+            try:
+                os.link(input_csv, backup_csv)
+            except OSError:
+                shutil.copy2(input_csv, backup_csv)
+        os.replace(tmp_path, input_csv)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return input_csv, kept, removed
+
+
+def _filter_task(args) -> Tuple[str, int, int]:
+    return filter_csv(*args)
+
+
+def filter_enrollment_csvs(csv_files: List[str], availability: Optional[AvailabilityIndex] = None,
+                           keep_unknown: bool = True, backup_suffix: Optional[str] = '_backup',
+                           max_workers: Optional[int] = None) -> Dict[str, Tuple[int, int]]:
+    """
+    Filter several enrollment CSVs (e.g. 22/23/24/MSIT) in parallel against one availability index.
+
+    Args:
+        csv_files: CSVs to rewrite in place
+        availability: AvailabilityIndex (default: loaded from image_availability_report.json)
+        keep_unknown: Keep rows of combos the index has no verdict for (e.g. batches not scanned yet)
+        backup_suffix: Backup each file as `<name><suffix>.csv`; None for no backups
+        max_workers: Worker processes (default: one per file, capped at the CPU count)
+
+    Returns:
+        Dict of csv file -> (kept, removed)
+    """
+    availability = availability or AvailabilityIndex.load()
+    verdicts = availability.verdicts()
+    print(f"\n🔧 Filtering {len(csv_files)} CSVs against {len(verdicts)} known combinations...\n")
+
+    tasks = []
+    for csv_file in csv_files:
+        backup_csv = None
+        if backup_suffix:
+            root, ext = os.path.splitext(csv_file)
+            backup_csv = f"{root}{backup_suffix}{ext}"
+        tasks.append((csv_file, verdicts, keep_unknown, backup_csv))
+
+    results = {}
+    workers = max_workers or min(len(tasks), os.cpu_count() or 1) or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for csv_file, kept, removed in executor.map(_filter_task, tasks):
+            results[csv_file] = (kept, removed)
+            print(f"  {csv_file}: ✅ kept {kept}, ❌ removed {removed}")
+    return results
+
+
 def remove_entries_without_images(input_csv='enrollments22.csv', 
                                   availability_report='image_availability_report.json',
                                   backup_csv='enrollments22_backup.csv'):
     """
     Remove entries from enrollments22.csv that don't have images.
-    Creates a backup before modifying.
+    Keeps the original at `backup_csv` and rewrites the CSV atomically.
+    Combos missing from the report are removed too.
     """
     
     print("\n🔧 Removing entries without images from CSV...\n")
     
     # Load availability report
-    with open(availability_report, 'r', encoding='utf-8') as f:
-        report = json.load(f)
-    
-    # Create set of valid combinations (those with images)
-    valid_combinations = set()
-    for combo in report['with_images']:
-        combo_key = f"{combo['course']}|{combo['batch']}|{combo['college_id']}|{combo['branch']}"
-        valid_combinations.add(combo_key)
+    availability = AvailabilityIndex()
+    availability.load_report(availability_report)
+    verdicts = availability.verdicts()
+    print(f"Valid combinations with images: {sum(verdicts.values())}")
     
-    print(f"Valid combinations with images: {len(valid_combinations)}")
-    
-    # Create backup
-    import shutil
-    shutil.copy2(input_csv, backup_csv)
+    _, kept_count, removed_count = filter_csv(input_csv, verdicts, keep_unknown=False, backup_csv=backup_csv)
     print(f"✅ Backup created: {backup_csv}")
     
-    # Read all rows
-    rows_to_keep = []
-    kept_count = 0
-    removed_count = 0
-    
-    with open(input_csv, mode='r', encoding='utf-8') as infile:
-        reader = csv.DictReader(infile)
-        fieldnames = reader.fieldnames
-        
-        for row in reader:
-            course = row['Course'].strip()
-            batch = row['Batch'].strip()
-            college_id = row['College ID'].strip()
-            branch = row['Branch'].strip()
-            
-            combo_key = f"{course}|{batch}|{college_id}|{branch}"
-            
-            if combo_key in valid_combinations:
-                rows_to_keep.append(row)
-                kept_count += 1
-            else:
-                removed_count += 1
-    
-    # Overwrite original CSV with filtered data
-    with open(input_csv, mode='w', encoding='utf-8', newline='') as outfile:
-        writer = csv.DictWriter(outfile, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(rows_to_keep)
-    
     print(f"\n✅ Kept: {kept_count} entries")
     print(f"❌ Removed: {removed_count} entries (no images)")
     print(f"📄 Updated CSV: {input_csv}")
@@ -237,7 +419,7 @@ if __name__ == "__main__":
     )
     
     print("\n✨ Done!")
-    print(f"📋 Logs saved to: image_avail.txt")
-    print(f"📊 Report saved to: image_availability_report.json")
-    print(f"💾 Backup saved to: enrollments22_backup.csv")
-    print(f"✅ enrollments22.csv now contains only entries with images!")
+    print("📋 Logs saved to: image_avail.txt")
+    print("📊 Report saved to: image_availability_report.json")
+    print("💾 Backup saved to: enrollments22_backup.csv")
+    print("✅ enrollments22.csv now contains only entries with images!")
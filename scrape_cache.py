@@ -0,0 +1,222 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterable, Optional, Tuple
+
+STATUS_OK = 'ok'              # name + image
+STATUS_NO_IMAGE = 'no_image'  # page loaded, no image
+STATUS_FAILED = 'failed'      # nothing could be extracted (never cached)
+
+DAY = 24 * 60 * 60
+
+
+def result_status(image_url: Optional[str], name: Optional[str]) -> str:
+    """Classify a (image_url, name) scrape result"""
+    if image_url:
+        return STATUS_OK
+    if name:
+        return STATUS_NO_IMAGE
+    return STATUS_FAILED
+
+
+class ScrapeCache:
+    """
+    Disk-backed cache of /student/{id} scrape results, keyed by enrollment ID.
+
+    Positive results (with an image) and negative ones (page loaded, no image)
+    expire on separate TTLs, so a re-run after a crash only re-scrapes what is
+    missing or stale. Failed lookups are never cached: they are usually
+    transient (throttling, a bad proxy), so the next run retries them. Safe to
+    share between worker threads.
+
+    Example:
+        cache = ScrapeCache('scrape_cache.db')
+        scraper = ProxyScraper(cache=cache)
+    """
+
+    def __init__(self, path: str = 'scrape_cache.db', ttl: float = 30 * DAY, negative_ttl: float = 1 * DAY):
+        """
+        Args:
+            path: SQLite database file
+            ttl: Seconds a result with an image stays fresh
+            negative_ttl: Seconds a "no image" result stays fresh
+        """
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            '''CREATE TABLE IF NOT EXISTS results (
+                   enrollment TEXT PRIMARY KEY,
+                   image_url  TEXT,
+                   name       TEXT,
+                   status     TEXT NOT NULL,
+                   fetched_at REAL NOT NULL
+               )'''
+        )
+        self._conn.commit()
+
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    def _fresh(self, status: str, fetched_at: float, now: float) -> bool:
+        ttl = self.ttl if status == STATUS_OK else self.negative_ttl
+        return now - fetched_at < ttl
+
+    def get(self, enrollment: str) -> Optional[Tuple[str, Optional[str], Optional[str]]]:
+        """
+        Look up a cached result.
+
+        Returns:
+            Tuple of (student_id, image_url, name), or None on a miss / expired entry
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT image_url, name, status, fetched_at FROM results WHERE enrollment = ?',
+                (enrollment,),
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            image_url, name, status, fetched_at = row
+            # Failures stored by older versions are retried like a miss
+            if status == STATUS_FAILED or not self._fresh(status, fetched_at, time.time()):
+                self.expired += 1
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return enrollment, image_url, name
+
+    def put(self, enrollment: str, image_url: Optional[str], name: Optional[str], fetched_at: Optional[float] = None):
+        """Store (or replace) the result for one enrollment ID; a failed lookup is not stored"""
+        self.put_many([(enrollment, image_url, name)], fetched_at=fetched_at)
+
+    def put_many(self, results: Iterable[Tuple[str, Optional[str], Optional[str]]], fetched_at: Optional[float] = None) -> int:
+        """
+        Store many (student_id, image_url, name) results in one transaction, skipping failed lookups
+
+        Returns:
+            Number of results stored
+        """
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        rows = [
+            (enrollment, image_url, name, result_status(image_url, name), fetched_at)
+            for enrollment, image_url, name in results
+        ]
+        rows = [row for row in rows if row[3] != STATUS_FAILED]
+        if not rows:
+            return 0
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO results (enrollment, image_url, name, status, fetched_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                rows,
+            )
+            self._conn.commit()
+        return len(rows)
+
+    def invalidate(self, enrollments: Optional[Iterable[str]] = None, status: Optional[str] = None) -> int:
+        """
+        Drop cached entries.
+
+        Args:
+            enrollments: Only these IDs (default: all)
+            status: Only entries with this status, e.g. STATUS_FAILED (default: any)
+
+        Returns:
+            Number of entries removed
+        """
+        query = 'DELETE FROM results'
+        conditions = []
+        params = []
+        if status is not None:
+            conditions.append('status = ?')
+            params.append(status)
+
+        with self._lock:
+            if enrollments is None:
+                if conditions:
+                    query += ' WHERE ' + ' AND '.join(conditions)
+                removed = self._conn.execute(query, params).rowcount
+            else:
+                conditions.append('enrollment = ?')
+                query += ' WHERE ' + ' AND '.join(conditions)
+                removed = 0
+                for enrollment in enrollments:
+                    removed += self._conn.execute(query, params + [enrollment]).rowcount
+            self._conn.commit()
+        return removed
+
+    def import_jsonl(self, path: str, fetched_at: Optional[float] = None) -> int:
+        """
+        Seed the cache from an existing data.json / dataMSIT.json (one JSON object per line).
+
+        Entries are stamped with `fetched_at` (default: the file's modification
+        time) so TTLs still apply. Header rows left over from the CSV are skipped.
+
+        Returns:
+            Number of records imported
+        """
+        fetched_at = os.path.getmtime(path) if fetched_at is None else fetched_at
+        results = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                enrollment = record.get('enrollment')
+                if not enrollment or not enrollment.isdigit():
+                    continue
+                results.append((enrollment, record.get('image'), record.get('name')))
+
+        return self.put_many(results, fetched_at=fetched_at)
+
+    def import_availability_report(self, path: str = 'image_availability_report.json', fetched_at: Optional[float] = None) -> int:
+        """Seed the cache with the enrollments probed by scan_image_availability"""
+        fetched_at = os.path.getmtime(path) if fetched_at is None else fetched_at
+        with open(path, 'r', encoding='utf-8') as f:
+            report = json.load(f)
+
+        results = []
+        for combo in report.get('with_images', []) + report.get('without_images', []):
+            enrollment = combo.get('enrollment_tested')
+            if enrollment and 'error' not in combo:
+                results.append((enrollment, combo.get('image_url'), combo.get('name')))
+
+        return self.put_many(results, fetched_at=fetched_at)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self._conn.execute('SELECT status, COUNT(*) FROM results GROUP BY status').fetchall())
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'expired': self.expired,
+                'hit_rate': f"{(self.hits / lookups * 100):.1f}%" if lookups else "0%",
+                'entries': counts,
+            }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,28 @@
+import asyncio
+
+from async_scraper import AsyncProfileScraper
+from benchmark import MockSite, MockSiteServer, SiteConfig
+from rate_limiter import AdaptiveRateLimiter
+
+
+def test_scrape_many_keeps_input_order():
+    site = MockSite(SiteConfig(combos=3, students_per_combo=10, latency=0.001, missing_image_ratio=0))
+    ids = site.students()[::-1]
+    with MockSiteServer(site) as server:
+        scraper = AsyncProfileScraper(concurrency=4, base_url=server.url,
+                                      rate_limiter=AdaptiveRateLimiter(initial_rate=50, burst=50))
+        results = asyncio.run(scraper.scrape_many(ids))
+
+    assert [student_id for student_id, _, _ in results] == ids
+    assert all(name and image_url for _, image_url, name in results)
+    assert scraper.stats['http_ok'] == len(ids)
+
+
+def test_not_found_is_not_retried():
+    site = MockSite(SiteConfig(combos=1, students_per_combo=2, latency=0.001))
+    with MockSiteServer(site) as server:
+        scraper = AsyncProfileScraper(concurrency=4, retry_count=2, base_url=server.url)
+        results = asyncio.run(scraper.scrape_many(['99999999999']))
+
+    assert results == [('99999999999', None, None)]
+    assert site.counters == {'requests': 1, 'errors': 0, 'not_found': 1}
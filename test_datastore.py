@@ -0,0 +1,38 @@
+import json
+import os
+
+from datastore import StudentStore
+
+
+def _record(enrollment: str, name=None, image=None) -> dict:
+    return {'enrollment': enrollment, 'course': 'btech', 'batch': '22', 'college': '150', 'branch': 'CSE',
+            'name': name, 'image': image, 'gender': None, 'elo': 1200, 'matches': 0}
+
+
+def test_import_jsonl_keeps_file_age(tmp_path):
+    path = tmp_path / 'data.json'
+    path.write_text(''.join(json.dumps(_record(f"{i:03d}15002722", name='A B')) + '\n' for i in range(3)),
+                    encoding='utf-8')
+    old = 1_600_000_000
+    os.utime(path, (old, old))
+
+    with StudentStore(str(tmp_path / 'students.db')) as store:
+        assert store.import_jsonl(str(path)) == 3
+        assert {row['scraped_at'] for row in store.query()} == {old}
+        assert len(list(store.iter_stale(max_age=86400))) == 3
+
+
+def test_iter_query_reads_a_snapshot_while_the_store_is_written(tmp_path):
+    with StudentStore(str(tmp_path / 'students.db')) as store:
+        store.upsert_profiles([_record(f"{i:04d}5002722") for i in range(0, 5000, 2)], scraped_at=1.0)
+        seen = []
+        for row in store.iter_query(order_by='enrollment'):
+            # Rename what was read and insert rows the read hasn't reached yet
+            enrollment = row['enrollment']
+            store.upsert_profiles([{**_record(enrollment), 'name': 'SEEN'},
+                                   _record(f"{int(enrollment[:4]) + 1:04d}5002722")])
+            seen.append((enrollment, row['name']))
+
+        assert seen == [(f"{i:04d}5002722", None) for i in range(0, 5000, 2)]
+        assert store.count(name='SEEN') == 2500
+        assert store.count() == 5000
@@ -0,0 +1,108 @@
+import csv
+import json
+import os
+import time
+
+from benchmark import MockSite, MockSiteServer, SiteConfig
+from datastore import StudentStore
+from delta_sync import delta_sync, diff_enrollments, sync_enrollments
+from enrollment_csv import FIELDS, iter_enrollment_rows
+from extract_student_image import ProxyScraper
+from rate_limiter import AdaptiveRateLimiter
+from ranklist_harvester import CSV_HEADER
+
+COURSES_CSV = 'Course,Branch,College,Collegeid\nbtech,CSE,x,150\n'
+
+
+class _Harvester:
+    """Stands in for RanklistHarvester: 'harvests' fixed rows"""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def harvest(self, combos, output_file, mode='w', store=None):
+        _write_csv(output_file, self.rows)
+        return len(self.rows)
+
+
+def _write_csv(path, rows):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADER)
+        writer.writerows(rows)
+
+
+def _row(enrollment, branch='CSE', college='150'):
+    return dict(zip(FIELDS, [enrollment, 'btech', '22', college, branch]))
+
+
+def test_diff_only_removes_inside_refreshed_combos():
+    existing = [_row('00115002722'), _row('00215002722'), _row('00315002722'), _row('00113100122', college='131')]
+    fresh = [_row('00115002722'), _row('00315002722', branch='IT'), _row('00415002722')]
+
+    diff = diff_enrollments(existing, fresh)
+    assert [row['enrollment'] for row in diff.added] == ['00415002722']
+    assert [row['enrollment'] for row in diff.removed] == ['00215002722']   # college 131 wasn't refreshed
+    assert diff.changed == [_row('00315002722', branch='IT')]
+    assert (diff.unchanged, diff.combos_refreshed) == (1, 2)
+
+
+def test_sync_enrollments_rewrites_csv_and_store(tmp_path):
+    output_file = str(tmp_path / 'enrollments.csv')
+    existing = [_row('00115002722'), _row('00215002722'), _row('00315002722')]
+    _write_csv(output_file, [[row[field] for field in FIELDS] for row in existing])
+    fresh = [_row('00415002722'), _row('00315002722', branch='IT'), _row('00115002722')]
+    course_csv = tmp_path / 'courses.csv'
+    course_csv.write_text(COURSES_CSV, encoding='utf-8')
+
+    with StudentStore(str(tmp_path / 'students.db')) as store:
+        store.upsert_enrollments(existing)
+        diff = sync_enrollments(str(course_csv), output_file, store=store,
+                                harvester=_Harvester([[row[field] for field in FIELDS] for row in fresh]))
+        assert store.get('00215002722') is None
+        assert store.get('00315002722')['branch'] == 'IT'
+        assert store.get('00415002722') is not None
+
+    assert (len(diff.added), len(diff.removed), len(diff.changed)) == (1, 1, 1)
+    # Existing order kept, moved row updated in place, new rows last
+    assert list(iter_enrollment_rows(output_file)) == [_row('00115002722'), _row('00315002722', branch='IT'),
+                                                       _row('00415002722')]
+
+
+def test_delta_sync_keeps_datasets_sharing_a_store_apart(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    site = MockSite(SiteConfig(combos=4, students_per_combo=5, latency=0.001))
+    rows = {name: [[e, c.course, c.batch, c.college, c.branch] for c in combos for e in site.roster[c]]
+            for name, combos in (('a', site.combos[:2]), ('b', site.combos[2:]))}
+    (tmp_path / 'courses.csv').write_text(COURSES_CSV, encoding='utf-8')
+    for name, elo in (('a', 1300), ('b', 1250)):
+        _write_csv(f"{name}.csv", rows[name])
+        with open(f"{name}.json", 'w', encoding='utf-8') as f:
+            for enrollment, course, batch, college, branch in rows[name]:
+                f.write(json.dumps({'name': 'OLD NAME', 'image': None, 'college': college, 'course': course,
+                                    'batch': batch, 'branch': branch, 'enrollment': enrollment, 'elo': elo,
+                                    'matches': 3, 'gender': None}) + '\n')
+        old = time.time() - 200 * 86400   # profiles past max_age: all get re-scraped
+        os.utime(f"{name}.json", (old, old))
+
+    gone = rows['a'][0][0]
+    fresh_a = [row for row in rows['a'] if row[0] != gone]
+    fresh_a[1] = fresh_a[1][:4] + ['MOVED']
+    batches = sorted({row[2] for rows_ in rows.values() for row in rows_})
+    limiter = AdaptiveRateLimiter(initial_rate=10_000, max_rate=10_000, burst=10_000)
+
+    with MockSiteServer(site) as server, \
+            ProxyScraper(base_url=server.url, use_selenium=False, rate_limiter=limiter) as scraper:
+        stats_a = delta_sync('courses.csv', 'a.csv', 'a.json', batches=batches, store_path='students.db',
+                             harvester=_Harvester(fresh_a), scraper=scraper)
+        stats_b = delta_sync('courses.csv', 'b.csv', 'b.json', batches=batches, store_path='students.db',
+                             harvester=_Harvester(rows['b']), scraper=scraper)
+
+    assert (stats_a['removed'], stats_a['changed'], stats_b['removed']) == (1, 1, 0)
+    a = {r['enrollment']: r for r in map(json.loads, open('a.json', encoding='utf-8'))}
+    b = {r['enrollment']: r for r in map(json.loads, open('b.json', encoding='utf-8'))}
+    assert set(a) == {row[0] for row in fresh_a}
+    assert set(b) == {row[0] for row in rows['b']}
+    assert {r['elo'] for r in b.values()} == {1250}   # ratings survive the re-scrape
+    assert all(r['name'].startswith('Student ') for r in list(a.values()) + list(b.values()))
+    assert a[fresh_a[1][0]]['branch'] == 'MOVED'
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from elo import DEFAULT_RATING, K_FACTOR, EloEngine
+
+
+def _sequential_reference(ratings, winners, losers, k_factor=K_FACTOR):
+    ratings = list(ratings)
+    for w, l in zip(winners, losers):
+        expected = 1.0 / (1.0 + 10.0 ** ((ratings[l] - ratings[w]) / 400.0))
+        delta = k_factor * (1.0 - expected)
+        ratings[w] += delta
+        ratings[l] -= delta
+    return np.array(ratings)
+
+
+def test_batch_matches_one_by_one_loop():
+    rng = np.random.default_rng(1)
+    n = 50
+    start = rng.normal(DEFAULT_RATING, 100, n)
+    winners = rng.integers(0, n, 2000)
+    losers = (winners + rng.integers(1, n, 2000)) % n   # never the winner
+
+    engine = EloEngine([f"{i:011d}" for i in range(n)], start)
+    changed = engine.apply_positions(winners, losers)
+
+    np.testing.assert_allclose(engine.ratings, _sequential_reference(start, winners, losers))
+    assert engine.matches.sum() == 2 * len(winners)
+    assert set(changed.tolist()) == set(winners.tolist()) | set(losers.tolist())
+
+
+def test_listeners_see_changed_positions():
+    engine = EloEngine(['00000000001', '00000000002', '00000000003'])
+    seen = []
+    engine.subscribe(seen.append)
+    engine.apply(['00000000001'], ['00000000003'])
+    assert [changed.tolist() for changed in seen] == [[0, 2]]
+    assert engine.rating('00000000001') == (DEFAULT_RATING + K_FACTOR / 2, 1)
+
+
+def test_self_match_is_rejected():
+    engine = EloEngine(['00000000001', '00000000002'])
+    with pytest.raises(ValueError):
+        engine.apply_positions([0, 1], [1, 1])
+    assert engine.matches.tolist() == [0, 0]
+    assert engine.ratings.tolist() == [DEFAULT_RATING, DEFAULT_RATING]
@@ -0,0 +1,29 @@
+from enrollment_decoder import decode_frame, iter_valid_rows, read_enrollments, validation_report
+
+
+def test_enrollment_only_file(tmp_path):
+    path = tmp_path / 'numbers.csv'
+    path.write_text('Enrollment Number\n09912303920\n06112303920\n123\n', encoding='utf-8')
+
+    frame = read_enrollments(str(path))
+    assert list(frame['enrollment']) == ['09912303920', '06112303920', '123']
+    assert set(frame['college']) == {''}
+
+    rows = list(iter_valid_rows(str(path)))
+    assert [row['enrollment'] for row in rows] == ['09912303920', '06112303920']
+
+
+def test_mismatches_are_reported(tmp_path):
+    path = tmp_path / 'enrollments.csv'
+    path.write_text(
+        'Enrollment Number,Course,Batch,College ID,Branch\n'
+        '03961101722,btech,22,611,CSE\n'      # valid
+        '03961101723,btech,22,611,CSE\n'      # lateral entry
+        '03961201722,btech,22,611,CSE\n'      # institution mismatch
+        '03961101720,btech,22,611,CSE\n'      # batch mismatch
+        '0396110172,btech,22,611,CSE\n',      # malformed
+        encoding='utf-8')
+
+    report = validation_report(decode_frame(read_enrollments(str(path))))
+    assert report == {'rows': 5, 'valid': 2, 'malformed': 1, 'institution_mismatch': 1,
+                      'lateral_entry': 1, 'batch_mismatch': 1}
@@ -0,0 +1,37 @@
+import json
+
+from benchmark import MockSite, MockSiteServer, SiteConfig
+from enroltojson import enrollments_to_json
+from extract_student_image import ProxyScraper
+from gender_classifier import GenderClassifier, StaticGenderBackend
+from rate_limiter import AdaptiveRateLimiter
+from scrape_cache import ScrapeCache
+
+
+def test_rerun_retries_profiles_that_failed(tmp_path):
+    site = MockSite(SiteConfig(combos=3, students_per_combo=6, latency=0.001, error_rate=0.5, seed=5))
+    enrollments_csv = str(tmp_path / 'enrollments.csv')
+    site.write_enrollments_csv(enrollments_csv)
+    output_file = str(tmp_path / 'data.json')
+    classifier = GenderClassifier(cache_path=str(tmp_path / 'gender_cache.json'), backend=StaticGenderBackend({}))
+
+    def run(server, cache):
+        limiter = AdaptiveRateLimiter(initial_rate=10_000, max_rate=10_000, burst=10_000)
+        with ProxyScraper(base_url=server.url, use_selenium=False, rate_limiter=limiter, cache=cache) as scraper:
+            return enrollments_to_json(enrollments_csv, output_file, batch_size=4, scraper=scraper,
+                                       gender_classifier=classifier)
+
+    with MockSiteServer(site) as server, ScrapeCache(str(tmp_path / 'scrape_cache.db')) as cache:
+        first = run(server, cache)
+        assert 0 < first < len(site.students())
+
+        site.config = site.config._replace(error_rate=0.0)
+        site.reset_counters()
+        second = run(server, cache)
+
+    with open(output_file, 'r', encoding='utf-8') as f:
+        records = [json.loads(line) for line in f]
+    assert first + second == len(records) == len(site.students())
+    assert {record['enrollment'] for record in records} == set(site.students())
+    # Only the failed profiles were fetched again, straight from the site rather than the cache
+    assert site.counters['requests'] == second
@@ -0,0 +1,68 @@
+import json
+
+from gender_classifier import GenderClassifier, GroqGenderBackend, StaticGenderBackend, backfill_genders
+
+
+class _Completion:
+    """Minimal stand-in for a Groq chat completion returning `content`"""
+
+    def __init__(self, content: str):
+        message = type('Message', (), {'content': content})
+        choice = type('Choice', (), {'message': message})
+        self.choices = [choice]
+
+
+class _Client:
+    def __init__(self, answers: dict):
+        self.answers = answers
+        self.chat = self
+        self.completions = self
+
+    def create(self, **kwargs):
+        return _Completion(json.dumps(self.answers))
+
+
+def test_first_names_are_deduplicated_and_cached(tmp_path):
+    backend = StaticGenderBackend({'ANANYA': 'female', 'RAHUL': 'male'})
+    classifier = GenderClassifier(cache_path=str(tmp_path / 'cache.json'), backend=backend)
+
+    genders = classifier.classify_many(['ANANYA JHA', 'Ananya Singh', 'MR. RAHUL VERMA', None])
+    assert genders == {'ANANYA JHA': 'female', 'Ananya Singh': 'female', 'MR. RAHUL VERMA': 'male'}
+    assert backend.calls == 1
+
+    again = GenderClassifier(cache_path=str(tmp_path / 'cache.json'), backend=backend)
+    assert again.classify('RAHUL KUMAR') == 'male'
+    assert backend.calls == 1
+
+
+def test_unanswered_names_are_not_cached(tmp_path):
+    backend = GroqGenderBackend(client=_Client({'ANANYA': 'female'}))
+    classifier = GenderClassifier(cache_path=str(tmp_path / 'cache.json'), backend=backend)
+
+    assert classifier.classify_many(['ANANYA JHA', 'PUNISHKA GAMBHIR']) == {
+        'ANANYA JHA': 'female', 'PUNISHKA GAMBHIR': None}
+    assert classifier.cache == {'ANANYA': 'female'}
+
+    backend._client = _Client({'PUNISHKA': 'female'})
+    assert classifier.classify('PUNISHKA GAMBHIR') == 'female'
+
+
+def test_backfill_asks_once_per_first_name_across_the_file(tmp_path):
+    path = tmp_path / 'data.json'
+    records = [
+        {'enrollment': '00115002023', 'name': 'ANANYA JHA', 'gender': None},
+        {'enrollment': '00215002023', 'name': 'ANANYA SINGH', 'gender': None},
+        {'enrollment': '00315002023', 'name': 'RAHUL VERMA', 'gender': 'male'},
+        {'enrollment': '00415002023', 'name': 'KIRAN RAO', 'gender': None},
+    ]
+    path.write_text(''.join(json.dumps(record) + '\n' for record in records), encoding='utf-8')
+    backend = StaticGenderBackend({'ANANYA': 'female'})
+    classifier = GenderClassifier(cache_path=str(tmp_path / 'cache.json'), backend=backend)
+
+    filled = []
+    assert backfill_genders(str(path), classifier, on_filled=filled.extend) == 2
+    assert backend.calls == 1
+    assert [record['enrollment'] for record in filled] == ['00115002023', '00215002023']
+
+    rewritten = [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+    assert [record['gender'] for record in rewritten] == ['female', 'female', 'male', None]
@@ -0,0 +1,33 @@
+import json
+
+from jsonl_writer import BufferedJsonlWriter, completed_ids, repair_jsonl
+
+
+def test_resume_skips_records_on_disk_and_drops_partial_line(tmp_path):
+    path = str(tmp_path / 'out.jsonl')
+    with BufferedJsonlWriter(path, batch_size=3) as writer:
+        for i in range(5):
+            writer.write({'enrollment': str(i)})
+    assert writer.written == 5
+    with open(path, 'ab') as f:
+        f.write(b'{"enrollment": "5", "na')   # crash mid-write
+
+    flushed = []
+    with BufferedJsonlWriter(path, batch_size=3, on_flush=flushed.append) as writer:
+        assert writer.done == {'0', '1', '2', '3', '4'}
+        assert not writer.is_done('5')
+        writer.write({'enrollment': '5'})
+
+    with open(path, 'r', encoding='utf-8') as f:
+        assert [json.loads(line)['enrollment'] for line in f] == ['0', '1', '2', '3', '4', '5']
+    assert flushed == [[{'enrollment': '5'}]]
+    assert completed_ids(path) == {str(i) for i in range(6)}
+
+
+def test_repair_keeps_complete_file(tmp_path):
+    path = tmp_path / 'out.jsonl'
+    path.write_bytes(b'{"a": 1}\n{"a": 2}\n')
+    assert repair_jsonl(str(path)) == 0
+    path.write_bytes(b'{"a": 1}\n{"a"')
+    assert repair_jsonl(str(path)) == 4
+    assert path.read_bytes() == b'{"a": 1}\n'
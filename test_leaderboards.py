@@ -0,0 +1,63 @@
+import numpy as np
+
+from elo import EloEngine
+from leaderboards import Leaderboards
+
+COLLEGES = ('150', '131', '611')
+COURSES = ('btech', 'bba')
+BATCHES = ('22', '23')
+
+
+def _dataset(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    enrollments = [f"{i:011d}" for i in range(n)]
+    attributes = {
+        'college': [COLLEGES[i] for i in rng.integers(0, len(COLLEGES), n)],
+        'course': [COURSES[i] for i in rng.integers(0, len(COURSES), n)],
+        'batch': [BATCHES[i] for i in rng.integers(0, len(BATCHES), n)],
+        'branch': ['CSE'] * n,
+        'gender': [(None, 'male', 'female')[i] for i in rng.integers(0, 3, n)],
+    }
+    return enrollments, attributes
+
+
+def _play(engine: EloEngine, batches: int, size: int, seed: int = 1):
+    rng = np.random.default_rng(seed)
+    n = len(engine)
+    for _ in range(batches):
+        winners = rng.integers(0, n, size)
+        engine.apply_positions(winners, (winners + rng.integers(1, n, size)) % n)
+
+
+def test_incremental_boards_equal_a_rebuild():
+    enrollments, attributes = _dataset(300)
+    engine = EloEngine(enrollments)
+    boards = Leaderboards(engine, attributes)
+    _play(engine, batches=30, size=40)   # small batches: students are moved one by one
+    _play(engine, batches=3, size=400)   # large ones: whole groups are re-sorted
+    assert boards.stats['moved'] and boards.stats['rebuilt']
+
+    rebuilt = Leaderboards(EloEngine(enrollments, engine.ratings, engine.matches), attributes)
+    assert boards.boards == rebuilt.boards
+
+    best = boards.top(3, college='150', course='btech', batch='22')
+    assert [rank for rank, _, _ in best] == [1, 2, 3]
+    for rank, enrollment, rating in best:
+        assert boards.rank(enrollment, college='150', course='btech', batch='22') == rank
+        assert rating == engine.ratings[engine.position[enrollment]]
+
+
+def test_snapshot_restore_catches_up_and_follows_attribute_changes(tmp_path):
+    enrollments, attributes = _dataset(200)
+    engine = EloEngine(enrollments)
+    boards = Leaderboards(engine, attributes)
+    _play(engine, batches=10, size=50)
+    snapshot = str(tmp_path / 'leaderboards.npz')
+    boards.save(snapshot)
+
+    engine.apply_positions([5, 9], [7, 11])   # a few ratings move after the snapshot
+    attributes['gender'][0] = 'female' if attributes['gender'][0] != 'female' else 'male'
+
+    restored = Leaderboards(engine, attributes, snapshot=Leaderboards.load_snapshot(snapshot))
+    rebuilt = Leaderboards(EloEngine(enrollments, engine.ratings, engine.matches), attributes)
+    assert restored.boards == rebuilt.boards
@@ -0,0 +1,103 @@
+from collections import Counter
+
+import numpy as np
+
+from elo import EloEngine
+from matchmaking import MatchmakingIndex
+
+
+def _ids(n):
+    return [f"{i:011d}" for i in range(n)]
+
+
+def test_opponents_fall_inside_the_window():
+    ids = _ids(100)
+    engine = EloEngine(ids, 1000 + 10.0 * np.arange(100))
+    index = MatchmakingIndex(engine, {}, seed=0)
+
+    for enrollment in ids:
+        opponent = index.find_opponent(enrollment, delta=50, max_delta=50)
+        assert opponent != enrollment
+        assert abs(engine.rating(opponent)[0] - engine.rating(enrollment)[0]) <= 50
+    for _ in range(500):
+        left, right = index.pair(delta=30, max_delta=30)
+        assert left != right and abs(engine.rating(left)[0] - engine.rating(right)[0]) <= 30
+    assert index.stats['widened'] == 0
+
+
+def test_window_doubles_up_to_max_delta():
+    ids = _ids(3)
+    engine = EloEngine(ids, np.array([1000.0, 1300.0, 2500.0]))
+    index = MatchmakingIndex(engine, {}, seed=0)
+
+    assert index.find_opponent(ids[0], delta=100, max_delta=800) == ids[1]   # 100 -> 200 -> 400
+    assert index.stats['widened'] == 2
+    assert index.find_opponent(ids[2], delta=100, max_delta=800) is None     # 1200 away
+    assert index.find_opponent(ids[2], delta=100, max_delta=1600) in ids[:2]  # 1600 reaches both
+
+
+def test_students_with_few_matches_are_drawn_more_often():
+    ids = _ids(2)
+    engine = EloEngine(ids, matches=np.array([0, 9]))   # weights 1 and 1/10
+    index = MatchmakingIndex(engine, {}, seed=1)
+
+    firsts = Counter(index.pair()[0] for _ in range(5000))
+    assert 0.88 < firsts[ids[0]] / 5000 < 0.94
+
+
+def test_pairs_stay_in_their_scope():
+    ids = _ids(8)
+    attributes = {
+        'gender': ['female', 'female', 'female', 'male', 'male', 'male', None, 'female'],
+        'college': ['150', '150', '131', '150', '150', '131', '150', '150'],
+        'course': ['btech'] * 7 + ['bba'],
+    }
+    engine = EloEngine(ids)
+    index = MatchmakingIndex(engine, attributes, seed=0)
+
+    for _ in range(200):
+        pair = index.pair(gender='female', college='150', course='btech')
+        assert set(pair) == {ids[0], ids[1]}
+        assert set(index.pair(gender='male')) <= {ids[3], ids[4], ids[5]}
+    assert index.find_opponent(ids[3], gender='female') is None    # not in that scope
+    assert index.find_opponent(ids[6], gender='female') is None    # gender unknown: wildcard scopes only
+    assert index.find_opponent(ids[6], college='150') is not None
+    assert index.pair(course='bba') is None                        # a lone student
+    assert index.pair(college='999') is None                       # no such scope
+
+
+def test_require_image_limits_who_is_shown():
+    ids = _ids(4)
+    records = [{'enrollment': enrollment, 'image': 'https://assets.ipuranklist.com/x.jpg' if i < 2 else None,
+                'gender': 'female', 'college': '150', 'course': 'btech'} for i, enrollment in enumerate(ids)]
+    engine = EloEngine(ids)
+
+    with_images = MatchmakingIndex.from_records(engine, records, seed=0)
+    assert {student for _ in range(100) for student in with_images.pair()} == set(ids[:2])
+    assert with_images.find_opponent(ids[3]) is None
+
+    everyone = MatchmakingIndex.from_records(engine, records, require_image=False, seed=0)
+    assert {student for _ in range(200) for student in everyone.pair()} == set(ids)
+
+
+def test_pairs_follow_ratings_after_a_batch():
+    ids = _ids(6)
+    attributes = {'gender': ['female'] * 4 + ['male'] * 2}
+    engine = EloEngine(ids, np.array([1000.0, 1010.0, 1400.0, 1410.0, 1200.0, 1200.0]), k_factor=440)
+    index = MatchmakingIndex(engine, attributes, seed=0)
+    assert index.find_opponent(ids[0], delta=50, max_delta=50, gender='female') == ids[1]
+    assert index.pair(gender='male') is not None
+    refreshes = index.stats['refreshes']
+
+    # 0 beats 3: 0 climbs next to 2, 3 drops next to 1
+    engine.apply([ids[0]], [ids[3]])
+    assert abs(engine.rating(ids[0])[0] - 1400) < 25 and abs(engine.rating(ids[3])[0] - 1010) < 25
+
+    assert not index.buckets[('male', None, None)].dirty   # nobody in it changed
+    assert index.buckets[('female', None, None)].dirty
+    assert index.find_opponent(ids[0], delta=50, max_delta=50, gender='female') == ids[2]
+    assert index.find_opponent(ids[1], delta=50, max_delta=50, gender='female') == ids[3]
+    assert index.stats['refreshes'] == refreshes + 1
+    for _ in range(200):
+        left, right = index.pair(gender='female', delta=50, max_delta=50)
+        assert {left, right} in ({ids[0], ids[2]}, {ids[1], ids[3]})
@@ -0,0 +1,61 @@
+import os
+import pickle
+
+import numpy as np
+
+from profile_store import ProfileStore
+
+RECORDS = [
+    {'name': 'ANANYA JHA', 'image': 'https://assets.ipuranklist.com/a.jpg', 'college': '150', 'course': 'btech',
+     'batch': '22', 'branch': 'CSE', 'enrollment': '00115002722', 'elo': 1250, 'matches': 3, 'gender': 'female'},
+    {'name': None, 'image': None, 'college': '131', 'course': 'bba', 'batch': '23', 'branch': 'GENERAL',
+     'enrollment': '00213100123', 'elo': 1200, 'matches': 0, 'gender': None},
+    {'name': 'RAHUL VERMA', 'image': '', 'college': '150', 'course': 'btech', 'batch': '22', 'branch': 'IT',
+     'enrollment': '00315002722', 'elo': 1175, 'matches': 1, 'gender': 'male'},
+]
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / 'profiles')
+    ProfileStore.from_records(RECORDS + [{'enrollment': 'Enrollment Number'}, RECORDS[0]]).save(path)
+    profiles = ProfileStore.load(path)
+
+    assert list(profiles) == RECORDS
+    assert profiles.get('00213100123') == RECORDS[1]
+    assert profiles.get('99999999999') is None
+    assert profiles.count(college='150') == 2
+    assert profiles.has_image().tolist() == [True, False, False]
+    assert [r['enrollment'] for r in profiles.iter_records(branch=['CSE', 'GENERAL'])] == ['00115002722', '00213100123']
+    assert list(pickle.loads(pickle.dumps(profiles))) == RECORDS
+
+    out = tmp_path / 'out.json'
+    profiles.to_jsonl(str(out))
+    assert list(ProfileStore.from_jsonl([str(out)])) == RECORDS
+
+
+def test_save_swaps_versions_under_loaded_stores(tmp_path):
+    path = str(tmp_path / 'profiles')
+    ProfileStore.from_records(RECORDS[:1]).save(path)
+    first = ProfileStore.load(path)
+    for count in (2, 3, 2):
+        ProfileStore.from_records(RECORDS[:count]).save(path)
+
+    assert len(ProfileStore.load(path)) == 2
+    assert os.path.islink(path)
+    assert len([name for name in os.listdir(tmp_path) if name.startswith('profiles.v')]) == 2
+    # Pruned version still readable through the existing memory maps
+    assert first.record(0) == RECORDS[0]
+    np.testing.assert_array_equal(first.columns['elo'], [1250])
+
+
+def test_plain_directory_from_older_saves_is_migrated(tmp_path):
+    path = str(tmp_path / 'profiles')
+    os.makedirs(path)
+    ProfileStore.from_records(RECORDS).save(str(tmp_path / 'staging'))
+    for name in os.listdir(os.path.realpath(tmp_path / 'staging')):
+        os.rename(os.path.join(os.path.realpath(tmp_path / 'staging'), name), os.path.join(path, name))
+
+    assert len(ProfileStore.load(path)) == 3
+    ProfileStore.from_records(RECORDS[:1]).save(path)
+    assert len(ProfileStore.load(path)) == 1
+    assert os.path.isdir(f"{path}.v0")
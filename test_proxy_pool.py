@@ -0,0 +1,38 @@
+from benchmark import MockSite, MockSiteServer, SiteConfig
+from extract_student_image import ProxyScraper
+from proxy_pool import ProxyPool
+from rate_limiter import AdaptiveRateLimiter
+
+
+def test_faster_proxy_gets_more_weight():
+    pool = ProxyPool(['http://fast:1', 'http://slow:1'], background_probe=False)
+    for _ in range(20):
+        pool.report('http://fast:1', ok=True, latency=0.1)
+        pool.report('http://slow:1', ok=True, latency=1.0)
+
+    picks = [pool.choose() for _ in range(500)]
+    assert picks.count('http://fast:1') > 3 * picks.count('http://slow:1')
+    assert pool.stats()['http://fast:1']['p50'] == 0.1
+
+
+def test_scraper_probes_its_own_base_url():
+    scraper = ProxyScraper(proxies=['http://127.0.0.1:9'], base_url='http://127.0.0.1:8000', use_selenium=False)
+    try:
+        assert scraper.proxy_pool.probe_url == 'http://127.0.0.1:8000'
+    finally:
+        scraper.close()
+
+
+def test_not_found_pages_dont_quarantine_the_proxy():
+    site = MockSite(SiteConfig(combos=1, students_per_combo=1, latency=0.001))
+    limiter = AdaptiveRateLimiter(initial_rate=10_000, max_rate=10_000, burst=10_000)
+    with MockSiteServer(site) as server:
+        # The mock site answers proxy-style absolute URLs too, so it can stand in as the proxy
+        with ProxyScraper(proxies=[server.url], base_url=server.url, use_selenium=False,
+                          rate_limiter=limiter) as scraper:
+            for roll in range(1, 7):
+                assert scraper.extract_student_data(f"{roll:03d}99999922", retry_count=0)[1:] == (None, None)
+            health = scraper.proxy_pool.stats()[server.url]
+
+    assert site.counters['not_found'] == 6
+    assert (health['failures'], health['successes'], health['quarantined_for']) == (0, 6, 0)
@@ -0,0 +1,150 @@
+import csv
+import json
+import os
+
+import pytest
+
+from benchmark import MockSite, MockSiteServer, SiteConfig
+from datastore import StudentStore
+from enrollment_csv import combo_key, iter_enrollment_rows
+from extract_student_image import ProxyScraper
+from rate_limiter import AdaptiveRateLimiter
+from scan_image_availability import remove_entries_without_images, scan_image_availability
+
+
+def _scraper(server: MockSiteServer) -> ProxyScraper:
+    limiter = AdaptiveRateLimiter(initial_rate=10_000, max_rate=10_000, burst=10_000, initial_limit=8)
+    return ProxyScraper(max_workers=4, base_url=server.url, rate_limiter=limiter, use_selenium=False)
+
+
+def _verdicts(report: dict) -> dict:
+    return {combo_key(entry['course'], entry['batch'], entry['college_id'], entry['branch']): has_images
+            for has_images, section in ((True, 'with_images'), (False, 'without_images'))
+            for entry in report[section]}
+
+
+def test_interrupted_scan_resumes_with_undecided_combos(tmp_path):
+    site = MockSite(SiteConfig(combos=12, students_per_combo=4, latency=0.001, missing_image_ratio=0.5, seed=3))
+    enrollments_csv = str(tmp_path / 'enrollments.csv')
+    site.write_enrollments_csv(enrollments_csv)
+    output_file = str(tmp_path / 'report.json')
+    log_file = str(tmp_path / 'scan.log')
+
+    with MockSiteServer(site) as server:
+        with _scraper(server) as scraper:
+            scrape_iter = scraper.scrape_iter
+
+            def interrupted(student_ids, **kwargs):
+                for i, result in enumerate(scrape_iter(student_ids, **kwargs)):
+                    if i == 6:
+                        raise KeyboardInterrupt
+                    yield result
+
+            scraper.scrape_iter = interrupted
+            with pytest.raises(KeyboardInterrupt):
+                scan_image_availability(enrollments_csv, output_file, log_file, samples=2, scraper=scraper,
+                                        report_every=1)
+
+        with open(f"{output_file}.progress.jsonl", 'r', encoding='utf-8') as f:
+            first_run = {json.loads(line)['combo'] for line in f}
+        with open(output_file, 'r', encoding='utf-8') as f:
+            assert json.load(f)['summary']['complete'] is False
+        assert 0 < len(first_run) < len(site.combos)
+
+        site.reset_counters()
+        with _scraper(server) as scraper:
+            report = scan_image_availability(enrollments_csv, output_file, log_file, samples=2, scraper=scraper)
+
+    assert _verdicts(report) == site.truth()
+    assert report['summary']['complete'] is True
+    assert not os.path.exists(f"{output_file}.progress.jsonl")
+    # Only the undecided combos were probed again, at most `samples` pages each
+    assert site.counters['requests'] <= 2 * (len(site.combos) - len(first_run))
+
+
+def test_combos_with_no_loaded_sample_stay_undecided(tmp_path):
+    site = MockSite(SiteConfig(combos=12, students_per_combo=4, latency=0.001, missing_image_ratio=0.5,
+                               error_rate=0.9, seed=8))
+    enrollments_csv = str(tmp_path / 'enrollments.csv')
+    site.write_enrollments_csv(enrollments_csv)
+    output_file = str(tmp_path / 'report.json')
+    log_file = str(tmp_path / 'scan.log')
+
+    with MockSiteServer(site) as server:
+        with _scraper(server) as scraper:
+            first = scan_image_availability(enrollments_csv, output_file, log_file, samples=2, scraper=scraper)
+
+        # Nothing is declared imageless just because its pages failed
+        assert 0 < first['summary']['failed_combinations'] < len(site.combos)
+        assert first['summary']['complete'] is False
+        assert _verdicts(first).items() <= site.truth().items()
+        assert len(_verdicts(first)) + first['summary']['failed_combinations'] == len(site.combos)
+
+        site.config = site.config._replace(error_rate=0.0)
+        with _scraper(server) as scraper:
+            second = scan_image_availability(enrollments_csv, output_file, log_file, samples=2, scraper=scraper)
+
+    assert _verdicts(second) == site.truth()
+    assert second['summary']['complete'] is True
+    assert not os.path.exists(f"{output_file}.progress.jsonl")
+
+
+def test_store_rows_are_validated_and_sharded_like_the_csv(tmp_path):
+    site = MockSite(SiteConfig(combos=10, students_per_combo=3, latency=0.001, seed=4))
+    enrollments_csv = str(tmp_path / 'enrollments.csv')
+    site.write_enrollments_csv(enrollments_csv)
+    mismatched = {'enrollment': '00100101722', 'course': 'btech', 'batch': '22', 'college': '5', 'branch': 'ZZX'}  # shard 1
+
+    def scan(name, **kwargs):
+        return scan_image_availability(enrollments_csv, str(tmp_path / f"{name}.json"), str(tmp_path / f"{name}.log"),
+                                       samples=1, scraper=scraper, shard=1, n_shards=3, **kwargs)
+
+    with MockSiteServer(site) as server, _scraper(server) as scraper, \
+            StudentStore(str(tmp_path / 'students.db')) as store:
+        store.upsert_enrollments(list(iter_enrollment_rows(enrollments_csv)) + [mismatched])
+        from_csv = _verdicts(scan('csv'))
+        from_store = _verdicts(scan('store', store=store))
+
+    assert 0 < len(from_csv) < len(site.combos)
+    assert from_store == from_csv
+
+
+def _reference_filter(input_csv: str, report: dict):
+    """remove_entries_without_images as it was before it streamed (rows kept, counts)"""
+    valid = {f"{c['course']}|{c['batch']}|{c['college_id']}|{c['branch']}" for c in report['with_images']}
+    kept, removed = [], 0
+    with open(input_csv, mode='r', encoding='utf-8') as infile:
+        for row in csv.DictReader(infile):
+            key = f"{row['Course'].strip()}|{row['Batch'].strip()}|{row['College ID'].strip()}|{row['Branch'].strip()}"
+            if key in valid:
+                kept.append(row)
+            else:
+                removed += 1
+    return kept, removed
+
+
+def test_filter_matches_the_previous_implementation(tmp_path):
+    site = MockSite(SiteConfig(combos=30, students_per_combo=5, missing_image_ratio=0.4, seed=7))
+    input_csv = str(tmp_path / 'enrollments.csv')
+    site.write_enrollments_csv(input_csv)
+    report = {'with_images': [], 'without_images': [], 'summary': {}}
+    for i, (combo, has_images) in enumerate(site.has_images.items()):
+        if i % 5 == 0:
+            continue  # not in the report: dropped, as before
+        entry = {'course': combo.course, 'batch': combo.batch, 'college_id': combo.college, 'branch': combo.branch}
+        report['with_images' if has_images else 'without_images'].append(entry)
+    report_path = tmp_path / 'report.json'
+    report_path.write_text(json.dumps(report), encoding='utf-8')
+
+    expected_rows, expected_removed = _reference_filter(input_csv, report)
+    with open(input_csv, 'rb') as f:
+        original = f.read()
+
+    backup_csv = str(tmp_path / 'backup.csv')
+    kept, removed = remove_entries_without_images(input_csv, str(report_path), backup_csv)
+
+    assert (kept, removed) == (len(expected_rows), expected_removed)
+    with open(input_csv, mode='r', encoding='utf-8') as f:
+        assert list(csv.DictReader(f)) == expected_rows
+    with open(backup_csv, 'rb') as f:
+        assert f.read() == original
@@ -0,0 +1,28 @@
+import sqlite3
+import time
+
+from scrape_cache import DAY, STATUS_FAILED, ScrapeCache
+
+
+def test_only_loaded_pages_are_cached(tmp_path):
+    with ScrapeCache(str(tmp_path / 'cache.db')) as cache:
+        stored = cache.put_many([('00115002722', 'https://assets.ipuranklist.com/1.jpg', 'ANANYA JHA'),
+                                 ('00215002722', None, 'RAHUL VERMA'),
+                                 ('00315002722', None, None)])
+        assert stored == 2
+        assert cache.get('00115002722') == ('00115002722', 'https://assets.ipuranklist.com/1.jpg', 'ANANYA JHA')
+        assert cache.get('00215002722') == ('00215002722', None, 'RAHUL VERMA')
+        assert cache.get('00315002722') is None
+        assert cache.stats()['entries'] == {'ok': 1, 'no_image': 1}
+
+
+def test_failures_left_by_older_runs_are_misses(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    with ScrapeCache(path, negative_ttl=DAY) as cache:
+        cache.put('00115002722', None, 'RAHUL VERMA')
+    with sqlite3.connect(path) as conn:
+        conn.execute('INSERT INTO results VALUES (?, NULL, NULL, ?, ?)', ('00215002722', STATUS_FAILED, time.time()))
+
+    with ScrapeCache(path, negative_ttl=DAY) as cache:
+        assert cache.get('00115002722') is not None
+        assert cache.get('00215002722') is None